@@ -18,10 +18,21 @@ Purpose:
                            The JSON response data is not checked against the DB data before insertion, although
                            unique constraints should prevent insertion of duplicate claims.
 
+    Multiple insurers can be processed concurrently within the one process by setting the "insurers" environment
+    variable to a comma separated list, e.g. "ORG_1,ORG_2,ORG_3". Each insurer runs in its own thread with its own
+    thisConfig/thisJob, log file and staging directory, while sharing the HTTP and ODBC connection pools.
+
     More specific detail on run options can be ascertained from the pyConfig module or the README.md file.
          
 Revision History:
 
+    19/10/2026   agent            Exit with an error when any insurer's job fails.
+    19/10/2026   agent            Re-trust only the Foreign Keys of the tables loaded, concurrently. See SQL_TRUST_WORKERS.
+    19/10/2026   agent            Added the streaming CSV reader. See APP_CSV_READER.
+    19/10/2026   agent            Added concurrent multi-insurer execution.
+    19/10/2026   agent            Defer imports of job and run type specific modules until they are known to be needed.
+                                  e.g. The requests library is only loaded for API jobs and the database modules are
+                                  not loaded for JSON runs. See utilities/benchmarkUtils.py for a startup benchmark.
     20/11/2020   Mark Schaafsma   Reorganise - Move logging setup from configure module to this module.
                                   This prevents duplicate file handler setup.
     29/07/2020   Mark Schaafsma   Created. 
@@ -29,15 +40,18 @@ Revision History:
 '''
 
 ## Standard libraries
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import sys
+import threading
 
 ## Local Libraries
+# Note: Job and run type specific modules (control.request, control.fileProcessing, database.trustControl)
+#       are imported within main() once the job configuration is known. This keeps startup cost down,
+#       particularly for short delta runs and JSON runs which never touch the database.
 import constant
 import logging
 import pyConfig
-from control import fileProcessing, request
-from database import insertControl
 from models import job
 from utilities import logUtils
 
@@ -51,13 +65,85 @@ logger = logging.getLogger()
 
 
 def main():
+
+    # Determine whether one insurer, or several insurers concurrently, are to be processed.
+    insurers = pyConfig.getInsurerList()
+
+    if len(insurers) > 1:
+        runInsurersConcurrently(insurers)
+    else:
+        # Create a variable containing details about thisJob's configuration.
+        # A single entry in "insurers" takes precedence over the "insurer" environment variable.
+        thisConfig = pyConfig.genConfig(insurer=insurers[0] if len(insurers) == 1 else None)
+        # Setup logging. 
+        setupLogging(thisConfig)
+        runJob(thisConfig)
+
+
+
+
+
+def runInsurersConcurrently(insurers):
+
+    # Each insurer is run in a thread named after the insurer. The thread name is used to route
+    # log records to the insurer's own log file. See runInsurerJob.
+    #
+    # Isolation:
+    #  - thisConfig and thisJob are created per insurer and only passed to that insurer's thread.
+    #  - Staging (csv) files are written to an insurer sub-directory. See fileUtils.getPathDetails.
+    #  - Log records are written to an insurer specific log file, as well as the shared console.
+    # Shared:
+    #  - The HTTP connection pool. See request.getSession.
+    #  - The ODBC connection pool. pyodbc/ODBC Driver Manager pooling is process wide.
+
+    # Generate each insurer's configuration up front so invalid configuration terminates the job before any work starts.
+    configs = list()
+    for insurer in insurers:
+        configs.append(pyConfig.genConfig(insurer=insurer, multiInsurer=True))
+
+    # Console logging is shared, so set it up once. Include the thread (insurer) name to distinguish records.
+    setupConsoleLogging(configs[0], format='%(asctime)s : %(levelname)-7s : %(threadName)-10s : %(filename)-20s%(lineno)-6d : %(message)s')
+
+    futures = dict()
+    with ThreadPoolExecutor(max_workers=len(configs)) as executor:
+        for thisConfig in configs:
+            setupFileLogging(thisConfig, insurer=thisConfig['INSURER'])
+            futures[thisConfig['INSURER']] = executor.submit(runInsurerJob, thisConfig)
+
+    # An insurer's job that failed has already logged its exception. Exit with an error so the failure
+    # is visible to the scheduler, after every other insurer's job has finished.
+    failedInsurers = [insurer for insurer, future in futures.items() if future.exception() is not None]
+    if len(failedInsurers) > 0:
+        logger.error(f"{'Insurer jobs failed':30}: {', '.join(failedInsurers)}")
+        sys.exit(1)
+
+
+
+
+
+def runInsurerJob(thisConfig):
+
+    # Name the thread after the insurer. The thread name routes log records to the insurer's log file,
+    # and the worker threads the job starts are named with it as a prefix. See setupFileLogging.
+    threading.current_thread().name = thisConfig['INSURER']
+
+    try:
+        runJob(thisConfig)
+    except:
+        message = "ERROR running job for insurer"
+        logger.error(f"{message:55}: {thisConfig['INSURER']}")
+        logger.error(f"{' ':55}: {sys.exc_info()[0]}")
+        logger.error(f"{' ':55}: {sys.exc_info()[1]}")
+        raise
+
+
+
+
+
+def runJob(thisConfig):
  
     # Initialization
     #------------------
-    # Create a variable containing details about thisJob's configuration.
-    thisConfig = pyConfig.genConfig()
-    # Setup logging. 
-    setupLogging(thisConfig)
     # Create a variable containing details about thisJob's execution.
     thisJob = job.setupJob()
     # Log/Display start time, environment and run configuration.
@@ -66,15 +152,24 @@ def main():
     # Processing
     #--------------
     if thisConfig['APP_JOB_TYPE'].upper() == constant.API_JOB_TYPE:
+        from control import request
         request.setupRequestAndCall(thisConfig, thisJob)
 
     if thisConfig['APP_JOB_TYPE'].upper() == constant.CSV_JOB_TYPE:
-        fileProcessing.processCSVFiles(thisConfig, thisJob)
+        if thisConfig['APP_CSV_READER'].upper() == constant.STANDARD_CSV_READER:
+            from control import fileProcessing
+            fileProcessing.processCSVFiles(thisConfig, thisJob)
+        else:
+            from control import csvLoader
+            csvLoader.processCSVFiles(thisConfig, thisJob)
 
     # Finalization
     #----------------
-    # If Foreign Key constraints in use, check tables are trusted or try to re-mark tables as trusted.  
-    insertControl.remarkClaimTablesAsTrusted(thisConfig, thisJob)
+    # If Foreign Key constraints in use, try to re-mark the tables loaded by this job as trusted.
+    # Not required when the job never touched the database, e.g. an API job with run type JSON.
+    if isDatabaseJob(thisConfig):
+        from database import trustControl
+        trustControl.remarkLoadedTablesAsTrusted(thisConfig, thisJob)
     # Log/Display job finish summary.
     logUtils.logJobFinishDetails(thisConfig, thisJob)
 
@@ -82,8 +177,31 @@ def main():
 
 
 
+def isDatabaseJob(thisConfig):
+
+    # CSV jobs always load the database.
+    # API jobs load the database unless the run type is JSON, i.e. retrieve the response only.
+    if (thisConfig['APP_JOB_TYPE'].upper() == constant.API_JOB_TYPE
+    and thisConfig['APP_RUN_TYPE'].upper() == constant.JSON_RUN_TYPE):
+        return False
+
+    return True
+
+
+
+
+
 def setupLogging(thisConfig):
 
+    setupConsoleLogging(thisConfig)
+    setupFileLogging(thisConfig)
+
+
+
+
+
+def getLoggingLevel(thisConfig):
+
     if thisConfig['LOG_LEVEL'].upper() == constant.LOG_LEVEL_DEBUG:
         loggingLevel = logging.DEBUG
     elif thisConfig['LOG_LEVEL'].upper() == constant.LOG_LEVEL_INFO:
@@ -97,20 +215,42 @@ def setupLogging(thisConfig):
     else:
         loggingLevel = logging.INFO
 
+    return loggingLevel
+
+
+
+
+
+def setupConsoleLogging(thisConfig, format='%(asctime)s : %(levelname)-7s : %(filename)-20s%(lineno)-6d : %(message)s'):
+
+    loggingLevel = getLoggingLevel(thisConfig)
+
     ## Configure logging to the console.
 
     # Note, logging seems to require basicConfig to be defined first with one handler. Further handlers can be added later.
-    logging.basicConfig(stream=sys.stdout, level=loggingLevel, format='%(asctime)s : %(levelname)-7s : %(filename)-20s%(lineno)-6d : %(message)s')
+    logging.basicConfig(stream=sys.stdout, level=loggingLevel, format=format)
     #logging.basicConfig(stream=sys.stdout, level=loggingLevel, style='{', format="{asctime} : {levelname:7} : {filename:20}{lineno:6} : {message}")
     #logging.basicConfig(stream=sys.stdout, level=loggingLevel, format='%(asctime)s: %(levelname)s: %(name)s: %(message)s')
 
+
+
+
+
+def setupFileLogging(thisConfig, insurer=None):
+
+    loggingLevel = getLoggingLevel(thisConfig)
+
     ## Configure logging to a file handler
 
     if thisConfig['LOG_DIRECTORY'] != '':
 
         # Setup log filename
+        # When running several insurers concurrently, each insurer has its own log file.
         timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M')
-        filename = f"{thisConfig['LOG_DIRECTORY']}logfile-{str(timestamp)}.log"
+        if insurer is None:
+            filename = f"{thisConfig['LOG_DIRECTORY']}logfile-{str(timestamp)}.log"
+        else:
+            filename = f"{thisConfig['LOG_DIRECTORY']}logfile-{insurer}-{str(timestamp)}.log"
 
         # Create a file handler and set logging level.
         fileHandler = logging.FileHandler(filename)
@@ -119,6 +259,12 @@ def setupLogging(thisConfig):
         # Create a formatter and add to the handler
         formatter = logging.Formatter('%(asctime)s : %(levelname)-7s : %(filename)-20s%(lineno)-6d : %(message)s')
         fileHandler.setFormatter(formatter)
+
+        # Only accept records logged by the insurer's thread, or by worker threads it starts.
+        # Worker threads are named with the insurer's thread name as a prefix, followed by '_'.
+        # e.g. ORG_1_0, but not ORG_10.
+        if insurer is not None:
+            fileHandler.addFilter(lambda record: record.threadName == insurer or record.threadName.startswith(insurer + '_'))
     
         # Add the handler to the logger
         logger.addHandler(fileHandler)
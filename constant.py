@@ -5,6 +5,11 @@ Purpose:
 
 Revision History:
 
+    19/10/2026   agent            Added CSV_READERs.
+    19/10/2026   agent            Added API_CLAIM keys.
+    19/10/2026   agent            Added BATCHED_UPDATE_TYPE.
+    19/10/2026   agent            Added COMPRESSIONs.
+    19/10/2026   agent            Added FILE_FORMATs.
     16/11/2020   Mark Schaafsma   Added LOG_LEVELs.
     29/10/2020   Mark Schaafsma   Added MANY_UPDATE_TYPE and DT (date) constants.
     28/09/2020   Mark Schaafsma   Created. 
@@ -27,6 +32,16 @@ API_JOB_TYPE = 'API'
 CSV_JOB_TYPE = 'CSV'
 
 
+STANDARD_CSV_READER = 'STANDARD'
+STREAMING_CSV_READER = 'STREAMING'
+MMAP_CSV_READER = 'MMAP'
+
+
+## Claims API item keys used before mapping. e.g. To collapse duplicate versions of a claim.
+API_CLAIM_NUMBER_KEY = 'claim_number'
+API_CLAIM_LASTUPDATED_KEY = 'last_updated'
+
+
 JSON_RUN_TYPE = 'JSON'
 INSERT_RUN_TYPE = 'INSERT'
 INSERT_AND_UPDATE_RUN_TYPE = 'INSERT-AND-UPDATE'
@@ -35,6 +50,15 @@ INSERT_AND_UPDATE_RUN_TYPE = 'INSERT-AND-UPDATE'
 BULK_UPDATE_TYPE = 'BULK'
 MANY_UPDATE_TYPE = 'MANY'
 SINGLE_UPDATE_TYPE = 'SINGLE'
+BATCHED_UPDATE_TYPE = 'BATCHED'
+
+
+CSV_FILE_FORMAT = 'CSV'
+NATIVE_FILE_FORMAT = 'NATIVE'
+
+
+NO_COMPRESSION = 'NONE'
+GZIP_COMPRESSION = 'GZIP'
 
 
 TRUE_KEEP_RESPONSE = 'TRUE'
@@ -0,0 +1,318 @@
+'''
+Purpose:
+
+    This module processes the error files written by a table's Bulk Insert, and re-drives the rejected rows.
+    See SQL_BULKINSERT_REDRIVE.
+
+    For each Bulk Insert, SQL Server writes the rows it rejects to the ERRORFILE, <table>.txt, and an error entry
+    for each rejected row to <table>.txt.Error.Txt. e.g.
+
+        Row 12 File Offset 2311 ErrorFile Offset 0 - HRESULT 0x80020005
+
+    The "ErrorFile Offset" is the position of the rejected row in <table>.txt, so each rejected row is read
+    directly at its offset, and matched to its error entry, without scanning the whole file.
+
+    Rejected rows are only re-driven when the Bulk Insert completed, and every row not rejected was inserted. If the
+    Bulk Insert failed (e.g. MAXERRORS was exceeded), the batch being loaded was rolled back, so rows missing from the
+    table aren't all in the error file. Re-driving just the rejected rows would then leave the table partly loaded, so
+    the rejected rows are reported only, as "not re-driven", and the error files are archived.
+
+    After a completed Bulk Insert:
+     - Each rejected row is converted to its column types, and validated (see validation).
+     - Valid rows are re-driven with fast_executemany inserts, in batches. A failing batch is split until the
+       failing rows are isolated. See batchedInsertControl.insertRowsIsolatingFailures.
+     - Rows that still fail are added to a consolidated rejects report, thisJob['BulkInsertRejects'], per table,
+       with the claim (ClaimId) and key value of the row, and written to <table>.BulkRejects.csv.
+     - The table's detail entry (thisJob['TableDetails']) is updated with the re-driven rows.
+     - The error files are moved to the BulkErrors archive directory, as the Bulk Insert fails if its ERRORFILE
+       already exists.
+
+    So a load that fails for a few rows becomes a targeted retry of those rows, not a rerun of the whole job.
+
+    Rejected rows of NATIVE format files are binary, and can't be re-driven. They are reported only.
+
+Revision History:
+
+    19/10/2026   agent            Only re-drive the rejected rows of a Bulk Insert that completed.
+    19/10/2026   agent            Created.
+
+'''
+
+## Standard Libraries
+from datetime import datetime
+import csv
+import logging
+import os
+import re
+import sys
+
+## Local Libraries
+import constant
+from control import csvLoader, validation
+from models import tableSchema
+from utilities import fileUtils
+
+## Module logger
+logger = logging.getLogger(__name__)
+
+
+## An error entry of the Bulk Insert error file.
+ERROR_ENTRY_PATTERN = re.compile(rb'Row (\d+) File Offset (\d+) ErrorFile Offset (\d+) - HRESULT (0x[0-9A-Fa-f]+)')
+
+## Descriptions of the common Bulk Insert error HRESULTs.
+HRESULT_DESCRIPTIONS = {
+    '0x80020005' : 'Data conversion error',
+    '0x80004005' : 'Data error (e.g. truncation or constraint)',
+    '0x80040e21' : 'Invalid value for column',
+}
+
+## Archive directory for processed error files, within the staging directory.
+ARCHIVE_DIRECTORY = 'BulkErrors'
+
+
+
+
+
+def insertBulkClaimTableRowsRedriving(table, filepath, thisConfig, thisJob, rowsToInsert=None, batchSize=None, ordered=True):
+
+    from database import bulkInsertOptions
+
+    # Error files left by an earlier run would fail the Bulk Insert, so archive them first.
+    if os.path.exists(f"{filepath}.txt") or os.path.exists(f"{filepath}.txt.Error.Txt"):
+        logger.warning(f"{table:25} {'archiving earlier error files: ':33}{filepath}.txt")
+        archiveErrorFiles(filepath)
+
+    bulkInsertOptions.insertBulkClaimTableRows(table, filepath, thisConfig, thisJob, rowsToInsert, batchSize, ordered)
+
+    if os.path.exists(f"{filepath}.txt.Error.Txt"):
+        processBulkErrorFiles(table, filepath, thisConfig, thisJob)
+
+    return thisJob
+
+
+
+
+
+def processBulkErrorFiles(table, filepath, thisConfig, thisJob):
+
+    try:
+        errorEntries = readErrorEntries(f"{filepath}.txt.Error.Txt")
+        logger.warning(f"{table:25} {'rows rejected by bulk insert: ':33}{len(errorEntries)}")
+
+        if not isLoadCommitted(table, errorEntries, thisJob):
+            logger.warning(f"{table:25} {'rejected rows not re-driven: ':33}load not committed")
+            rejects = [getReject(table, entry, None, f"{getErrorDescription(entry)}; load not committed, not re-driven") for entry in errorEntries]
+        elif thisConfig['SQL_BULKINSERT_FILE_FORMAT'].upper() == constant.NATIVE_FILE_FORMAT:
+            rejects = [getReject(table, entry, None, getErrorDescription(entry)) for entry in errorEntries]
+        else:
+            rejects = redriveRejectedRows(table, filepath, errorEntries, thisConfig, thisJob)
+
+        reportRejects(table, filepath, rejects, thisJob)
+
+    except:
+        message = "Unable to process bulk insert error files"
+        logger.error(f"{message:55}: {filepath}.txt")
+        logger.error(f"{' ':55}: {sys.exc_info()[0]}")
+        logger.error(f"{' ':55}: {sys.exc_info()[1]}")
+
+    archiveErrorFiles(filepath)
+
+    return thisJob
+
+
+
+
+
+def isLoadCommitted(table, errorEntries, thisJob):
+
+    # The load is committed when the Bulk Insert completed, and every row was either inserted or rejected.
+    for tableDetail in reversed(thisJob['TableDetails']):
+        if tableDetail['ClaimTable'] == table:
+            return (tableDetail.get('BulkInsertCompleted', False)
+                and tableDetail['SuccessfulInserts'] + len(errorEntries) == tableDetail['RowsToInsert'])
+    return False
+
+
+
+
+
+def readErrorEntries(filePathAndName):
+
+    # Returns the error entries as (row, fileOffset, errorFileOffset, hresult) tuples, in error file offset order.
+    with open(filePathAndName, 'rb') as f:
+        data = f.read()
+
+    # The error file may be written as UTF-16.
+    if data.startswith(b'\xff\xfe'):
+        data = data.decode('utf-16').encode(csvLoader.FILE_ENCODING, errors='replace')
+
+    entries = [(int(row), int(fileOffset), int(errorFileOffset), hresult.decode().lower())
+        for row, fileOffset, errorFileOffset, hresult in ERROR_ENTRY_PATTERN.findall(data)]
+
+    return sorted(entries, key=lambda entry: entry[2])
+
+
+
+
+
+def readRejectedRecords(filePathAndName, errorEntries):
+
+    # Returns the rejected record (list of field strings) for each error entry, read at its error file offset.
+    # The record extends to the next entry's offset. Returns None for a record that can't be read.
+    with open(filePathAndName, 'rb') as f:
+        data = f.read()
+
+    records = list()
+    offsets = [entry[2] for entry in errorEntries] + [len(data)]
+
+    for index in range(len(errorEntries)):
+        text = data[offsets[index]:offsets[index + 1]].decode(csvLoader.FILE_ENCODING)
+        if text.endswith('\r\n'):
+            text = text[:-2]
+        records.append(next(csv.reader([text], delimiter=csvLoader.FIELD_SEPARATOR), None))
+
+    return records
+
+
+
+
+
+def redriveRejectedRows(table, filepath, errorEntries, thisConfig, thisJob):
+
+    from database import batchedInsertControl
+
+    # The staged file's header names the columns of the rejected records.
+    header, headerBytes = csvLoader.readHeader(f"{filepath}.csv")
+    columnCount = len(header)
+    converters = csvLoader.getColumnConverters(table, header, emptyTextAsNull=True)
+
+    rejects = list()
+    rows = list()
+    rowEntries = list()
+
+    # Convert each rejected record to a row of its column types.
+    for entry, record in zip(errorEntries, readRejectedRecords(f"{filepath}.txt", errorEntries)):
+        if record is None or len(record) != columnCount:
+            rejects.append(getReject(table, entry, None, f"{getErrorDescription(entry)}; record unreadable"))
+            continue
+        try:
+            rows.append(dict(zip(header, (converter([value])[0] for converter, value in zip(converters, record)))))
+            rowEntries.append(entry)
+        except ValueError:
+            rejects.append(getReject(table, entry, dict(zip(header, record)), f"{getErrorDescription(entry)}; {sys.exc_info()[1]}"))
+
+    # Rows failing validation would fail again, so report them rather than re-drive them.
+    invalidRows = dict()
+    for rowIndex, row, column, error in validation.validateTableDictList(table, rows):
+        invalidRows.setdefault(rowIndex, f"{getErrorDescription(rowEntries[rowIndex])}; {column}: {error}")
+
+    for rowIndex, error in invalidRows.items():
+        rejects.append(getReject(table, rowEntries[rowIndex], rows[rowIndex], error))
+
+    validRows = [(row, entry) for rowIndex, (row, entry) in enumerate(zip(rows, rowEntries)) if rowIndex not in invalidRows]
+    if len(validRows) == 0:
+        return rejects
+
+    # Re-drive the valid rows, isolating those that fail again.
+    rowTuples = [tuple(row.values()) for row, entry in validRows]
+    insertedRows, failures = batchedInsertControl.insertRowsIsolatingFailures(table, tuple(header), rowTuples, thisConfig)
+
+    entriesByRow = {id(rowTuple) : entry for rowTuple, (row, entry) in zip(rowTuples, validRows)}
+    for rowTuple, error in failures:
+        rejects.append(getReject(table, entriesByRow[id(rowTuple)], dict(zip(header, rowTuple)), error))
+
+    recordRedrivenRows(table, insertedRows, thisJob)
+
+    logger.info(f"{table:25} {'rejected rows re-driven: ':33}{insertedRows} of {len(validRows)}")
+
+    return rejects
+
+
+
+
+
+def getErrorDescription(entry):
+
+    row, fileOffset, errorFileOffset, hresult = entry
+    return f"HRESULT {hresult} {HRESULT_DESCRIPTIONS.get(hresult, '')}".rstrip()
+
+
+
+
+
+def getReject(table, entry, row, error):
+
+    # Map the rejected row back to its claim.
+    keyColumn = tableSchema.KEY_COLUMNS.get(table)
+
+    return {
+        'Row' : entry[0],
+        'ClaimId' : row.get('ClaimId') if row is not None else None,
+        'KeyColumn' : keyColumn,
+        'KeyValue' : row.get(keyColumn) if row is not None else None,
+        'Error' : error[:validation.MAX_REJECT_VALUE_LENGTH * 2],
+    }
+
+
+
+
+
+def recordRedrivenRows(table, insertedRows, thisJob):
+
+    # The re-driven rows were counted as failed inserts by the Bulk Insert.
+    for tableDetail in reversed(thisJob['TableDetails']):
+        if tableDetail['ClaimTable'] == table:
+            tableDetail['SuccessfulInserts'] = tableDetail.get('SuccessfulInserts', 0) + insertedRows
+            tableDetail['FailedInserts'] = max(0, tableDetail.get('FailedInserts', 0) - insertedRows)
+            tableDetail['RedrivenInserts'] = tableDetail.get('RedrivenInserts', 0) + insertedRows
+            return
+
+
+
+
+
+def reportRejects(table, filepath, rejects, thisJob):
+
+    if len(rejects) == 0:
+        return
+
+    # The rejects for each table accumulate across chunks and pages, so the report covers the whole job.
+    tableRejects = thisJob.setdefault('BulkInsertRejects', dict()).setdefault(table, list())
+    tableRejects.extend(sorted(rejects, key=lambda reject: reject['Row']))
+
+    logger.warning(f"{table:25} {'rows rejected after re-drive: ':33}{len(rejects)}")
+
+    fileUtils.writeDictListToCsvFile(tableRejects, table, f"{filepath}.BulkRejects")
+
+
+
+
+
+def archiveLoadErrorFiles(table, filepath):
+
+    # Move aside the error files left by a table's load, so the next load of the table (e.g. the next chunk's)
+    # can write its own. The rejected rows are counted, but not re-driven. See SQL_BULKINSERT_REDRIVE.
+    if not os.path.exists(f"{filepath}.txt") and not os.path.exists(f"{filepath}.txt.Error.Txt"):
+        return
+
+    if os.path.exists(f"{filepath}.txt.Error.Txt"):
+        logger.warning(f"{table:25} {'rows rejected by bulk insert: ':33}{len(readErrorEntries(f'{filepath}.txt.Error.Txt'))}")
+
+    logger.warning(f"{table:25} {'error files archived: ':33}{os.path.join(os.path.dirname(filepath), ARCHIVE_DIRECTORY)}")
+    archiveErrorFiles(filepath)
+
+
+
+
+
+def archiveErrorFiles(filepath):
+
+    # Move the error files aside, as the Bulk Insert fails if its ERRORFILE already exists.
+    directory, table = os.path.split(filepath)
+    archiveDirectory = os.path.join(directory, ARCHIVE_DIRECTORY)
+    timestamp = datetime.now().strftime('%Y%m%d%H%M%S%f')
+
+    for suffix in ('.txt', '.txt.Error.Txt'):
+        if os.path.exists(f"{filepath}{suffix}"):
+            os.makedirs(archiveDirectory, exist_ok=True)
+            os.replace(f"{filepath}{suffix}", os.path.join(archiveDirectory, f"{table}.{timestamp}{suffix}"))
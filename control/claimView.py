@@ -0,0 +1,170 @@
+'''
+Purpose:
+
+    This module parses Claims API responses into lazy, read-only views of the claims. See API_LAZY_JSON.
+
+    response.json() converts the whole document to Python dictionaries and lists before any claim is mapped,
+    although most of each claim's nested content is never read. Here the document is parsed by pysimdjson, which
+    builds its own compact document (tape) in one pass, and values are only converted to Python objects when a
+    field is read:
+     - ClaimView   - A read-only Mapping over a JSON object. A field is converted on first access, and kept.
+     - ListView    - A read-only Sequence over a JSON array. Objects and arrays within it are returned as views,
+                     each built on first access, and kept.
+    Scalars (strings, numbers, booleans and null) are returned as Python values.
+
+    The views support the access the mapping code uses: get, [], in, len and iteration. So only the fields the
+    mappings reference are converted.
+
+    The saving depends on the mappings (models/mappings.py) reading only some of each claim's fields. A mapping that
+    reads every field converts the whole document, as response.json() does, with the cost of the views on top.
+
+    pysimdjson is optional. Without it, or when lazy parsing isn't enabled, responses are parsed in full,
+    by the fastest JSON backend installed. See utilities/jsonUtils.py.
+
+Revision History:
+
+    19/10/2026   agent            Parse responses in full with jsonUtils rather than response.json().
+    19/10/2026   agent            Created.
+
+'''
+
+## Standard Libraries
+from collections.abc import Mapping, Sequence
+import importlib.util
+import logging
+
+## Local Libraries
+import constant
+from utilities import jsonUtils
+
+## Module logger
+logger = logging.getLogger(__name__)
+
+
+## pysimdjson is optional. find_spec checks the package is available without the cost of importing it.
+LAZY_PARSER_AVAILABLE = importlib.util.find_spec('simdjson') is not None
+
+## pysimdjson's object and array types, set when pysimdjson is first used.
+objectType = None
+arrayType = None
+
+
+
+
+
+class ClaimView(Mapping):
+
+    __slots__ = ('element', 'values')
+
+    def __init__(self, element):
+        self.element = element
+        self.values = dict()
+
+    def __getitem__(self, key):
+        try:
+            return self.values[key]
+        except KeyError:
+            pass
+        # Raises KeyError for a missing field.
+        value = toView(self.element[key])
+        self.values[key] = value
+        return value
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        return key in self.values or key in self.element
+
+    def __iter__(self):
+        return iter(self.element.keys())
+
+    def __len__(self):
+        return len(self.element)
+
+    def toDict(self):
+        # Convert the whole object, e.g. to serialise it.
+        return self.element.as_dict()
+
+
+
+
+
+class ListView(Sequence):
+
+    __slots__ = ('element', 'values')
+
+    def __init__(self, element):
+        self.element = element
+        self.values = dict()
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self.element)))]
+        if index < 0:
+            index += len(self.element)
+        try:
+            return self.values[index]
+        except KeyError:
+            pass
+        # Raises IndexError for an index out of range.
+        value = toView(self.element[index])
+        self.values[index] = value
+        return value
+
+    def __iter__(self):
+        for index in range(len(self.element)):
+            yield self[index]
+
+    def __len__(self):
+        return len(self.element)
+
+    def toList(self):
+        return self.element.as_list()
+
+
+
+
+
+def toView(value):
+
+    valueType = type(value)
+    if valueType is objectType:
+        return ClaimView(value)
+    if valueType is arrayType:
+        return ListView(value)
+    return value
+
+
+
+
+
+def isLazy(thisConfig):
+
+    # The kept response (APP_KEEP_RESPONSE) is written from the parsed document, so requires it in full.
+    return (thisConfig['API_LAZY_JSON']
+        and LAZY_PARSER_AVAILABLE
+        and thisConfig['APP_KEEP_RESPONSE'].upper() != constant.TRUE_KEEP_RESPONSE)
+
+
+
+
+
+def parseResponse(claimsResponse, lazy=False):
+
+    # Returns the response's JSON document, as views when lazy, else as Python dictionaries and lists.
+    if not lazy:
+        return jsonUtils.parseResponse(claimsResponse)
+
+    global objectType, arrayType
+    import simdjson
+    objectType = simdjson.Object
+    arrayType = simdjson.Array
+
+    # A parser holds one document at a time, and its views stay valid only while it does, so use a parser
+    # per response. Responses may be parsed concurrently on fetch worker threads.
+    # pysimdjson parses UTF-8 only, so content in another declared charset is re-encoded first.
+    return toView(simdjson.Parser().parse(jsonUtils.getUtf8Content(claimsResponse)))
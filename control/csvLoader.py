@@ -0,0 +1,287 @@
+'''
+Purpose:
+
+    This module loads the staged table (csv) files of a previous run, for the CSV job type, when
+    APP_CSV_READER is "STREAMING" or "MMAP". See fileProcessing.processCSVFiles for the standard reader.
+
+    Files are read in large blocks (or through a memory map), and each block of complete records is decoded and
+    split into columns. Blocks without quote characters (the usual case), whose records each have the header's
+    number of fields, are split into fields in one pass, and each column is taken as a slice of the fields.
+    Other blocks are parsed a record at a time (with the csv module, when they have quoted fields).
+    The columns are converted to their types (see tableSchema.COLUMN_TYPES), then zipped into row value tuples
+    and loaded in batches with fast_executemany (batchedInsertControl.insertRowBatches).
+    No per-row dictionaries are built.
+
+    For BULK updates, SQL Server reads the files itself, so the files are bulk inserted without being read here.
+
+    Tables are loaded concurrently, up to APP_CSV_LOAD_WORKERS at a time, one Foreign Key level at a time
+    (see tableSchema.LOAD_LEVELS), so parent tables are always loaded before their child tables.
+
+Revision History:
+
+    19/10/2026   agent            Check the field count of each record. Load empty text fields as '', as the standard
+                                  reader does.
+    19/10/2026   agent            Re-drive rows rejected by the Bulk Insert. See SQL_BULKINSERT_REDRIVE.
+    19/10/2026   agent            Created.
+
+'''
+
+## Standard Libraries
+from concurrent.futures import ThreadPoolExecutor
+import csv
+import io
+import logging
+import mmap
+import os
+import threading
+
+## Local Libraries
+import constant
+from models import tableSchema
+from utilities import fileUtils, logUtils
+
+## Module logger
+logger = logging.getLogger(__name__)
+
+
+## Bytes read per block.
+BLOCK_BYTES = 8388608
+
+## Record and field separators, as written by fileUtils.writeDictListToCsvFile.
+RECORD_SEPARATOR = b'\r\n'
+FIELD_SEPARATOR = '|'
+
+## Staged files are latin-1 encoded. See fileUtils.writeDictListToCsvFile.
+FILE_ENCODING = 'latin-1'
+
+
+
+
+
+def processCSVFiles(thisConfig, thisJob):
+
+    logUtils.logInsertProcessingHeader()
+
+    path = fileUtils.getPathDetails(thisConfig)
+
+    # Name the worker threads after this thread, so log records are routed to the right insurer's log file.
+    with ThreadPoolExecutor(max_workers=thisConfig['APP_CSV_LOAD_WORKERS'], thread_name_prefix=threading.current_thread().name) as executor:
+
+        for level in tableSchema.LOAD_LEVELS:
+
+            futures = list()
+            for table in level:
+                filepath = f"{path}{table}"
+                if os.path.exists(f"{filepath}.csv"):
+                    futures.append(executor.submit(loadTableFile, table, filepath, thisConfig, thisJob))
+                else:
+                    logger.info(f"{table:25} {'no file to load: ':33}{filepath}.csv")
+
+            # Wait for the level to be loaded before loading its child tables.
+            for future in futures:
+                future.result()
+
+    return thisJob
+
+
+
+
+
+def loadTableFile(table, filepath, thisConfig, thisJob):
+
+    from database import batchTuner, batchedInsertControl, bulkInsertOptions
+
+    if thisConfig['APP_UPDATE_TYPE'].upper() == constant.BULK_UPDATE_TYPE:
+        if thisConfig['SQL_BULKINSERT_REDRIVE']:
+            from control import bulkErrorProcessing
+            bulkErrorProcessing.insertBulkClaimTableRowsRedriving(table, filepath, thisConfig, thisJob)
+        else:
+            bulkInsertOptions.insertBulkClaimTableRows(table, filepath, thisConfig, thisJob)
+        return
+
+    useMmap = thisConfig['APP_CSV_READER'].upper() == constant.MMAP_CSV_READER
+    batchRows = batchTuner.getExecuteManyBatchSize(table, thisConfig)
+
+    header, headerBytes = readHeader(f"{filepath}.csv")
+    if header is None:
+        logger.info(f"{table:25} {'no rows to load: ':33}{filepath}.csv")
+        return
+
+    converters = getColumnConverters(table, header)
+
+    def getRowBatches():
+        for columns in readColumnBatches(table, f"{filepath}.csv", headerBytes, len(header), batchRows, useMmap):
+            yield toRowTuples(columns, converters)
+
+    batchedInsertControl.insertRowBatches(table, tuple(header), getRowBatches(), thisConfig, thisJob)
+
+
+
+
+
+def readHeader(filePathAndName):
+
+    # Returns the column names, and the length in bytes of the header record.
+    with open(filePathAndName, 'rb') as f:
+        headerLine = f.readline()
+
+    if headerLine == b'':
+        return None, 0
+
+    return next(csv.reader([headerLine.decode(FILE_ENCODING)], delimiter=FIELD_SEPARATOR)), len(headerLine)
+
+
+
+
+
+def iterBlocks(f, start, useMmap):
+
+    # Yields the file's contents, from the start position, a block at a time.
+    if useMmap and os.fstat(f.fileno()).st_size > start:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mappedFile:
+            for blockStart in range(start, len(mappedFile), BLOCK_BYTES):
+                yield mappedFile[blockStart:blockStart + BLOCK_BYTES]
+        return
+
+    f.seek(start)
+    while True:
+        block = f.read(BLOCK_BYTES)
+        if not block:
+            return
+        yield block
+
+
+
+
+
+def getLastRecordEnd(data):
+
+    # Returns the position after the last complete record in data, or 0 if there is none.
+    # A record separator within a quoted field has an odd number of quote characters before it.
+    pos = data.rfind(RECORD_SEPARATOR)
+    if b'"' in data:
+        while pos >= 0 and data.count(b'"', 0, pos) % 2 == 1:
+            pos = data.rfind(RECORD_SEPARATOR, 0, pos)
+    return pos + len(RECORD_SEPARATOR) if pos >= 0 else 0
+
+
+
+
+
+def parseColumns(table, data, columnCount):
+
+    # Returns the records in data as a list of columns, each a list of field strings.
+    text = data.decode(FILE_ENCODING)
+    if text.endswith('\r\n'):
+        text = text[:-2]
+    if text == '':
+        return None
+
+    # Without quoted fields, and with the right number of fields in every record, split all the fields at once,
+    # then take each column as a slice of the fields. The total field count alone isn't enough, as a record with
+    # a field too many and another with a field too few would shift the fields between them.
+    if '"' not in text:
+        lines = text.split('\r\n')
+        separatorCount = columnCount - 1
+        if all(line.count(FIELD_SEPARATOR) == separatorCount for line in lines):
+            fields = FIELD_SEPARATOR.join(lines).split(FIELD_SEPARATOR)
+            return [fields[column::columnCount] for column in range(columnCount)]
+        records = [line.split(FIELD_SEPARATOR) for line in lines]
+    else:
+        records = list(csv.reader(io.StringIO(text, newline=''), delimiter=FIELD_SEPARATOR))
+
+    # Drop any records with the wrong number of fields.
+    if set(map(len, records)) != {columnCount}:
+        goodRecords = [record for record in records if len(record) == columnCount]
+        logger.error(f"{table:25} {'records with wrong field count: ':33}{len(records) - len(goodRecords)}")
+        records = goodRecords
+        if len(records) == 0:
+            return None
+
+    return [list(column) for column in zip(*records)]
+
+
+
+
+
+def readColumnBatches(table, filePathAndName, headerBytes, columnCount, batchRows, useMmap=False):
+
+    # Yields lists of columns, of up to batchRows rows, following the header record.
+    pending = b''
+
+    with open(filePathAndName, 'rb') as f:
+
+        for block in iterBlocks(f, headerBytes, useMmap):
+
+            data = pending + block if pending else block
+            end = getLastRecordEnd(data)
+            if end == 0:
+                pending = data
+                continue
+
+            pending = data[end:]
+            yield from getColumnBatches(parseColumns(table, data[:end], columnCount), batchRows)
+
+        # The last record may not be terminated.
+        yield from getColumnBatches(parseColumns(table, pending, columnCount), batchRows)
+
+
+
+
+
+def getColumnBatches(columns, batchRows):
+
+    if columns is None:
+        return
+    for start in range(0, len(columns[0]), batchRows):
+        yield [column[start:start + batchRows] for column in columns]
+
+
+
+
+
+def toInt(column):
+    return [int(value) if value else None for value in column]
+
+
+def toFloat(column):
+    return [float(value) if value else None for value in column]
+
+
+def toText(column):
+    # Text is loaded as read, so empty fields are loaded as '', as by the standard reader (fileProcessing).
+    return column
+
+
+def toTextEmptyAsNull(column):
+    # Empty fields are loaded as NULL, as by the Bulk Insert.
+    return [value or None for value in column]
+
+
+## Column converters for each column type. Any other column is loaded as text and converted by SQL Server.
+COLUMN_CONVERTERS = {
+    'int'    : toInt,
+    'bigint' : toInt,
+    'bit'    : toInt,
+    'float'  : toFloat,
+}
+
+
+
+
+
+def getColumnConverters(table, header, emptyTextAsNull=False):
+
+    # emptyTextAsNull converts empty text fields as the Bulk Insert does, e.g. for rows it rejected.
+    columnTypes = tableSchema.COLUMN_TYPES.get(table, dict())
+    textConverter = toTextEmptyAsNull if emptyTextAsNull else toText
+    return tuple(COLUMN_CONVERTERS.get(columnTypes.get(column), textConverter) for column in header)
+
+
+
+
+
+def toRowTuples(columns, converters):
+
+    # Convert the columns to their types, then zip them into row value tuples for executemany.
+    return list(zip(*[converter(column) for converter, column in zip(converters, columns)]))
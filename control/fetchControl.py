@@ -0,0 +1,335 @@
+'''
+Purpose:
+
+    This module fetches Claims API pages with adaptive concurrency and page size. See API_ADAPTIVE_FETCH.
+
+    An AIMD (additive increase, multiplicative decrease) controller adjusts, within configured bounds:
+     - The number of requests in flight.
+       Increased by one after each fast, successful response. Halved after a slow response or a 429/5xx.
+     - The page size (per_page).
+       Doubled after a fast, successful response that was within the payload size limit. Halved after a slow
+       response or a 429/5xx.
+
+    Page sizes are taken from a ladder of API_PARAM_PERPAGE doubled or halved, so each size divides the larger
+    sizes. A page is always requested at an item offset that is a multiple of its page size, so the pages
+    remain contiguous as the page size changes. i.e. page = offset / per_page + 1.
+
+    Pages are fetched concurrently but processed one at a time, in page order, on the calling thread.
+    Pagination ends at the first page returning fewer items than its page size.
+
+    The settings chosen are recorded in thisJob['AdaptiveFetch'].
+
+    Pages completed or staged by a failed run of the job aren't fetched again. The job stops at a page partly loaded
+    by a failed run. See utilities/checkpointUtils.py.
+
+Revision History:
+
+    19/10/2026   agent            Stop at a page partly loaded by a failed run.
+    19/10/2026   agent            Only cache the validators of a page, and record it processed, once loaded cleanly.
+    19/10/2026   agent            Parse responses into lazy claim views. See API_LAZY_JSON.
+    19/10/2026   agent            Skip or resume pages checkpointed by a failed run.
+    19/10/2026   agent            Created.
+
+'''
+
+## Standard Libraries
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import logging
+import sys
+import threading
+import time
+
+## Local Libraries
+from control import claimView, request, response
+from utilities import checkpointUtils, logUtils, validatorCache
+
+## Module logger
+logger = logging.getLogger(__name__)
+
+
+## Maximum retries of a page after a 429/5xx response or a connection error.
+MAX_PAGE_RETRIES = 5
+
+## Maximum seconds to wait before retrying a page, when the response gives no Retry-After.
+MAX_RETRY_DELAY_SECONDS = 60
+
+
+
+
+
+class AdaptiveFetchController:
+
+    def __init__(self, thisConfig):
+
+        self.maxConcurrency = thisConfig['API_ADAPTIVE_MAX_CONCURRENCY']
+        self.targetSeconds = thisConfig['API_ADAPTIVE_TARGET_SECONDS']
+        self.maxPageBytes = thisConfig['API_ADAPTIVE_MAX_PAGE_MB'] * 1048576
+
+        # Page size ladder: API_PARAM_PERPAGE halved (while whole) down to the minimum, and doubled up to the maximum.
+        basePerPage = thisConfig['API_PARAM_PERPAGE']
+        self.perPageLadder = [basePerPage]
+        while self.perPageLadder[0] % 2 == 0 and self.perPageLadder[0] // 2 >= thisConfig['API_ADAPTIVE_MIN_PERPAGE']:
+            self.perPageLadder.insert(0, self.perPageLadder[0] // 2)
+        while self.perPageLadder[-1] * 2 <= thisConfig['API_ADAPTIVE_MAX_PERPAGE']:
+            self.perPageLadder.append(self.perPageLadder[-1] * 2)
+
+        self.perPageStep = self.perPageLadder.index(basePerPage)
+        self.concurrency = 1
+        self.history = list()
+
+
+    def record(self, page, perPage, statusCode, latencySeconds, payloadBytes):
+
+        throttled = statusCode is None or statusCode == 429 or statusCode >= 500
+
+        if throttled or latencySeconds > self.targetSeconds:
+            # Multiplicative decrease.
+            self.concurrency = max(1, self.concurrency // 2)
+            self.perPageStep = max(0, self.perPageStep - 1)
+        else:
+            # Additive increase.
+            self.concurrency = min(self.maxConcurrency, self.concurrency + 1)
+            if (latencySeconds < self.targetSeconds / 2
+            and payloadBytes * 2 <= self.maxPageBytes
+            and perPage == self.perPageLadder[self.perPageStep]):
+                self.perPageStep = min(len(self.perPageLadder) - 1, self.perPageStep + 1)
+
+        self.history.append({
+            'Page' : page,
+            'PerPage' : perPage,
+            'StatusCode' : statusCode,
+            'LatencySeconds' : round(latencySeconds, 3),
+            'PayloadBytes' : payloadBytes,
+            'Concurrency' : self.concurrency,
+        })
+
+
+    def getPerPage(self, offset):
+
+        # The largest page size, up to the current target, that the offset is a multiple of.
+        step = self.perPageStep
+        while step > 0 and offset % self.perPageLadder[step] != 0:
+            step -= 1
+        return self.perPageLadder[step]
+
+
+
+
+
+def fetchPage(url, requestHeaders, params, delaySeconds, lazyJson=False):
+
+    # Runs on a worker thread. Returns the response and its parsed JSON, or None for a connection error.
+    if delaySeconds > 0:
+        time.sleep(delaySeconds)
+
+    startTime = time.perf_counter()
+    try:
+        claimsResponse = request.getSession().get(url, headers=requestHeaders, params=params)
+    except:
+        logger.error(f"{'ERROR requesting page':30}: {params['page']}: {sys.exc_info()[1]}")
+        return None, None, time.perf_counter() - startTime
+
+    theJSON = None
+    if claimsResponse.status_code == 200:
+        theJSON = claimView.parseResponse(claimsResponse, lazyJson)
+
+    return claimsResponse, theJSON, time.perf_counter() - startTime
+
+
+
+
+
+def getItemCount(theJSON):
+
+    masterReports = theJSON.get('master_reports') or dict()
+    return len(masterReports.get('items') or list())
+
+
+
+
+
+def getRetryDelay(claimsResponse, attempt):
+
+    # Honour a Retry-After (seconds) header, else back off exponentially.
+    if claimsResponse is not None:
+        retryAfter = claimsResponse.headers.get('Retry-After', '')
+        if retryAfter.isdigit():
+            return int(retryAfter)
+    return min(MAX_RETRY_DELAY_SECONDS, 2 ** attempt)
+
+
+
+
+
+def fetchPagesAdaptively(thisConfig, thisJob, url, requestHeaders):
+
+    controller = AdaptiveFetchController(thisConfig)
+
+    # Offsets are item offsets into the full result set.
+    nextOffset = (thisConfig['API_PARAM_PAGE'] - 1) * thisConfig['API_PARAM_PERPAGE']
+    processOffset = nextOffset
+    endOffset = None
+
+    inFlight = dict()           # future -> (offset, perPage, attempt)
+    retries = list()            # (offset, perPage, attempt, delaySeconds)
+    completed = dict()          # offset -> (perPage, params, claimsResponse, theJSON)
+    checkpointed = dict()       # offset -> (perPage, stagedPage)
+    retryCount = 0
+
+    # Name worker threads after this thread, so log records are routed to the right insurer's log file.
+    executor = ThreadPoolExecutor(max_workers=controller.maxConcurrency, thread_name_prefix=threading.current_thread().name)
+
+    def getParams(offset, perPage):
+        return {
+            'lastUpdated' : thisConfig['API_PARAM_LASTUPDATED']
+           ,'page' : offset // perPage + 1
+           ,'per_page' : perPage
+           ,'stream' : False
+        }
+
+    def submit(offset, perPage, attempt, delaySeconds):
+        params = getParams(offset, perPage)
+        headers = dict(requestHeaders)
+        headers.update(validatorCache.getConditionalHeaders(thisConfig, url, params))
+        future = executor.submit(fetchPage, url, headers, params, delaySeconds, claimView.isLazy(thisConfig))
+        inFlight[future] = (offset, perPage, attempt)
+
+    try:
+        while True:
+
+            # Issue requests, retries first, up to the current concurrency.
+            while len(inFlight) < controller.concurrency and len(retries) > 0:
+                submit(*retries.pop(0))
+            while len(inFlight) < controller.concurrency and (endOffset is None or nextOffset < endOffset):
+
+                # A page completed or staged by a failed run of this job isn't fetched again.
+                checkpointedPage = checkpointUtils.getCheckpointedPage(thisConfig, thisJob, nextOffset)
+                if checkpointedPage is not None:
+                    perPage, stagedPage = checkpointedPage
+                    checkpointed[nextOffset] = checkpointedPage
+                    # The job stops at a partly loaded page (see response.resumeCheckpointedPage), so fetch no further.
+                    if stagedPage is not None and stagedPage.get('PartiallyLoaded'):
+                        endOffset = nextOffset + perPage if endOffset is None else min(endOffset, nextOffset + perPage)
+                    elif stagedPage is not None and stagedPage['ItemCount'] < perPage:
+                        endOffset = nextOffset + stagedPage['ItemCount'] if endOffset is None else min(endOffset, nextOffset + stagedPage['ItemCount'])
+                    nextOffset += perPage
+                    continue
+
+                perPage = controller.getPerPage(nextOffset)
+                submit(nextOffset, perPage, 0, 0)
+                nextOffset += perPage
+
+            if len(inFlight) == 0 and len(retries) == 0 and len(checkpointed) == 0:
+                break
+
+            done, notDone = wait(list(inFlight), return_when=FIRST_COMPLETED)
+
+            for future in done:
+                offset, perPage, attempt = inFlight.pop(future)
+                claimsResponse, theJSON, latencySeconds = future.result()
+                statusCode = claimsResponse.status_code if claimsResponse is not None else None
+                payloadBytes = len(claimsResponse.content) if claimsResponse is not None else 0
+                page = offset // perPage + 1
+
+                controller.record(page, perPage, statusCode, latencySeconds, payloadBytes)
+
+                if statusCode is None or statusCode == 429 or statusCode >= 500:
+                    if attempt < MAX_PAGE_RETRIES:
+                        retryCount += 1
+                        retries.append((offset, perPage, attempt + 1, getRetryDelay(claimsResponse, attempt)))
+                        logger.warning(f"{'Page request retried':30}: Page {page} (per_page {perPage}): Status {statusCode}")
+                    else:
+                        logger.error(f"{'Page request failed':30}: Page {page} (per_page {perPage}): Status {statusCode}")
+                        endOffset = offset if endOffset is None else min(endOffset, offset)
+                        thisJob['FetchIncomplete'] = True
+                        if claimsResponse is not None:
+                            logUtils.logResponseStatusCode(claimsResponse)
+                    continue
+
+                if statusCode == 200:
+                    itemCount = getItemCount(theJSON)
+                elif statusCode == 304:
+                    # Not modified. The page is unchanged, so treat it as a full page.
+                    itemCount = perPage
+                else:
+                    logUtils.logResponseStatusCode(claimsResponse)
+                    endOffset = offset if endOffset is None else min(endOffset, offset)
+                    thisJob['FetchIncomplete'] = True
+                    continue
+
+                # A short page marks the end of the result set.
+                if itemCount < perPage:
+                    endOffset = offset + itemCount if endOffset is None else min(endOffset, offset + itemCount)
+
+                completed[offset] = (perPage, getParams(offset, perPage), claimsResponse, theJSON)
+
+            # Process completed pages in page order.
+            # An empty page at the end of the result set has nothing to process.
+            while ((processOffset in completed or processOffset in checkpointed)
+            and (endOffset is None or processOffset < endOffset)):
+
+                thisJob['CheckpointOffset'] = processOffset
+
+                if processOffset in checkpointed:
+                    perPage, stagedPage = checkpointed.pop(processOffset)
+                    thisJob['CheckpointPerPage'] = perPage
+                    if not response.resumeCheckpointedPage(stagedPage, thisConfig, thisJob):
+                        # Stop at the page that couldn't be resumed. The journal is kept.
+                        endOffset = processOffset
+                        thisJob['FetchIncomplete'] = True
+                        break
+                    processOffset += perPage
+                    continue
+
+                perPage, params, claimsResponse, theJSON = completed.pop(processOffset)
+                thisJob['CheckpointPerPage'] = perPage
+                logUtils.logResponseData(claimsResponse, thisJob)
+                loadedCleanly = True
+                if claimsResponse.status_code == 200:
+                    failedInserts = response.getFailedInserts(thisJob)
+                    response.processResponseHeader(claimsResponse, thisConfig, thisJob, theJSON=theJSON)
+                    # Only cache the validators once the page has been loaded cleanly, so a failed load refetches it.
+                    loadedCleanly = response.getFailedInserts(thisJob) == failedInserts
+                    if loadedCleanly:
+                        validatorCache.storeValidators(thisConfig, url, params, claimsResponse.headers)
+                else:
+                    logger.info(f"{'Page not modified':30}: Page {params['page']} (per_page {perPage})")
+                processOffset += perPage
+                if not loadedCleanly:
+                    # A page that wasn't loaded cleanly isn't recorded as processed, so a rerun refetches it.
+                    # When checkpointing, stop, so its staged files are kept for the rerun.
+                    logger.warning(f"{'Page not loaded cleanly':30}: Page {params['page']} (per_page {perPage})")
+                    thisJob['FetchIncomplete'] = True
+                    if thisJob.get('Checkpoint') is not None:
+                        endOffset = processOffset
+                        break
+                elif not checkpointUtils.recordPageProcessed(thisConfig, thisJob):
+                    # Stop after a page with tables not committed, so its staged files are kept for a rerun.
+                    endOffset = processOffset
+                    thisJob['FetchIncomplete'] = True
+                    break
+
+            # Drop requests beyond the end of the result set, once the end is known.
+            if endOffset is not None:
+                retries = [retry for retry in retries if retry[0] < endOffset]
+                checkpointed = {offset : checkpointedPage for offset, checkpointedPage in checkpointed.items() if offset < endOffset}
+                if processOffset >= endOffset and len(retries) == 0:
+                    break
+
+    finally:
+        for future in inFlight:
+            future.cancel()
+        executor.shutdown(wait=True)
+
+    thisJob['AdaptiveFetch'] = {
+        'Concurrency' : controller.concurrency,
+        'PerPage' : controller.perPageLadder[controller.perPageStep],
+        'PerPageLadder' : controller.perPageLadder,
+        'Requests' : len(controller.history),
+        'Retries' : retryCount,
+        'History' : controller.history,
+    }
+
+    logger.info(f"{'Adaptive fetch settings':30}: Concurrency {controller.concurrency}, per_page {controller.perPageLadder[controller.perPageStep]}, {len(controller.history)} requests, {retryCount} retries")
+
+    return thisJob
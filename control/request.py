@@ -5,6 +5,11 @@ Purpose:
          
 Revision History:
 
+    19/10/2026   agent            Only cache the validators of a response, and record it processed, once loaded cleanly.
+    19/10/2026   agent            Skip or resume pages checkpointed by a failed run. See APP_CHECKPOINT_DIRECTORY.
+    19/10/2026   agent            Added adaptive fetching of pages. See API_ADAPTIVE_FETCH and fetchControl.py.
+    19/10/2026   agent            Negotiate compressed responses and make conditional requests using cached validators.
+    19/10/2026   agent            Share one requests Session (HTTP connection pool) across requests and threads.
     27/08/2020   Mark Schaafsma   Created. 
          
 '''
@@ -12,6 +17,9 @@ Revision History:
 ## Standard Libraries
 # URL request handling module. Not used. The requests module is used instead.
 #import urllib.request 
+import importlib.util
+import logging
+import threading
 
 ## Third Party Libraries
 # Apache2 HTTP library
@@ -20,7 +28,46 @@ import requests
 ## Local Libraries
 from control import response
 #from pyConfig import thisConfig
-from utilities import logUtils
+from utilities import checkpointUtils, logUtils, validatorCache
+
+
+## Create a module logger
+logger = logging.getLogger(__name__)
+
+
+## Shared HTTP session.
+#  A requests Session holds a connection pool, so TCP/TLS connections are reused across calls, and
+#  across insurers when several insurers are processed concurrently. See getSession.
+session = None
+sessionLock = threading.Lock()
+
+## Maximum number of pooled connections per host.
+HTTP_POOL_MAXSIZE = 16
+
+## Response encodings accepted. urllib3 decodes them incrementally as the response body is read.
+#  Brotli is only accepted when a brotli package is installed, as urllib3 can't decode it otherwise.
+#  find_spec checks the package is available without the cost of importing it.
+if importlib.util.find_spec('brotli') is not None or importlib.util.find_spec('brotlicffi') is not None:
+    ACCEPT_ENCODING = 'br, gzip, deflate'
+else:
+    ACCEPT_ENCODING = 'gzip, deflate'
+
+
+
+
+
+def getSession():
+
+    global session
+
+    with sessionLock:
+        if session is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=HTTP_POOL_MAXSIZE, pool_maxsize=HTTP_POOL_MAXSIZE)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+
+    return session
 
 
 
@@ -46,13 +93,40 @@ def setupRequestAndCall(thisConfig, thisJob):
     requestHeaders = {
         'X-Auth-Token' : thisConfig['API_HEADER_AUTH_TOKEN']
        ,'Accept' : thisConfig['API_HEADER_ACCEPT']
+       ,'Accept-Encoding' : ACCEPT_ENCODING
     }
 
+    # Load any checkpoint journal left by a failed run of this job.
+    checkpointUtils.openJournal(thisConfig, thisJob)
+
+    # When adaptive fetching, pages are fetched concurrently, with the concurrency and page size adjusted
+    # from the observed latency, payload size and 429/5xx rate.
+    if thisConfig['API_ADAPTIVE_FETCH'] and not thisConfig['API_PARAM_STREAM']:
+        from control import fetchControl
+        fetchControl.fetchPagesAdaptively(thisConfig, thisJob, url, requestHeaders)
+        checkpointUtils.completeJournal(thisJob)
+        return thisJob
+
+    # Checkpoints identify a page by its item offset and page size.
+    thisJob['CheckpointOffset'] = (thisConfig['API_PARAM_PAGE'] - 1) * thisConfig['API_PARAM_PERPAGE']
+    thisJob['CheckpointPerPage'] = thisConfig['API_PARAM_PERPAGE']
+
+    # A page completed or staged by a failed run of this job isn't fetched again.
+    checkpointedPage = checkpointUtils.getCheckpointedPage(thisConfig, thisJob, thisJob['CheckpointOffset'])
+    if checkpointedPage is not None:
+        if response.resumeCheckpointedPage(checkpointedPage[1], thisConfig, thisJob):
+            checkpointUtils.completeJournal(thisJob)
+        return thisJob
+
+    # Make the request conditional if validators (ETag / Last-Modified) are cached for it.
+    # An unchanged response then returns 304 Not Modified without a body.
+    requestHeaders.update(validatorCache.getConditionalHeaders(thisConfig, url, params))
+
     # Log/Display the request data
     logUtils.logRequestDetails(url, params, requestHeaders)
 
     # Call the API
-    claimsResponse = requests.get(url, headers=requestHeaders, params=params)
+    claimsResponse = getSession().get(url, headers=requestHeaders, params=params)
     
     # Log/Display the response data
     logUtils.logResponseData(claimsResponse, thisJob)
@@ -60,10 +134,25 @@ def setupRequestAndCall(thisConfig, thisJob):
 
     # Handle the response 
     if (claimsResponse.status_code == 200):
+        failedInserts = response.getFailedInserts(thisJob)
         response.processResponseHeader(claimsResponse, thisConfig, thisJob)
+        # Only cache the validators, and record the page as processed, once the response has been loaded cleanly,
+        # so a failed load refetches it.
+        if response.getFailedInserts(thisJob) == failedInserts:
+            validatorCache.storeValidators(thisConfig, url, params, claimsResponse.headers)
+            checkpointUtils.recordPageProcessed(thisConfig, thisJob)
+        else:
+            logger.warning(f"{'Page not loaded cleanly':30}: Offset {thisJob['CheckpointOffset']}")
+            thisJob['FetchIncomplete'] = True
+    elif (claimsResponse.status_code == 304):
+        thisJob['ResponseNotModified'] = True
+        logger.info(f"{'Response not modified':30}: No new claims data since the previous request.")
     else:
         # Log/Display the response status code
         logUtils.logResponseStatusCode(claimsResponse)
+        thisJob['FetchIncomplete'] = True
+
+    checkpointUtils.completeJournal(thisJob)
 
     return thisJob
 
@@ -5,33 +5,66 @@ Purpose:
          
 Revision History:
 
+    19/10/2026   agent            Remove rejected claims from the ClaimHeader set to not current list. Keep the details
+                                  only some of a table's entries have (e.g. RejectedRows) when consolidating them.
+    19/10/2026   agent            Refuse to resume a page partly loaded by a failed run. See checkpointUtils.
+    19/10/2026   agent            Allocate keys, and load the rows, for one insurer at a time. See keyAllocationLock.
+    19/10/2026   agent            Load each table as soon as its staging files are written. See SQL_BULKINSERT_OVERLAP_LOAD.
+    19/10/2026   agent            Batch SINGLE inserts in multi-row statements. See APP_UPDATE_TYPE_SINGLE_BATCH_ROWS.
+    19/10/2026   agent            Parse responses into lazy claim views. See API_LAZY_JSON.
+    19/10/2026   agent            Re-drive rows rejected by the Bulk Insert. See SQL_BULKINSERT_REDRIVE.
+    19/10/2026   agent            Tuned batch sizes for BULK loads. See SQL_BATCH_TUNER_FILE.
+    19/10/2026   agent            Sort staged rows by clustered index key. See SQL_BULKINSERT_ORDERED.
+    19/10/2026   agent            Added table row validation. See APP_VALIDATE_ROWS.
+    19/10/2026   agent            Record checkpoints and resume staged pages. See APP_CHECKPOINT_DIRECTORY.
+    19/10/2026   agent            Collapse duplicate versions of a claim within a response to the latest version.
+    19/10/2026   agent            Added BATCHED update type.
+    19/10/2026   agent            Added compressed transfer of staging files. See SQL_BULKINSERT_COMPRESSION.
+    19/10/2026   agent            Added native format staging files. See SQL_BULKINSERT_FILE_FORMAT.
+    19/10/2026   agent            Added spill to disk table dictionary lists. See APP_BUFFER_MEMORY_BUDGET_MB.
+    19/10/2026   agent            Added chunked processing. See APP_CHUNK_SIZE.
+    19/10/2026   agent            Import the hash and database modules on first use rather than at module load.
+                                  JSON runs only need processResponseHeader, so never load the database drivers.
     27/08/2020   Mark Schaafsma   Created.
          
 '''
 
 ## Standard Libraries
+from concurrent.futures import ThreadPoolExecutor
 import logging
+import operator
 import re
+import threading
+import time
 
 ## Local Libraries
+# Note: control.hash, models.mappings and the database modules are imported within the functions that use them.
+#       This module is loaded for every API job, including JSON runs which never touch the database.
 import constant
-from control import hash
-from database import selectControl, insertControl, updateControl, execute 
-from models import mappings
-from utilities import fileUtils, logUtils
+from control import claimView
+from models import tableSchema
+from utilities import checkpointUtils, fileUtils, logUtils, nativeFormat, spillBuffer, stagingTransfer
 
 ## Create a module logger
 logger = logging.getLogger(__name__)
 
+## Primary and Foreign Keys are allocated from each table's current identity value. Insurers processed concurrently
+#  load the same database, so two insurers allocating keys at once would allocate the same keys. The lock is held
+#  from reading the current identities until the rows using the keys are loaded. See processResponseDetail.
+keyAllocationLock = threading.Lock()
 
 
 
 
-def processResponseHeader(response, thisConfig, thisJob):
+
+def processResponseHeader(response, thisConfig, thisJob, theJSON=None):
     
-    # Convert the response into JSON
+    # Convert the response into JSON, unless already converted by the caller (e.g. on a fetch worker thread).
     # JSON contents can then be accessed like any other Python object/dictionary.
-    theJSON = response.json()
+    # The response is parsed with the fastest JSON backend installed (see jsonUtils).
+    # With API_LAZY_JSON, claims are read-only views, and fields are converted only when read. See claimView.
+    if theJSON is None:
+        theJSON = claimView.parseResponse(response, claimView.isLazy(thisConfig))
 
     # Log/Display response data summary
     logUtils.logResponseSummary(theJSON, thisConfig, thisJob)
@@ -57,6 +90,10 @@ def processResponseHeader(response, thisConfig, thisJob):
 
 def processResponseDetail(theJSON, thisConfig, thisJob):
 
+    from control import hash
+    from database import selectControl, insertControl, updateControl, execute
+    from models import mappings
+
     # Log/Display processing log start
     logUtils.logProcessingLogHeader()
     
@@ -64,6 +101,11 @@ def processResponseDetail(theJSON, thisConfig, thisJob):
     if 'items' in theJSON.get('master_reports'):
         
         claims = theJSON.get('master_reports').get('items')
+        itemCount = len(claims)
+
+        # When lastUpdated windows overlap, or the API returns several versions of a claim, keep only the latest
+        # version of each claim. Avoids mapping and loading versions that would immediately be set to not current.
+        claims = collapseClaimVersions(claims, thisJob)
 
         # For BULK claim insert processing, the application will manage the allocation of the Primary Keys.
         # For SINGLE claim insert processing, the DBMS will can manage the allocation of the Primary Keys.
@@ -86,209 +128,261 @@ def processResponseDetail(theJSON, thisConfig, thisJob):
         #   These dictionaries need to be accessed from different functions and modules through out the application.
         #   So they need to be combined into an overall claims list or claims object in some fashion.
              
-        ClaimObjectList = list()
-        ClaimHeaderList = list()
-        ClaimInsuredList = list()
-        ClaimBrokerList = list()
-        ClaimStatusHistoryList = list()
-        ClaimFeedbackList = list()
-        ClaimMotorDetailList = list()
-        ClaimReserveMovementList = list()
-        ClaimPaymentList = list()
-        ClaimPaymentDetailList = list()
-        ClaimPaymentHistoryList = list()
-        ClaimRecoveryList = list()
-        ClaimRecoveryDetailList = list()
-        ClaimRecoveryHistoryList = list()
-
-        # Setup an overall Claims List to facilitate passing the data around the application 
-        ClaimsList = list()
-        ClaimsList.append(ClaimObjectList)
-        ClaimsList.append(ClaimHeaderList)
-        ClaimsList.append(ClaimInsuredList)
-        ClaimsList.append(ClaimBrokerList)
-        ClaimsList.append(ClaimStatusHistoryList)
-        ClaimsList.append(ClaimMotorDetailList)
-        ClaimsList.append(ClaimFeedbackList)
-        ClaimsList.append(ClaimReserveMovementList)
-        ClaimsList.append(ClaimPaymentList)
-        ClaimsList.append(ClaimPaymentDetailList)
-        ClaimsList.append(ClaimPaymentHistoryList)
-        ClaimsList.append(ClaimRecoveryList)
-        ClaimsList.append(ClaimRecoveryDetailList)
-        ClaimsList.append(ClaimRecoveryHistoryList)
+        # When APP_BUFFER_MEMORY_BUDGET_MB is greater than zero, the table dictionary lists share a memory budget.
+        # Past the budget, rows are spilled to temporary segment files and streamed back when written or loaded.
+        spillBudget = createSpillBudget(thisConfig)
+        # Keys are allocated, and the rows loaded, by one insurer at a time. See keyAllocationLock.
+        keyAllocationLock.acquire()
+        # Segment files are removed however processing ends.
+        try:
+
+            ClaimObjectList = newTableDictList('ClaimObject', spillBudget)
+            ClaimHeaderList = newTableDictList('ClaimHeader', spillBudget)
+            ClaimInsuredList = newTableDictList('ClaimInsured', spillBudget)
+            ClaimBrokerList = newTableDictList('ClaimBroker', spillBudget)
+            ClaimStatusHistoryList = newTableDictList('ClaimStatusHistory', spillBudget)
+            ClaimFeedbackList = newTableDictList('ClaimFeedback', spillBudget)
+            ClaimMotorDetailList = newTableDictList('ClaimMotorDetail', spillBudget)
+            ClaimReserveMovementList = newTableDictList('ClaimReserveMovement', spillBudget)
+            ClaimPaymentList = newTableDictList('ClaimPayment', spillBudget)
+            ClaimPaymentDetailList = newTableDictList('ClaimPaymentDetail', spillBudget)
+            ClaimPaymentHistoryList = newTableDictList('ClaimPaymentHistory', spillBudget)
+            ClaimRecoveryList = newTableDictList('ClaimRecovery', spillBudget)
+            ClaimRecoveryDetailList = newTableDictList('ClaimRecoveryDetail', spillBudget)
+            ClaimRecoveryHistoryList = newTableDictList('ClaimRecoveryHistory', spillBudget)
+
+            # Setup an overall Claims List to facilitate passing the data around the application 
+            ClaimsList = list()
+            ClaimsList.append(ClaimObjectList)
+            ClaimsList.append(ClaimHeaderList)
+            ClaimsList.append(ClaimInsuredList)
+            ClaimsList.append(ClaimBrokerList)
+            ClaimsList.append(ClaimStatusHistoryList)
+            ClaimsList.append(ClaimMotorDetailList)
+            ClaimsList.append(ClaimFeedbackList)
+            ClaimsList.append(ClaimReserveMovementList)
+            ClaimsList.append(ClaimPaymentList)
+            ClaimsList.append(ClaimPaymentDetailList)
+            ClaimsList.append(ClaimPaymentHistoryList)
+            ClaimsList.append(ClaimRecoveryList)
+            ClaimsList.append(ClaimRecoveryDetailList)
+            ClaimsList.append(ClaimRecoveryHistoryList)
+
+            # Earlier versions of the claims processed, to be set to not current once the ClaimHeader rows are inserted.
+            # Appended to by the claim key management processing. When chunked, applied and cleared with each chunk.
+            ClaimHeaderSetToNotCurrentList = list()
 
 
            
-        # To initiate management of Primary and Foreign Keys, get the last identity value
-        # (Primary Key) inserted into each table and increment it by the table Identity Increment.
-        # We know for this database all tables are using an Identity Increment of 1 and this is
-        # unlikely to change.
-        identityIncrement = 1
+            # To initiate management of Primary and Foreign Keys, get the last identity value
+            # (Primary Key) inserted into each table and increment it by the table Identity Increment.
+            # We know for this database all tables are using an Identity Increment of 1 and this is
+            # unlikely to change.
+            identityIncrement = 1
         
-        # Log/Display Current Identities processing start.
-        logUtils.logCurrentIdentityHeader()
+            # Log/Display Current Identities processing start.
+            logUtils.logCurrentIdentityHeader()
 
-        # Set the primary key to be used for each table.
-        claimId = int(selectControl.getCurrentIdentity('ClaimHeader', thisConfig) + identityIncrement)
-        claimInsuredId = int(selectControl.getCurrentIdentity('ClaimInsured', thisConfig) + identityIncrement)
-        claimBrokerId = int(selectControl.getCurrentIdentity('ClaimBroker', thisConfig) + identityIncrement)
-        claimStatusHistoryId = int(selectControl.getCurrentIdentity('ClaimStatusHistory', thisConfig) + identityIncrement)
-        claimFeedbackId = int(selectControl.getCurrentIdentity('ClaimFeedback', thisConfig) + identityIncrement)
-        claimMotorDetailId = int(selectControl.getCurrentIdentity('ClaimMotorDetail', thisConfig) + identityIncrement)
-        claimReserveMovementId = int(selectControl.getCurrentIdentity('ClaimReserveMovement', thisConfig) + identityIncrement)
-        claimPaymentId = int(selectControl.getCurrentIdentity('ClaimPayment', thisConfig) + identityIncrement)
-        claimPaymentDetailId = int(selectControl.getCurrentIdentity('ClaimPaymentDetail', thisConfig) + identityIncrement)
-        claimPaymentHistoryId = int(selectControl.getCurrentIdentity('ClaimPaymentHistory', thisConfig) + identityIncrement)
-        claimRecoveryId = int(selectControl.getCurrentIdentity('ClaimRecovery', thisConfig) + identityIncrement)
-        claimRecoveryDetailId = int(selectControl.getCurrentIdentity('ClaimRecoveryDetail', thisConfig) + identityIncrement)
-        claimRecoveryHistoryId = int(selectControl.getCurrentIdentity('ClaimRecoveryHistory', thisConfig) + identityIncrement)
+            # Set the primary key to be used for each table.
+            claimId = int(selectControl.getCurrentIdentity('ClaimHeader', thisConfig) + identityIncrement)
+            claimInsuredId = int(selectControl.getCurrentIdentity('ClaimInsured', thisConfig) + identityIncrement)
+            claimBrokerId = int(selectControl.getCurrentIdentity('ClaimBroker', thisConfig) + identityIncrement)
+            claimStatusHistoryId = int(selectControl.getCurrentIdentity('ClaimStatusHistory', thisConfig) + identityIncrement)
+            claimFeedbackId = int(selectControl.getCurrentIdentity('ClaimFeedback', thisConfig) + identityIncrement)
+            claimMotorDetailId = int(selectControl.getCurrentIdentity('ClaimMotorDetail', thisConfig) + identityIncrement)
+            claimReserveMovementId = int(selectControl.getCurrentIdentity('ClaimReserveMovement', thisConfig) + identityIncrement)
+            claimPaymentId = int(selectControl.getCurrentIdentity('ClaimPayment', thisConfig) + identityIncrement)
+            claimPaymentDetailId = int(selectControl.getCurrentIdentity('ClaimPaymentDetail', thisConfig) + identityIncrement)
+            claimPaymentHistoryId = int(selectControl.getCurrentIdentity('ClaimPaymentHistory', thisConfig) + identityIncrement)
+            claimRecoveryId = int(selectControl.getCurrentIdentity('ClaimRecovery', thisConfig) + identityIncrement)
+            claimRecoveryDetailId = int(selectControl.getCurrentIdentity('ClaimRecoveryDetail', thisConfig) + identityIncrement)
+            claimRecoveryHistoryId = int(selectControl.getCurrentIdentity('ClaimRecoveryHistory', thisConfig) + identityIncrement)
 
-        # Log/Display Data Validation and Mapping processing start.
-        logUtils.logDataValidationHeader()
+            # Log/Display Data Validation and Mapping processing start.
+            logUtils.logDataValidationHeader()
 
-        # For each database table, load data into a corresponding dictionary.
-        # Then depending on whether SINGLE or BULK processing, save the dictionary in a list,
-        # or use the dictionary values to immediately insert a table row.
-        # ======================================================================================
+            # For each database table, load data into a corresponding dictionary.
+            # Then depending on whether SINGLE or BULK processing, save the dictionary in a list,
+            # or use the dictionary values to immediately insert a table row.
+            # ======================================================================================
 
-        for claim in claims:
+            # Chunked processing:
+            # When APP_CHUNK_SIZE is greater than zero, the table dictionary lists are written, loaded and
+            # then cleared every APP_CHUNK_SIZE claims, so memory use is bounded by the chunk size rather
+            # than the response size. The remaining claims are written and loaded after the loop as usual.
+            # The Primary Key variables above are not reset between chunks, so key allocation continues
+            # across chunks as if the response had been processed in one pass.
+            chunkSize = thisConfig['APP_CHUNK_SIZE']
+            claimCount = 0
 
-            # Setup a dictionary to store hash values for each dictionary in the claim. 
-            ClaimObjectHashDict = dict()
+            for claim in claims:
 
-            # ClaimHeader processing
-            # ----------------------
-            # processing removed
+                claimCount += 1
 
+                # Setup a dictionary to store hash values for each dictionary in the claim. 
+                ClaimObjectHashDict = dict()
 
+                # ClaimHeader processing
+                # ----------------------
+                # processing removed
 
-            # ClaimInsured processing
-            # -----------------------
-            # processing removed
 
 
+                # ClaimInsured processing
+                # -----------------------
+                # processing removed
 
-            # ClaimBroker processing
-            # ----------------------
-            # processing removed
 
 
+                # ClaimBroker processing
+                # ----------------------
+                # processing removed
 
-            # ClaimStatusHistory processing
-            # -----------------------------
-            # processing removed
 
 
+                # ClaimStatusHistory processing
+                # -----------------------------
+                # processing removed
 
-            # ClaimMotorDetail processing
-            # ---------------------------
-            # processing removed
 
 
+                # ClaimMotorDetail processing
+                # ---------------------------
+                # processing removed
 
-            # ClaimFeedback processing
-            # ------------------------
-            # processing removed
 
 
+                # ClaimFeedback processing
+                # ------------------------
+                # processing removed
 
-            # ClaimReserveMovement processing
-            # -------------------------------
-            # processing removed
 
 
+                # ClaimReserveMovement processing
+                # -------------------------------
+                # processing removed
 
-            # ClaimPayment processing
-            # -----------------------
-            # processing removed
 
 
-                    # ClaimPaymentDetail processing
-                    # -----------------------------                    
-                    # processing removed
+                # ClaimPayment processing
+                # -----------------------
+                # processing removed
 
 
+                        # ClaimPaymentDetail processing
+                        # -----------------------------                    
+                        # processing removed
 
-                    # ClaimPaymentHistory processing
-                    # ------------------------------
-                    # processing removed
 
 
+                        # ClaimPaymentHistory processing
+                        # ------------------------------
+                        # processing removed
 
-            # ClaimRecovery processing
-            #-------------------------
-            # processing removed
 
 
-                    # ClaimRecoveryDetail processing
-                    # ------------------------------
-                    # processing removed
+                # ClaimRecovery processing
+                #-------------------------
+                # processing removed
 
 
+                        # ClaimRecoveryDetail processing
+                        # ------------------------------
+                        # processing removed
 
-                    # ClaimRecoveryHistory processing
-                    # -------------------------------
-            # processing removed
 
 
+                        # ClaimRecoveryHistory processing
+                        # -------------------------------
+                # processing removed
 
-            # Claim key management processing
-            #--------------------------------
-            # processing removed
 
 
+                # Claim key management processing
+                #--------------------------------
+                # processing removed
 
 
-        # --- End of claim in claims for loop --- #      
 
+                # Chunked processing
+                #-------------------
+                if chunkSize > 0 and claimCount % chunkSize == 0:
+                    logger.info(f"{'Processing claims chunk':30}: Claims {claimCount - chunkSize + 1} to {claimCount}")
+                    processClaimsListChunk(ClaimsList, ClaimHeaderSetToNotCurrentList, thisConfig, thisJob)
 
-        # Write Table Dictionary Lists to the file system.
-        # For Bulk Insert, this is required before database processing.
-        processTableDictListsWritingToFile(ClaimsList, thisConfig)                
 
 
-        # From this point the application starts working with the database.
-        # For simplicity, and to maximize the likelihood of successfully updating the database,
-        # pessimistic concurrency control could be used.
-        #
-        # The following table presents the isolation level options available:
-        #
-        #   Isolation level      Dirty read    Non-Repeatable read    Phantom
-        #   Read uncommitted        Yes             Yes                 Yes
-        #   Read committed          No              Yes                 Yes
-        #   Repeatable read         No              No                  Yes
-        #   Snapshot                No              No                  No
-        #   Serializable            No              No                  No
-        # 
-        # When the isolation level is specified, the locking behavior for all queries and data manipulation language (DML)
-        # statements in the SQL Server session operates at that isolation level. The isolation level remains in effect until
-        # the session terminates or until the isolation level is set to another level.
-        #
-        # Isolation level Serializable provides the most pessimistic concurrency and is the intended level to be used.
-        #
-        # For more info see: https://docs.microsoft.com/en-us/sql/relational-databases/sql-server-transaction-locking-and-row-versioning-guide
-        #
-        # Note: This comment is currently located within the response.py module, but applies to the filePprocessing.py module too.
-        #       So if implemented, needs to be setup elsewhere, execute.py perhaps, and called from each module as appropriate.    
-        #
-        #
-        #    SET TRANSACTION ISOLATION LEVEL SERIALIZABLE;  
-        #    GO  
-        #    BEGIN TRANSACTION; 
-        #
-        #        -- processing --
-        #
 
-        # Perform Insert processing
-        processTableDictListsPerformingInserts(ClaimsList, thisConfig, thisJob)
+            # --- End of claim in claims for loop --- #      
 
-        # Perform Update processing
-        processTableDictListsPerformingUpdates(ClaimHeaderSetToNotCurrentList, thisConfig, thisJob)
 
-        #
-        #    END TRANSACTION;
-        #
+            # Validate the Table Dictionary Lists, removing any rows rejected.
+            processTableDictListsValidating(ClaimsList, ClaimHeaderSetToNotCurrentList, thisConfig, thisJob)
+
+            # Write Table Dictionary Lists to the file system.
+            # For Bulk Insert, this is required before database processing.
+            # When overlapped (SQL_BULKINSERT_OVERLAP_LOAD), each table is loaded as soon as its files are written.
+            if isLoadOverlapped(thisConfig):
+                processTableDictListsStagingAndLoading(ClaimsList, thisConfig, thisJob)
+            else:
+                processTableDictListsWritingToFile(ClaimsList, thisConfig, thisJob)                
+
+            # Record the page as staged, so a rerun after a failure can load its tables from the staged files.
+            if checkpointUtils.isTableResumable(thisConfig):
+                checkpointUtils.recordPageStaged(thisJob, itemCount, ClaimHeaderSetToNotCurrentList)
+
+            # From this point the application starts working with the database.
+            # For simplicity, and to maximize the likelihood of successfully updating the database,
+            # pessimistic concurrency control could be used.
+            #
+            # The following table presents the isolation level options available:
+            #
+            #   Isolation level      Dirty read    Non-Repeatable read    Phantom
+            #   Read uncommitted        Yes             Yes                 Yes
+            #   Read committed          No              Yes                 Yes
+            #   Repeatable read         No              No                  Yes
+            #   Snapshot                No              No                  No
+            #   Serializable            No              No                  No
+            # 
+            # When the isolation level is specified, the locking behavior for all queries and data manipulation language (DML)
+            # statements in the SQL Server session operates at that isolation level. The isolation level remains in effect until
+            # the session terminates or until the isolation level is set to another level.
+            #
+            # Isolation level Serializable provides the most pessimistic concurrency and is the intended level to be used.
+            #
+            # For more info see: https://docs.microsoft.com/en-us/sql/relational-databases/sql-server-transaction-locking-and-row-versioning-guide
+            #
+            # Note: This comment is currently located within the response.py module, but applies to the filePprocessing.py module too.
+            #       So if implemented, needs to be setup elsewhere, execute.py perhaps, and called from each module as appropriate.    
+            #
+            #
+            #    SET TRANSACTION ISOLATION LEVEL SERIALIZABLE;  
+            #    GO  
+            #    BEGIN TRANSACTION; 
+            #
+            #        -- processing --
+            #
+
+            # Perform Insert processing. When overlapped, the tables have already been loaded.
+            if not isLoadOverlapped(thisConfig):
+                processTableDictListsPerformingInserts(ClaimsList, thisConfig, thisJob)
+
+            # When chunked, combine each chunk's table details into one entry per table.
+            consolidateTableDetails(thisJob)
+
+            # Perform Update processing
+            processTableDictListsPerformingUpdates(ClaimHeaderSetToNotCurrentList, thisConfig, thisJob)
+
+            #
+            #    END TRANSACTION;
+            #
+
+        finally:
+            keyAllocationLock.release()
+            # Remove any segment files spilled to disk.
+            if spillBudget is not None:
+                logger.info(f"{'Table rows spilled to disk (MB)':30}: {spillBudget.spilledBytes / 1048576:.1f}")
+                spillBudget.close()
 
 
     else:
@@ -298,14 +392,174 @@ def processResponseDetail(theJSON, thisConfig, thisJob):
 
 
 
-def processTableDictListsWritingToFile(ClaimsList, thisConfig):
+def collapseClaimVersions(claims, thisJob):
+
+    # Keep the latest version of each claim, keyed on claim number, by last updated time.
+    # The claims kept retain their relative order in the response. Where two versions have the same
+    # last updated time, the later one in the response is kept.
+    #
+    # Note: Last updated times are ISO 8601 UTC strings (YYYY-MM-DDThh:mm:ss.mmmZ), so compare as strings.
+
+    latestIndexByClaimNo = dict()
+
+    for index, claim in enumerate(claims):
+        claimNo = claim.get(constant.API_CLAIM_NUMBER_KEY)
+        if claimNo is None:
+            continue
+        latestIndex = latestIndexByClaimNo.get(claimNo)
+        if (latestIndex is None
+        or (claim.get(constant.API_CLAIM_LASTUPDATED_KEY) or '') >= (claims[latestIndex].get(constant.API_CLAIM_LASTUPDATED_KEY) or '')):
+            latestIndexByClaimNo[claimNo] = index
+
+    keptIndexes = set(latestIndexByClaimNo.values())
+    collapsedClaims = [claim for index, claim in enumerate(claims)
+                       if index in keptIndexes or claim.get(constant.API_CLAIM_NUMBER_KEY) is None]
+
+    duplicatesDropped = len(claims) - len(collapsedClaims)
+    thisJob['DuplicateClaimsDropped'] = thisJob.get('DuplicateClaimsDropped', 0) + duplicatesDropped
+
+    if duplicatesDropped > 0:
+        logger.info(f"{'Duplicate claim versions dropped':30}: {duplicatesDropped} of {len(claims)}")
+
+    return collapsedClaims
+
+
+
+
+
+def createSpillBudget(thisConfig):
+
+    if thisConfig['APP_BUFFER_MEMORY_BUDGET_MB'] <= 0:
+        return None
+
+    return spillBuffer.SpillBudget(thisConfig['APP_BUFFER_MEMORY_BUDGET_MB'] * 1048576, thisConfig['APP_BUFFER_SPILL_DIRECTORY'])
+
+
+
+
+
+def newTableDictList(table, spillBudget):
+
+    return spillBuffer.newTableDictList(table, spillBudget)
+
+
+
+
+
+def processClaimsListChunk(ClaimsList, ClaimHeaderSetToNotCurrentList, thisConfig, thisJob):
+
+    # Write and load the table dictionary lists for the claims processed so far, and apply the chunk's
+    # ClaimHeader updates, then clear the lists ready for the next chunk.
+    # The lists are cleared in place as ClaimsList and the caller hold references to them.
+
+    tableList = [determineTableBeingProcessed(ClaimsTableDictList) for ClaimsTableDictList in ClaimsList if len(ClaimsTableDictList) > 0]
+
+    processTableDictListsValidating(ClaimsList, ClaimHeaderSetToNotCurrentList, thisConfig, thisJob)
+
+    if isLoadOverlapped(thisConfig):
+        processTableDictListsStagingAndLoading(ClaimsList, thisConfig, thisJob)
+    else:
+        processTableDictListsWritingToFile(ClaimsList, thisConfig, thisJob)
+        processTableDictListsPerformingInserts(ClaimsList, thisConfig, thisJob)
+
+    consolidateTableDetails(thisJob)
+
+    # The Bulk Insert fails if its ERRORFILE already exists, so move this chunk's error files aside
+    # for the next chunk's load of each table.
+    if thisConfig['APP_UPDATE_TYPE'].upper() == constant.BULK_UPDATE_TYPE:
+        from control import bulkErrorProcessing
+        path = fileUtils.getPathDetails(thisConfig)
+        for table in tableList:
+            bulkErrorProcessing.archiveLoadErrorFiles(table, f"{path}{table}")
+
+    processTableDictListsPerformingUpdates(ClaimHeaderSetToNotCurrentList, thisConfig, thisJob)
+    ClaimHeaderSetToNotCurrentList.clear()
+
+    for ClaimsTableDictList in ClaimsList:
+        ClaimsTableDictList.clear()
+
+
+
+
+
+def getFailedInserts(thisJob):
+
+    # The failed inserts of the job so far, over all tables. A page loaded cleanly leaves this unchanged.
+    return sum(tableDetail.get('FailedInserts', 0) for tableDetail in thisJob.get('TableDetails', list()))
+
+
+
+
+
+def consolidateTableDetails(thisJob):
+
+    # Each insert call records a table detail entry in thisJob['TableDetails'].
+    # When processing in chunks there is one entry per table per chunk, so combine them into one entry per table,
+    # summing the counts, so that per table reconciliation (e.g. FailedInserts) covers all chunks.
+
+    consolidatedTableDetails = list()
+    tableDetailsByTable = dict()
+
+    for tableDetail in thisJob['TableDetails']:
+
+        if tableDetail['ClaimTable'] not in tableDetailsByTable:
+            tableDetailsByTable[tableDetail['ClaimTable']] = tableDetail
+            consolidatedTableDetails.append(tableDetail)
+            continue
+
+        consolidatedTableDetail = tableDetailsByTable[tableDetail['ClaimTable']]
+        for key, value in tableDetail.items():
+            if key not in consolidatedTableDetail:
+                consolidatedTableDetail[key] = value
+            elif (isinstance(value, (int, float)) and not isinstance(value, bool)
+            and isinstance(consolidatedTableDetail[key], (int, float))):
+                consolidatedTableDetail[key] += value
+
+    thisJob['TableDetails'] = consolidatedTableDetails
+
+
+
+
+
+def processTableDictListsValidating(ClaimsList, ClaimHeaderSetToNotCurrentList, thisConfig, thisJob):
+
+    # Validate each table dictionary list against the rules declared in tableSchema.VALIDATION_RULES.
+    # Rows failing validation are removed in place, and written to the table's rejects file.
+    # The lists are in table order, so a rejected parent row's child rows are rejected with it.
+    # The claims of rejected ClaimHeader rows are removed from ClaimHeaderSetToNotCurrentList, in place.
+    if not thisConfig['APP_VALIDATE_ROWS']:
+        return
+
+    from control import validation
+
+    path = fileUtils.getPathDetails(thisConfig)
+    rejectedKeys = dict()
+
+    for ClaimsTableDictList in ClaimsList:
+
+        if len(ClaimsTableDictList) > 0:
+
+            table = determineTableBeingProcessed(ClaimsTableDictList)
+            validation.rejectInvalidRows(table, ClaimsTableDictList, path, thisJob, rejectedKeys)
+
+    validation.removeRejectedClaims(ClaimHeaderSetToNotCurrentList, rejectedKeys)
+
+
+
+
+
+def processTableDictListsWritingToFile(ClaimsList, thisConfig, thisJob):
 
     # Write each table dictionary list to a data "csv" file
 
+    # BATCHED loads directly from the table dictionary lists, so no staging files are required.
+    if thisConfig['APP_UPDATE_TYPE'].upper() == constant.BATCHED_UPDATE_TYPE:
+        return
+
     # Log/Display csv file processing start
     logUtils.logCsvFileHeader()
 
-    path = fileUtils.getPathDetails(thisConfig)
+    path, sharePath = getStagingPaths(thisConfig)
 
     # Data "csv" files will overwrite previous files in the same location.
     # However, this job will fail if previous error files (from Bulk Insert processing) still exist.
@@ -321,32 +575,112 @@ def processTableDictListsWritingToFile(ClaimsList, thisConfig):
         if len(ClaimsTableDictList) > 0:
             
             table = determineTableBeingProcessed(ClaimsTableDictList)
-                
-            # Append table name to path but don't add file suffix.
-            # Suffixes "csv" and "err" will be added later by the SQL preparation processing.
-            pathWithFileName = f"{path}{table}"
+            writeTableStagingFiles(table, ClaimsTableDictList, path, sharePath, thisConfig, thisJob)
 
-            # Translate Python boolean (True/False) values to SQL Server bit (1/0) values required by the Bulk Insert.
-            translatedClaimsTableDictList = translateFieldsForBulkInsertFileFormat(table, ClaimsTableDictList)
 
-            # Write the table dictionary to a data (csv) file (in the format required by SQL Server Bulk Insert).
-            # This format is also works with 'CSV'/'Single' record processing, but not 'CSV'/'Many' record processing.
-            # For 'CSV'/'Many' processing, the csv file will need to be transalted to the required format.  
-            fileUtils.writeDictListToCsvFile(translatedClaimsTableDictList, table, pathWithFileName)
 
-            # Alternatively, can write in different formats depending on the type of processing being run.
-            # Probably simpler to write in one format and handle that format depending on the type of processing
-            # requested when feeding the csv files back in.
-            # So the following code is commented out. 
 
-            # if thisConfig['APP_UPDATE_TYPE'].upper() == constant.MANY_UPDATE_TYPE:
-            #     # Write the table dictionary to a data (csv) file (in the format required by pyodbc.executemany).
-            #     fileUtils.writeDictListToCsvFile(ClaimsTableDictList, table, pathWithFileName)
-            # else:
-            #     # Translate Python boolean (True/False) values to SQL Server bit (1/0) values required by the Bulk Insert.
-            #     translatedClaimsTableDictList = translateFieldsForBulkInsertFileFormat(table, ClaimsTableDictList)
-            #     # Write the table dictionary to a data (csv) file (in the format required by SQL Server Bulk Insert).
-            #     fileUtils.writeDictListToCsvFile(translatedClaimsTableDictList, table, pathWithFileName)
+
+def getStagingPaths(thisConfig):
+
+    # Returns the path staging files are written to, and the share path they are transferred to when compressed
+    # (None when not compressed).
+    path = fileUtils.getPathDetails(thisConfig)
+
+    # When staging files are compressed, write them locally first. They are then compressed and transferred to the share.
+    if thisConfig['SQL_BULKINSERT_COMPRESSION'].upper() == constant.GZIP_COMPRESSION:
+        return fileUtils.getPathDetails(thisConfig, 'SQL_BULKINSERT_LOCAL_FILEPATH'), path
+
+    return path, None
+
+
+
+
+
+def writeTableStagingFiles(table, ClaimsTableDictList, path, sharePath, thisConfig, thisJob):
+
+    # Append table name to path but don't add file suffix.
+    # Suffixes "csv" and "err" will be added later by the SQL preparation processing.
+    pathWithFileName = f"{path}{table}"
+
+    # Stage the rows in clustered index key order, to match the ORDER hint given to the Bulk Insert.
+    # Tables that couldn't be staged in order are recorded in thisJob['UnorderedTables'], so get no ORDER hint.
+    if thisConfig['SQL_BULKINSERT_ORDERED']:
+        if not sortTableDictListByClusteredKey(table, ClaimsTableDictList):
+            thisJob.setdefault('UnorderedTables', set()).add(table)
+
+    if thisConfig['SQL_BULKINSERT_FILE_FORMAT'].upper() == constant.NATIVE_FILE_FORMAT:
+
+        # Write the table dictionary to a native format data (dat) file and format (fmt) file.
+        # Each row is given the same translation as the csv files, for its defaults (e.g. IsCurrentVersion None is 1).
+        nativeFormat.writeDictListToNativeFile(ClaimsTableDictList, table, pathWithFileName,
+            translate=lambda d: translateDictForBulkInsertFileFormat(table, d))
+        suffixes = ('fmt', 'dat')
+
+    else:
+
+        # Translate Python boolean (True/False) values to SQL Server bit (1/0) values required by the Bulk Insert.
+        translatedClaimsTableDictList = translateFieldsForBulkInsertFileFormat(table, ClaimsTableDictList)
+
+        # Write the table dictionary to a data (csv) file (in the format required by SQL Server Bulk Insert).
+        # This format is also works with 'CSV'/'Single' record processing, but not 'CSV'/'Many' record processing.
+        # For 'CSV'/'Many' processing, the csv file will need to be transalted to the required format.  
+        fileUtils.writeDictListToCsvFile(translatedClaimsTableDictList, table, pathWithFileName, keys=tuple(ClaimsTableDictList[0]))
+        suffixes = ('csv',)
+
+    # Compress and transfer the staging files to the share.
+    # The transfer for each file is recorded in thisJob['StagingTransfers'].
+    # A table whose files weren't all transferred is recorded in thisJob['FailedTransfers'], so it isn't loaded.
+    if sharePath is not None:
+        transferred = [stagingTransfer.transferCompressedFile(f"{pathWithFileName}.{suffix}", sharePath, table, thisJob) for suffix in suffixes]
+        if not all(transferred):
+            thisJob.setdefault('FailedTransfers', set()).add(table)
+
+    # Record each staging file, with its checksum, in the checkpoint journal.
+    if checkpointUtils.isTableResumable(thisConfig):
+        for suffix in suffixes:
+            checkpointUtils.recordFileStaged(thisJob, table, pathWithFileName, f"{pathWithFileName}.{suffix}")
+
+    # Alternatively, can write in different formats depending on the type of processing being run.
+    # Probably simpler to write in one format and handle that format depending on the type of processing
+    # requested when feeding the csv files back in.
+    # So the following code is commented out. 
+
+    # if thisConfig['APP_UPDATE_TYPE'].upper() == constant.MANY_UPDATE_TYPE:
+    #     # Write the table dictionary to a data (csv) file (in the format required by pyodbc.executemany).
+    #     fileUtils.writeDictListToCsvFile(ClaimsTableDictList, table, pathWithFileName)
+    # else:
+    #     # Translate Python boolean (True/False) values to SQL Server bit (1/0) values required by the Bulk Insert.
+    #     translatedClaimsTableDictList = translateFieldsForBulkInsertFileFormat(table, ClaimsTableDictList)
+    #     # Write the table dictionary to a data (csv) file (in the format required by SQL Server Bulk Insert).
+    #     fileUtils.writeDictListToCsvFile(translatedClaimsTableDictList, table, pathWithFileName)
+
+
+
+
+
+def sortTableDictListByClusteredKey(table, ClaimsTableDictList):
+
+    # Returns True if the rows are (now) in clustered key order.
+    keyGetter = operator.itemgetter(*tableSchema.CLUSTERED_KEY_COLUMNS[table])
+
+    # Keys are allocated in the order rows are appended, so the rows are normally already sorted.
+    # A table spilled to disk is never read back into memory to be sorted, so just check its order as it is
+    # streamed back. If it isn't sorted, it is staged as it is, and loaded without the ORDER hint.
+    if isinstance(ClaimsTableDictList, spillBuffer.SpillTableList):
+        previousKey = None
+        for row in ClaimsTableDictList:
+            key = keyGetter(row)
+            if previousKey is not None and key < previousKey:
+                logger.warning(f"{table:25} {'rows not in key order, unsorted: ':33}{len(ClaimsTableDictList)}")
+                return False
+            previousKey = key
+        return True
+
+    # Sorting rows already in order takes a single pass.
+    ClaimsTableDictList.sort(key=keyGetter)
+
+    return True
 
 
 
@@ -354,6 +688,11 @@ def processTableDictListsWritingToFile(ClaimsList, thisConfig):
 
 def processTableDictListsPerformingInserts(ClaimsList, thisConfig, thisJob):
 
+    from database import batchTuner, insertControl
+
+    # From here the page may be partly loaded, so a rerun refuses it rather than loading its rows again.
+    checkpointUtils.recordPageLoadStarted(thisConfig, thisJob)
+
     logUtils.logInsertProcessingHeader()
 
     # Create a tableList while processing the ClaimsTableDictList
@@ -368,31 +707,268 @@ def processTableDictListsPerformingInserts(ClaimsList, thisConfig, thisJob):
             table = determineTableBeingProcessed(ClaimsTableDictList)
             tableList.append(table)
 
+            # The MANY and SINGLE inserts require the rows in memory. For a table dictionary list spilled to disk,
+            # read the rows back one table at a time, so at most one table is held in memory at once.
+            if (isinstance(ClaimsTableDictList, spillBuffer.SpillTableList)
+            and thisConfig['APP_UPDATE_TYPE'].upper() != constant.BULK_UPDATE_TYPE
+            and thisConfig['APP_UPDATE_TYPE'].upper() != constant.BATCHED_UPDATE_TYPE):
+                ClaimsTableDictList = list(ClaimsTableDictList)
+
             if thisConfig['APP_UPDATE_TYPE'].upper() == constant.BULK_UPDATE_TYPE:
 
-                # Append table name to path but don't add file suffix.
-                # Suffixes "csv" and "err" will be added later by the SQL preparation processing.
-                filepath = f"{path}{table}"
-                
                 # Now run the bulk inserts using the file as input.
-                insertControl.insertBulkClaimTableRows(table, filepath, thisConfig, thisJob)
+                loadBulkTable(table, len(ClaimsTableDictList), batchTuner.estimateRowBytes(ClaimsTableDictList), path, thisConfig, thisJob)
+
+
+            if thisConfig['APP_UPDATE_TYPE'].upper() == constant.BATCHED_UPDATE_TYPE:
+
+                # Insert the rows from the dictionaries over the database connection in batches. No staging file required.
+                from database import batchedInsertControl
+                batchedInsertControl.insertBatchedClaimTableRows(table, ClaimsTableDictList, thisConfig, thisJob)
 
 
             if thisConfig['APP_UPDATE_TYPE'].upper() == constant.MANY_UPDATE_TYPE:
 
                 # Run fast_executemany inserts using the dictionaries as input.
+                # The whole table is passed in one call, so it is loaded all-or-nothing. The batch tuner doesn't apply.
                 insertControl.insertManyClaimTableRows(table, ClaimsTableDictList, thisConfig, thisJob)
 
 
             if thisConfig['APP_UPDATE_TYPE'].upper() == constant.SINGLE_UPDATE_TYPE:
 
                 # Run standard inserts using the dictionaries as input.
-                insertControl.insertClaimTableRow(table, ClaimsTableDictList, thisConfig, thisJob)
+                # When batched, in multi-row inserts, isolating the rows that fail.
+                if thisConfig['APP_UPDATE_TYPE_SINGLE_BATCH_ROWS'] > 1:
+                    from database import multiRowInsertControl
+                    multiRowInsertControl.insertMultiRowClaimTableRows(table, ClaimsTableDictList, thisConfig, thisJob)
+                else:
+                    insertControl.insertClaimTableRow(table, ClaimsTableDictList, thisConfig, thisJob)
 
 
         
 
 
+def loadBulkTable(table, rowCount, rowBytes, path, thisConfig, thisJob):
+
+    from control import bulkErrorProcessing
+    from database import batchTuner, bulkInsertOptions
+
+    # Append table name to path but don't add file suffix.
+    # Suffixes "csv" and "err" will be added later by the SQL preparation processing.
+    filepath = f"{path}{table}"
+    
+    # When staging files are compressed, wait for them to be expanded next to the server.
+    # If they weren't transferred, or weren't expanded in time, the files next to the server may be missing or
+    # left from an earlier load, so don't load them.
+    if thisConfig['SQL_BULKINSERT_COMPRESSION'].upper() == constant.GZIP_COMPRESSION:
+        if table in thisJob.get('FailedTransfers', set()):
+            thisJob['FailedTransfers'].discard(table)
+            recordLoadNotRun(table, rowCount, 'staging files not transferred', thisJob)
+            return
+        if not stagingTransfer.waitForExpandedFiles(filepath, thisConfig['SQL_BULKINSERT_EXPAND_TIMEOUT']):
+            recordLoadNotRun(table, rowCount, 'staging files not expanded', thisJob)
+            return
+
+    # Size the table's batches (the BATCHSIZE option) from its row width, when tuned.
+    # The Bulk Insert options (see bulkInsertOptions) follow the staging file format, and carry this batch size.
+    batchSize = batchTuner.getBatchSize(table, thisConfig, rowBytes=rowBytes)
+
+    # The ORDER hint is only given for rows staged in order.
+    ordered = table not in thisJob.get('UnorderedTables', set())
+    thisJob.get('UnorderedTables', set()).discard(table)
+
+    startTime = time.perf_counter()
+    if thisConfig['SQL_BULKINSERT_REDRIVE']:
+        bulkErrorProcessing.insertBulkClaimTableRowsRedriving(table, filepath, thisConfig, thisJob, rowCount, batchSize, ordered)
+    else:
+        bulkInsertOptions.insertBulkClaimTableRows(table, filepath, thisConfig, thisJob, rowCount, batchSize, ordered)
+    # Only a load without failed inserts is timed, as a failed load's time says nothing of its batch size.
+    if getLatestTableDetail(table, thisJob)['FailedInserts'] == 0:
+        batchTuner.recordLoad(table, rowCount, batchSize, time.perf_counter() - startTime, thisConfig)
+    batchTuner.save(thisConfig)
+
+    if checkpointUtils.isTableResumable(thisConfig):
+        recordTableCommittedIfLoaded(table, thisJob)
+
+
+
+
+
+def recordLoadNotRun(table, rowCount, reason, thisJob):
+
+    # Record the table's rows as failed inserts, so the load is reported and the table isn't recorded as committed.
+    logger.error(f"{table:25} {'load not run: ':33}{reason}")
+
+    thisJob['TableDetails'].append({
+        'ClaimTable' : table,
+        'RowsToInsert' : rowCount,
+        'SuccessfulInserts' : 0,
+        'FailedInserts' : rowCount,
+        'ElapsedSeconds' : 0,
+    })
+
+
+
+
+
+def isLoadOverlapped(thisConfig):
+
+    # Checkpointed runs record each page as staged before any of its tables are loaded, so stage then load in turn.
+    return (thisConfig['SQL_BULKINSERT_OVERLAP_LOAD']
+        and thisConfig['APP_UPDATE_TYPE'].upper() == constant.BULK_UPDATE_TYPE
+        and thisConfig['APP_CHECKPOINT_DIRECTORY'] == '')
+
+
+
+
+
+def processTableDictListsStagingAndLoading(ClaimsList, thisConfig, thisJob):
+
+    # Write each table's staging files, and Bulk Insert each table as soon as its files are written, while the
+    # next table's files are written. So SQL Server loads one table while the application writes the next.
+    #
+    # The loads run on a single background worker, so the tables are loaded one at a time, in table order (parent
+    # tables before child tables), as they would be by processTableDictListsPerformingInserts.
+    # Each table's load is recorded as a future in thisJob['LoadFutures'].
+
+    from database import batchTuner
+
+    # From here the page may be partly loaded, so a rerun refuses it rather than loading its rows again.
+    checkpointUtils.recordPageLoadStarted(thisConfig, thisJob)
+
+    logUtils.logCsvFileHeader()
+    logUtils.logInsertProcessingHeader()
+
+    # The Bulk Insert reads the staging files from the share when they are compressed and transferred.
+    path, sharePath = getStagingPaths(thisConfig)
+    loadPath = fileUtils.getPathDetails(thisConfig)
+
+    thisJob['LoadFutures'] = dict()
+
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix=threading.current_thread().name) as executor:
+
+        for ClaimsTableDictList in ClaimsList:
+
+            if len(ClaimsTableDictList) > 0:
+
+                # Stop staging if a load has failed, i.e. raised or had failed inserts. The child tables' rows would
+                # reference parent rows that weren't loaded.
+                failedTables = [loadedTable for loadedTable, future in thisJob['LoadFutures'].items()
+                                if future.done() and isLoadFailed(loadedTable, future, thisJob)]
+                if len(failedTables) > 0:
+                    logger.error(f"{'Staging stopped, load failed':30}: {', '.join(failedTables)}")
+                    break
+
+                table = determineTableBeingProcessed(ClaimsTableDictList)
+                writeTableStagingFiles(table, ClaimsTableDictList, path, sharePath, thisConfig, thisJob)
+
+                thisJob['LoadFutures'][table] = executor.submit(loadBulkTable, table, len(ClaimsTableDictList),
+                                                                batchTuner.estimateRowBytes(ClaimsTableDictList),
+                                                                loadPath, thisConfig, thisJob)
+
+    # All loads have completed. Raise the first load's exception, if any.
+    for table, future in thisJob['LoadFutures'].items():
+        future.result()
+
+
+
+
+
+def isLoadFailed(table, future, thisJob):
+
+    # A completed load has failed if it raised, or if its table detail entry records failed inserts.
+    if future.exception() is not None:
+        return True
+    tableDetail = getLatestTableDetail(table, thisJob)
+    return tableDetail is not None and tableDetail['FailedInserts'] > 0
+
+
+
+
+
+def getLatestTableDetail(table, thisJob):
+
+    for tableDetail in reversed(thisJob['TableDetails']):
+        if tableDetail['ClaimTable'] == table:
+            return tableDetail
+    return None
+
+
+
+
+
+def recordTableCommittedIfLoaded(table, thisJob):
+
+    # The table is committed when its latest table detail entry has no failed inserts.
+    tableDetail = getLatestTableDetail(table, thisJob)
+    if tableDetail is not None and tableDetail['FailedInserts'] == 0:
+        checkpointUtils.recordTableCommitted(thisJob, table)
+
+
+
+
+
+def resumeCheckpointedPage(stagedPage, thisConfig, thisJob):
+
+    # Complete a page checkpointed by a failed run of this job, without fetching or mapping it again.
+    # Returns False if the page can't be resumed.
+
+    # A completed page has nothing left to do.
+    if stagedPage is None:
+        logger.info(f"{'Page completed by previous run':30}: Offset {thisJob['CheckpointOffset']} (per_page {thisJob['CheckpointPerPage']})")
+        return True
+
+    # A page partly loaded by a failed run (e.g. some of its chunks committed) can't be loaded again without
+    # inserting the committed rows a second time. Stop, so its rows can be reconciled first.
+    if stagedPage.get('PartiallyLoaded'):
+        logger.error(f"{'Page partly loaded, not resumed':30}: Offset {thisJob['CheckpointOffset']} (per_page {thisJob['CheckpointPerPage']})")
+        logger.error(f"{' ':30}: The failed run committed some of the page's rows. Loading it again would duplicate them.")
+        logger.error(f"{' ':30}: Reconcile the page's rows before loading it again. The journal is kept:")
+        logger.error(f"{' ':30}: {thisJob['Checkpoint']['File']}")
+        return False
+
+    from control import bulkErrorProcessing
+    from database import bulkInsertOptions
+
+    logger.info(f"{'Page staged by previous run':30}: Offset {thisJob['CheckpointOffset']} (per_page {thisJob['CheckpointPerPage']})")
+
+    logUtils.logInsertProcessingHeader()
+
+    committedTables = list(checkpointUtils.getCommittedTables(thisJob, thisJob['CheckpointOffset']))
+
+    # Load the tables not yet committed, in table load order, from the staged files.
+    for table in tableSchema.CLAIM_TABLES:
+
+        if table not in stagedPage['Files'] or table in committedTables:
+            continue
+
+        stagedTable = stagedPage['Files'][table]
+
+        # The identities in the staged files were allocated by the failed run, so the page can't be remapped.
+        # If a staged file is missing or changed, stop so the page can be investigated.
+        if not checkpointUtils.verifyStagedFiles(stagedTable):
+            logger.error(f"{'Page can not be resumed':30}: Offset {thisJob['CheckpointOffset']}")
+            return False
+
+        if thisConfig['SQL_BULKINSERT_REDRIVE']:
+            bulkErrorProcessing.insertBulkClaimTableRowsRedriving(table, stagedTable['FilePath'], thisConfig, thisJob)
+        else:
+            bulkInsertOptions.insertBulkClaimTableRows(table, stagedTable['FilePath'], thisConfig, thisJob)
+        recordTableCommittedIfLoaded(table, thisJob)
+
+    # Perform Update processing.
+    # If ClaimHeader was committed by the failed run, the updates may not have run. They can safely be run again.
+    if 'ClaimHeader' in committedTables:
+        processClaimHeaderSetToNotCurrentUpdates(stagedPage['SetToNotCurrent'], thisConfig, thisJob)
+    else:
+        processTableDictListsPerformingUpdates(stagedPage['SetToNotCurrent'], thisConfig, thisJob)
+
+    return checkpointUtils.recordPageProcessed(thisConfig, thisJob)
+
+
+
+
+
 def determineTableBeingProcessed(ClaimsTableDictList):
 
     # Ascertain which TableDictionaryList is being processed by checking the PK field name key, and a few other field name keys.
@@ -479,6 +1055,8 @@ def processTableDictListsPerformingUpdates(ClaimHeaderSetToNotCurrentList, thisC
 
 def processClaimHeaderSetToNotCurrentUpdates(ClaimHeaderSetToNotCurrentList, thisConfig, thisJob):
 
+    from database import updateControl
+
     # Currently only one method available to do updates; a single row at a time. 
 
     updateControl.updateSingleClaimHeaderCurrentVersionRows(ClaimHeaderSetToNotCurrentList, thisConfig, thisJob)
@@ -506,189 +1084,196 @@ def translateFieldsForBulkInsertFileFormat(table, dictList):
     # This creates the format required by Bulk Insert. 
 
     # Create separate dictionary list with separate dictionaries.
+    # For a table dictionary list spilled to disk, translate the rows as they are streamed back,
+    # rather than building a translated copy of the whole table in memory.
+    if isinstance(dictList, spillBuffer.SpillTableList):
+        return (translateDictForBulkInsertFileFormat(table, d) for d in dictList)
+
     translatedDictList = list()
     for d in dictList:
-        translatedDictList.append(d.copy())
+        translatedDictList.append(translateDictForBulkInsertFileFormat(table, d))
+
+    return translatedDictList
 
 
-    if table == 'ClaimHeader':
-        for d in translatedDictList:
-
-            # Convert Python Boolean to SQL Server Bit
-            # This may not be necessary. Was required at one stage while trying to setup SQL Server Bulk Insert.
-            # 05/12/2020 Update.
-            # 1) This is Not Required for Execute or ExecuteMany, but works either way.
-            # 2) This is Required for Bulk Insert.
-            # Hence included.
-                   
-            if d['IsCurrentVersion'] == True:
-                d['IsCurrentVersion'] = 1
-            elif d['IsCurrentVersion'] == False:
-                d['IsCurrentVersion'] = 0
-            else:
-                d['IsCurrentVersion'] = 1
-                   
-            if d['IsMultiRiskPolicy'] == True:
-                d['IsMultiRiskPolicy'] = 1
-            elif d['IsMultiRiskPolicy'] == False:
-                d['IsMultiRiskPolicy'] = 0
-            else:
-                d['IsMultiRiskPolicy'] = None
 
-            # Setup string literal translation of Database type DATE - 10 chars - 'YYYY MM DD'
-            # Not sure if this is necessary or helpful, so currently commented out.
 
-            # PolicyStartDate
-            # if d['PolicyStartDate'] != None:
-            #     d['PolicyStartDate'] = str(d['PolicyStartDate'])[:10]
-            # else:
-            #     d['PolicyStartDate'] = ''
 
-            # # PolicyEndDate
-            # if d['PolicyEndDate'] != None:
-            #     d['PolicyEndDate'] = str(d['PolicyEndDate'])[:10]
-            # else:
-            #     d['PolicyEndDate'] = ''
+def translateDictForBulkInsertFileFormat(table, tableDict):
 
-            # # ReportedDate
-            # if d['ReportedDate'] != None:
-            #     d['ReportedDate'] = str(d['ReportedDate'])[:10]
-            # else:
-            #     d['ReportedDate'] = ''
+    # Create a separate dictionary so the table dictionary list is left unchanged.
+    d = tableDict.copy()
 
-            # Setup string literal translation of Database type SMALLDATETIME - 16 chars - 'YYYY MM DD HH:MM:SS'
-            # Not sure if this is necessary or helpful, so as above, currently commented out.
 
-            # DecisionDate
-            # if d['DecisionDate'] != None:
-            #     d['DecisionDate'] = str(d['DecisionDate'])[:19]
-            # else:
-            #     d['ReportedDate'] = ''
+    if table == 'ClaimHeader':
+
+        # Convert Python Boolean to SQL Server Bit
+        # This may not be necessary. Was required at one stage while trying to setup SQL Server Bulk Insert.
+        # 05/12/2020 Update.
+        # 1) This is Not Required for Execute or ExecuteMany, but works either way.
+        # 2) This is Required for Bulk Insert.
+        # Hence included.
+               
+        if d['IsCurrentVersion'] == True:
+            d['IsCurrentVersion'] = 1
+        elif d['IsCurrentVersion'] == False:
+            d['IsCurrentVersion'] = 0
+        else:
+            d['IsCurrentVersion'] = 1
+               
+        if d['IsMultiRiskPolicy'] == True:
+            d['IsMultiRiskPolicy'] = 1
+        elif d['IsMultiRiskPolicy'] == False:
+            d['IsMultiRiskPolicy'] = 0
+        else:
+            d['IsMultiRiskPolicy'] = None
+
+        # Setup string literal translation of Database type DATE - 10 chars - 'YYYY MM DD'
+        # Not sure if this is necessary or helpful, so currently commented out.
+
+        # PolicyStartDate
+        # if d['PolicyStartDate'] != None:
+        #     d['PolicyStartDate'] = str(d['PolicyStartDate'])[:10]
+        # else:
+        #     d['PolicyStartDate'] = ''
+
+        # # PolicyEndDate
+        # if d['PolicyEndDate'] != None:
+        #     d['PolicyEndDate'] = str(d['PolicyEndDate'])[:10]
+        # else:
+        #     d['PolicyEndDate'] = ''
+
+        # # ReportedDate
+        # if d['ReportedDate'] != None:
+        #     d['ReportedDate'] = str(d['ReportedDate'])[:10]
+        # else:
+        #     d['ReportedDate'] = ''
+
+        # Setup string literal translation of Database type SMALLDATETIME - 16 chars - 'YYYY MM DD HH:MM:SS'
+        # Not sure if this is necessary or helpful, so as above, currently commented out.
+
+        # DecisionDate
+        # if d['DecisionDate'] != None:
+        #     d['DecisionDate'] = str(d['DecisionDate'])[:19]
+        # else:
+        #     d['ReportedDate'] = ''
 
 
     if table == 'ClaimMotorDetail':
-        for d in translatedDictList:
+        
+        if d['IsVehicleTotalLoss'] == True:
+            d['IsVehicleTotalLoss'] = 1
+        elif d['IsVehicleTotalLoss'] == False:
+            d['IsVehicleTotalLoss'] = 0
+        else:
+            d['IsVehicleTotalLoss'] = None
             
-            if d['IsVehicleTotalLoss'] == True:
-                d['IsVehicleTotalLoss'] = 1
-            elif d['IsVehicleTotalLoss'] == False:
-                d['IsVehicleTotalLoss'] = 0
-            else:
-                d['IsVehicleTotalLoss'] = None
-                
 
-            if d['IsDriverListed'] == True:
-                d['IsDriverListed'] = 1
-            elif d['IsDriverListed'] == False:
-                d['IsDriverListed'] = 0
-            else:
-                d['IsDriverListed'] = None
+        if d['IsDriverListed'] == True:
+            d['IsDriverListed'] = 1
+        elif d['IsDriverListed'] == False:
+            d['IsDriverListed'] = 0
+        else:
+            d['IsDriverListed'] = None
 
-            if d['IsTPInvolved'] == True:
-                d['IsTPInvolved'] = 1
-            elif d['IsTPInvolved'] == False:
-                d['IsTPInvolved'] = 0
-            else:
-                d['IsTPInvolved'] = None
+        if d['IsTPInvolved'] == True:
+            d['IsTPInvolved'] = 1
+        elif d['IsTPInvolved'] == False:
+            d['IsTPInvolved'] = 0
+        else:
+            d['IsTPInvolved'] = None
 
 
     if table == 'ClaimReserveMovement':
-        for d in translatedDictList:
-            
-            if d['IsSystemCreated'] == True:
-                d['IsSystemCreated'] = 1
-            elif d['IsSystemCreated'] == False:
-                d['IsSystemCreated'] = 0
-            else:
-                d['IsSystemCreated'] = None
+        
+        if d['IsSystemCreated'] == True:
+            d['IsSystemCreated'] = 1
+        elif d['IsSystemCreated'] == False:
+            d['IsSystemCreated'] = 0
+        else:
+            d['IsSystemCreated'] = None
 
 
     if table == 'ClaimPayment':
-        for d in translatedDictList:
-            
-            if d['IsInvoice'] == True:
-                d['IsInvoice'] = 1
-            elif d['IsInvoice'] == False:
-                d['IsInvoice'] = 0
-            else:
-                d['IsInvoice'] = None
-            
-            if d['XsCollectedOnInvoice'] == True:
-                d['XsCollectedOnInvoice'] = 1
-            elif d['XsCollectedOnInvoice'] == False:
-                d['XsCollectedOnInvoice'] = 0
-            else:
-                d['XsCollectedOnInvoice'] = None
+        
+        if d['IsInvoice'] == True:
+            d['IsInvoice'] = 1
+        elif d['IsInvoice'] == False:
+            d['IsInvoice'] = 0
+        else:
+            d['IsInvoice'] = None
+        
+        if d['XsCollectedOnInvoice'] == True:
+            d['XsCollectedOnInvoice'] = 1
+        elif d['XsCollectedOnInvoice'] == False:
+            d['XsCollectedOnInvoice'] = 0
+        else:
+            d['XsCollectedOnInvoice'] = None
 
 
     if table == 'ClaimPaymentDetail':
-        for d in translatedDictList:
-            
-            if d['IsTaxFree'] == True:
-                d['IsTaxFree'] = 1
-            elif d['IsTaxFree'] == False:
-                d['IsTaxFree'] = 0
-            else:
-                d['IsTaxFree'] = None
-            
+        
+        if d['IsTaxFree'] == True:
+            d['IsTaxFree'] = 1
+        elif d['IsTaxFree'] == False:
+            d['IsTaxFree'] = 0
+        else:
+            d['IsTaxFree'] = None
+        
 
     if table == 'ClaimPaymentHistory':
-        for d in translatedDictList:
-            
-            if d['IsSystemCreated'] == True:
-                d['IsSystemCreated'] = 1
-            elif d['IsSystemCreated'] == False:
-                d['IsSystemCreated'] = 0
-            else:
-                d['IsSystemCreated'] = None
+        
+        if d['IsSystemCreated'] == True:
+            d['IsSystemCreated'] = 1
+        elif d['IsSystemCreated'] == False:
+            d['IsSystemCreated'] = 0
+        else:
+            d['IsSystemCreated'] = None
 
 
     if table == 'ClaimRecovery':
-        for d in translatedDictList:
-            
-            if d['IsInvoice'] == True:
-                d['IsInvoice'] = 1
-            elif d['IsInvoice'] == False:
-                d['IsInvoice'] = 0
-            else:
-                d['IsInvoice'] = None
-
-            if d['IsXsCollection'] == True:
-                d['IsXsCollection'] = 1
-            elif d['IsXsCollection'] == False:
-                d['IsXsCollection'] = 0
-            else:
-                d['IsXsCollection'] = None
-
-            if d['IsSalvage'] == True:
-                d['IsSalvage'] = 1
-            elif d['IsSalvage'] == False:
-                d['IsSalvage'] = 0
-            else:
-                d['IsSalvage'] = None
+        
+        if d['IsInvoice'] == True:
+            d['IsInvoice'] = 1
+        elif d['IsInvoice'] == False:
+            d['IsInvoice'] = 0
+        else:
+            d['IsInvoice'] = None
+
+        if d['IsXsCollection'] == True:
+            d['IsXsCollection'] = 1
+        elif d['IsXsCollection'] == False:
+            d['IsXsCollection'] = 0
+        else:
+            d['IsXsCollection'] = None
+
+        if d['IsSalvage'] == True:
+            d['IsSalvage'] = 1
+        elif d['IsSalvage'] == False:
+            d['IsSalvage'] = 0
+        else:
+            d['IsSalvage'] = None
 
 
     if table == 'ClaimRecoveryDetail':
-        for d in translatedDictList:
-            
-            if d['IsTaxFree'] == True:
-                d['IsTaxFree'] = 1
-            elif d['IsTaxFree'] == False:
-                d['IsTaxFree'] = 0
-            else:
-                d['IsTaxFree'] = None
+        
+        if d['IsTaxFree'] == True:
+            d['IsTaxFree'] = 1
+        elif d['IsTaxFree'] == False:
+            d['IsTaxFree'] = 0
+        else:
+            d['IsTaxFree'] = None
 
 
     if table == 'ClaimRecoveryHistory':
-        for d in translatedDictList:
-            
-            if d['IsSystemCreated'] == True:
-                d['IsSystemCreated'] = 1
-            elif d['IsSystemCreated'] == False:
-                d['IsSystemCreated'] = 0
-            else:
-                d['IsSystemCreated'] = None
+        
+        if d['IsSystemCreated'] == True:
+            d['IsSystemCreated'] = 1
+        elif d['IsSystemCreated'] == False:
+            d['IsSystemCreated'] = 0
+        else:
+            d['IsSystemCreated'] = None
 
 
-    return translatedDictList
+    return d
 
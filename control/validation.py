@@ -0,0 +1,247 @@
+'''
+Purpose:
+
+    This module validates table dictionary lists against the rules declared per table column in
+    tableSchema.VALIDATION_RULES. See APP_VALIDATE_ROWS.
+
+    Each table's rules are compiled once into a tuple of (column, validator) pairs, where each validator is a
+    closure holding only the checks its rule requires. A whole table dictionary list is then validated in one pass.
+
+    Rows failing validation are removed from the table dictionary list before it is written or loaded, rather than
+    left to fail the load. This matters most for MANY updates, where executemany aborts on the first bad row.
+    The rejections cascade to child tables (see tableSchema.PARENT_TABLES): a row referencing a rejected parent row
+    is rejected too, as it would fail its Foreign Key.
+    The errors for each table are logged as a single summary line and written to a rejects file,
+    <table>.Rejects.csv, in the staging directory, one line per error. The number of rows rejected is recorded
+    as the table's RejectedRows in thisJob['TableDetails'], for per table reconciliation.
+
+    A rejected ClaimHeader row isn't loaded, so its claim is removed from the ClaimHeader set to not current list too,
+    and the claim's current version stays current. See removeRejectedClaims.
+
+Revision History:
+
+    19/10/2026   agent            Record reject counts in the table details, and remove rejected claims from the
+                                  ClaimHeader set to not current list.
+    19/10/2026   agent            Cascade rejected rows to child tables. Range, length and pattern checks only
+                                  apply to values of a type they can check.
+    19/10/2026   agent            Created.
+
+'''
+
+## Standard Libraries
+from datetime import date, datetime, time
+import logging
+import re
+
+## Local Libraries
+from models import tableSchema
+from utilities import fileUtils, spillBuffer
+
+## Module logger
+logger = logging.getLogger(__name__)
+
+
+## Python types accepted for each rule type. Checked by exact type, so e.g. a bool isn't accepted as an int.
+PYTHON_TYPES = {
+    'int'       : (int,),
+    'bigint'    : (int,),
+    'bit'       : (bool, int),
+    'float'     : (float, int),
+    'nvarchar'  : (str,),
+    'date'      : (date, datetime, time, str),
+}
+
+## Python types the Min and Max checks can compare.
+NUMERIC_TYPES = frozenset({int, float})
+
+## Maximum length of a rejected value written to the rejects file.
+MAX_REJECT_VALUE_LENGTH = 100
+
+## Compiled validators, per table.
+compiledTableValidators = dict()
+
+
+
+
+
+def compileColumnValidator(column, rule):
+
+    # Returns a function taking a column value and returning an error message, or None if the value is valid.
+    nullable = rule.get('Nullable', True)
+    checks = list()
+
+    if 'Type' in rule:
+        typeName = rule['Type']
+        pythonTypes = frozenset(PYTHON_TYPES[typeName])
+        checks.append(lambda value: None if type(value) in pythonTypes else f"Not of type {typeName}")
+
+    if 'MaxLength' in rule:
+        maxLength = rule['MaxLength']
+        checks.append(lambda value: f"Longer than {maxLength}" if type(value) is str and len(value) > maxLength else None)
+
+    if 'Pattern' in rule:
+        pattern = rule['Pattern']
+        fullmatch = re.compile(pattern).fullmatch
+        checks.append(lambda value: None if type(value) is str and fullmatch(value) else f"Doesn't match {pattern}")
+
+    if 'Min' in rule:
+        minimum = rule['Min']
+        checks.append(lambda value: "Not a number" if type(value) not in NUMERIC_TYPES else f"Less than {minimum}" if value < minimum else None)
+
+    if 'Max' in rule:
+        maximum = rule['Max']
+        checks.append(lambda value: "Not a number" if type(value) not in NUMERIC_TYPES else f"Greater than {maximum}" if value > maximum else None)
+
+    checks = tuple(checks)
+
+    def validate(value):
+        if value is None:
+            return None if nullable else "Null not allowed"
+        for check in checks:
+            error = check(value)
+            if error is not None:
+                return error
+        return None
+
+    return validate
+
+
+
+
+
+def getTableValidators(table):
+
+    if table not in compiledTableValidators:
+        rules = tableSchema.VALIDATION_RULES.get(table, dict())
+        compiledTableValidators[table] = tuple((column, compileColumnValidator(column, rule)) for column, rule in rules.items())
+
+    return compiledTableValidators[table]
+
+
+
+
+
+def validateTableDictList(table, dictList):
+
+    # Returns a list of errors, as (rowIndex, row, column, error) tuples, in row order.
+    errors = list()
+
+    columnValidators = getTableValidators(table)
+    if len(columnValidators) == 0:
+        return errors
+
+    append = errors.append
+
+    for rowIndex, row in enumerate(dictList):
+        get = row.get
+        for column, validate in columnValidators:
+            error = validate(get(column))
+            if error is not None:
+                append((rowIndex, row, column, error))
+
+    return errors
+
+
+
+
+
+def getParentRejectErrors(table, dictList, rejectedKeys):
+
+    # Returns an error, as for validateTableDictList, for each row referencing a parent row rejected earlier.
+    # rejectedKeys holds the key values of the rejected rows of each table validated so far.
+    errors = list()
+
+    for parent in tableSchema.PARENT_TABLES.get(table, ()):
+        parentKeys = rejectedKeys.get(parent)
+        if not parentKeys:
+            continue
+        # Foreign Key columns have the same names as the Primary Key columns they reference.
+        parentKeyColumn = tableSchema.KEY_COLUMNS[parent]
+        for rowIndex, row in enumerate(dictList):
+            if row.get(parentKeyColumn) in parentKeys:
+                errors.append((rowIndex, row, parentKeyColumn, f"Parent {parent} row rejected"))
+
+    return errors
+
+
+
+
+
+def removeRows(dictList, rowIndexes):
+
+    # Remove the rows in place, as the caller may hold other references to the list.
+    if isinstance(dictList, spillBuffer.SpillTableList):
+        dictList.removeRows(rowIndexes)
+    else:
+        dictList[:] = [row for rowIndex, row in enumerate(dictList) if rowIndex not in rowIndexes]
+
+
+
+
+
+def rejectInvalidRows(table, dictList, path, thisJob, rejectedKeys=None):
+
+    # Tables are validated parents first. When rejectedKeys is given, the rows referencing rejected parent rows
+    # are rejected too, and the key values of this table's rejected rows are added for its child tables.
+    errors = validateTableDictList(table, dictList)
+    if rejectedKeys is not None:
+        errors.extend(getParentRejectErrors(table, dictList, rejectedKeys))
+    if len(errors) == 0:
+        return
+
+    rejectedRowIndexes = set(rowIndex for rowIndex, row, column, error in errors)
+
+    keyColumn = tableSchema.KEY_COLUMNS.get(table)
+    if rejectedKeys is not None:
+        rejectedKeys.setdefault(table, set()).update(row.get(keyColumn) for rowIndex, row, column, error in errors)
+
+    # The rejects for each table accumulate across chunks and pages, so the rejects file covers the whole job.
+    tableRejects = thisJob.setdefault('ValidationRejects', dict()).setdefault(table, list())
+    for rowIndex, row, column, error in errors:
+        tableRejects.append({
+            'KeyColumn' : keyColumn,
+            'KeyValue' : row.get(keyColumn),
+            'Column' : column,
+            'Value' : repr(row.get(column))[:MAX_REJECT_VALUE_LENGTH],
+            'Error' : error,
+        })
+
+    removeRows(dictList, rejectedRowIndexes)
+
+    # The rejected rows are counted in a table detail entry of their own, so the table reconciles as
+    # RowsToInsert + RejectedRows. Chunks' and pages' entries are combined by response.consolidateTableDetails.
+    thisJob.setdefault('TableDetails', list()).append({
+        'ClaimTable' : table,
+        'RowsToInsert' : 0,
+        'SuccessfulInserts' : 0,
+        'FailedInserts' : 0,
+        'ElapsedSeconds' : 0.0,
+        'RejectedRows' : len(rejectedRowIndexes),
+    })
+
+    logger.warning(f"{table:25} {'rows rejected by validation: ':33}{len(rejectedRowIndexes)} ({len(errors)} errors)")
+
+    fileUtils.writeDictListToCsvFile(tableRejects, table, f"{path}{table}.Rejects")
+
+
+
+
+
+def removeRejectedClaims(ClaimHeaderSetToNotCurrentList, rejectedKeys):
+
+    # Remove the entries for the ClaimHeader rows rejected, in place, so an earlier version of a claim isn't set to
+    # not current when its new version isn't loaded. Entries are ClaimIds, or dictionaries holding the ClaimId.
+    rejectedClaimIds = rejectedKeys.get('ClaimHeader')
+    if not rejectedClaimIds:
+        return
+
+    def getClaimId(entry):
+        return entry.get('ClaimId') if isinstance(entry, dict) else entry
+
+    keptEntries = [entry for entry in ClaimHeaderSetToNotCurrentList if getClaimId(entry) not in rejectedClaimIds]
+    if len(keptEntries) == len(ClaimHeaderSetToNotCurrentList):
+        return
+
+    logger.warning(f"{'ClaimHeader':25} {'not set to not current: ':33}{len(ClaimHeaderSetToNotCurrentList) - len(keptEntries)} (new version rejected)")
+
+    ClaimHeaderSetToNotCurrentList[:] = keptEntries
@@ -0,0 +1,256 @@
+'''
+Purpose:
+
+    This module tunes the batch size of each table's loads, from the table's row width and the measured
+    commit latency of its batches, and remembers the tuned sizes across runs. See SQL_BATCH_TUNER_FILE.
+
+    Batch sizes apply to:
+     - BULK      - The Bulk Insert BATCHSIZE option. See bulkInsertOptions.getBulkInsertOptions.
+     - BATCHED   - The rows sent and committed per executemany. See batchedInsertControl.
+    They don't apply to MANY, which loads each table in one executemany, so all-or-nothing.
+
+    A table without a tuned size starts at INITIAL_BATCH_BYTES worth of rows, so wide tables (e.g. ClaimHeader)
+    start with far fewer rows per batch than narrow tables (e.g. ClaimStatusHistory). After each batch:
+     - Faster than half of TARGET_BATCH_SECONDS - The batch size is increased by half.
+     - Slower than TARGET_BATCH_SECONDS         - The batch size is halved.
+    Only full batches are measured, and only batch sizes that were actually used are recorded. The full batch size
+    with the best throughput (rows per second) is kept, and used as the starting size next run. The tuned sizes are
+    saved once per table loaded (see save).
+
+    For BATCHED, the rows per executemany are also capped to SQL_EXECUTEMANY_MAX_MB, as fast_executemany builds
+    parameter arrays for all the rows of a call in memory.
+
+Revision History:
+
+    19/10/2026   agent            Only measure full batches, and save once per table rather than per batch.
+    19/10/2026   agent            Created.
+
+'''
+
+## Standard Libraries
+import itertools
+import json
+import logging
+import os
+import sys
+import threading
+
+## Module logger
+logger = logging.getLogger(__name__)
+
+
+## Batch size bounds, in rows.
+MIN_BATCH_ROWS = 500
+MAX_BATCH_ROWS = 200000
+
+## Data per batch for a table without a tuned batch size.
+INITIAL_BATCH_BYTES = 4194304
+
+## Target commit latency of a batch.
+TARGET_BATCH_SECONDS = 2.0
+
+## Number of rows sampled to estimate a table's row width.
+ROW_WIDTH_SAMPLE_ROWS = 100
+
+## Tuners, per tuner file. Shared by the insurers when several insurers are processed concurrently.
+tuners = dict()
+tunersLock = threading.Lock()
+
+
+
+
+
+class BatchTuner:
+
+    def __init__(self, fileName, defaultBatchSize):
+
+        self.fileName = fileName
+        self.defaultBatchSize = defaultBatchSize
+        self.lock = threading.Lock()
+        self.tables = dict()
+        self.changed = False
+
+        if os.path.exists(fileName):
+            try:
+                with open(fileName, 'r') as f:
+                    self.tables = json.load(f)
+            except:
+                logger.warning(f"{'Unable to read batch tuner file':30}: {fileName}: {sys.exc_info()[1]}")
+
+        # Start each table from its best batch size of previous runs.
+        for state in self.tables.values():
+            state['BatchSize'] = clampBatchSize(state.get('BestBatchSize', state['BatchSize']))
+
+
+    def getBatchSize(self, table, rowBytes=None):
+
+        with self.lock:
+            state = self.tables.get(table)
+            if state is None:
+                if rowBytes is None:
+                    return self.defaultBatchSize
+                state = {'BatchSize' : clampBatchSize(INITIAL_BATCH_BYTES // max(1, rowBytes)), 'RowBytes' : rowBytes}
+                self.tables[table] = state
+            elif rowBytes is not None:
+                state['RowBytes'] = rowBytes
+            return state['BatchSize']
+
+
+    def getRowBytes(self, table):
+
+        with self.lock:
+            return self.tables.get(table, dict()).get('RowBytes')
+
+
+    def record(self, table, rows, seconds):
+
+        with self.lock:
+            state = self.tables.get(table)
+            if state is None or rows == 0 or seconds <= 0:
+                return
+
+            # Only a full batch measures the batch size. A table's last batch is usually short.
+            if rows < state['BatchSize']:
+                return
+
+            rowsPerSecond = rows / seconds
+            if rowsPerSecond > state.get('BestRowsPerSecond', 0):
+                state['BestRowsPerSecond'] = round(rowsPerSecond)
+                state['BestBatchSize'] = clampBatchSize(rows)
+
+            if seconds < TARGET_BATCH_SECONDS / 2:
+                state['BatchSize'] = clampBatchSize(state['BatchSize'] * 3 // 2)
+            elif seconds > TARGET_BATCH_SECONDS:
+                state['BatchSize'] = clampBatchSize(state['BatchSize'] // 2)
+
+            self.changed = True
+
+
+    def save(self):
+
+        # Replace the file in one step, so a failed write never leaves a partial file.
+        with self.lock:
+            if not self.changed:
+                return
+            try:
+                with open(self.fileName + '.tmp', 'w') as f:
+                    json.dump(self.tables, f, indent=4, sort_keys=True)
+                os.replace(self.fileName + '.tmp', self.fileName)
+                self.changed = False
+            except:
+                logger.warning(f"{'Unable to write batch tuner file':30}: {self.fileName}: {sys.exc_info()[1]}")
+
+
+
+
+
+def clampBatchSize(batchSize):
+
+    return max(MIN_BATCH_ROWS, min(MAX_BATCH_ROWS, batchSize))
+
+
+
+
+
+def getTuner(thisConfig):
+
+    # Returns None when batch sizes aren't tuned.
+    if thisConfig['SQL_BATCH_TUNER_FILE'] == '':
+        return None
+
+    with tunersLock:
+        if thisConfig['SQL_BATCH_TUNER_FILE'] not in tuners:
+            tuners[thisConfig['SQL_BATCH_TUNER_FILE']] = BatchTuner(thisConfig['SQL_BATCH_TUNER_FILE'], thisConfig['SQL_BULKINSERT_BATCHSIZE'])
+        return tuners[thisConfig['SQL_BATCH_TUNER_FILE']]
+
+
+
+
+
+def isEnabled(thisConfig):
+
+    return thisConfig['SQL_BATCH_TUNER_FILE'] != ''
+
+
+
+
+
+def estimateRowBytes(dictList):
+
+    # Estimate the bound parameter size of a row, from the values of the first rows.
+    # Text is bound as UTF-16, so allow two bytes a character. Other values are bound in at most 16 bytes.
+    totalBytes = 0
+    sampleRows = 0
+
+    for row in itertools.islice(iter(dictList), ROW_WIDTH_SAMPLE_ROWS):
+        for value in row.values():
+            totalBytes += 2 * len(value) + 2 if isinstance(value, str) else 16
+        sampleRows += 1
+
+    return totalBytes // sampleRows if sampleRows > 0 else 0
+
+
+
+
+
+def getBatchSize(table, thisConfig, rowBytes=None):
+
+    # The table's tuned batch size, or SQL_BULKINSERT_BATCHSIZE when batch sizes aren't tuned.
+    # rowBytes is given when the table's rows are at hand, so a table new to the tuner can be sized by its row width.
+    tuner = getTuner(thisConfig)
+    if tuner is None:
+        return thisConfig['SQL_BULKINSERT_BATCHSIZE']
+
+    return tuner.getBatchSize(table, rowBytes)
+
+
+
+
+
+def getExecuteManyBatchSize(table, thisConfig, rowBytes=None):
+
+    # As getBatchSize, capped so the fast_executemany parameter arrays fit within SQL_EXECUTEMANY_MAX_MB.
+    batchSize = getBatchSize(table, thisConfig, rowBytes)
+
+    tuner = getTuner(thisConfig)
+    if rowBytes is None and tuner is not None:
+        rowBytes = tuner.getRowBytes(table)
+
+    if rowBytes:
+        batchSize = min(batchSize, max(1, thisConfig['SQL_EXECUTEMANY_MAX_MB'] * 1048576 // rowBytes))
+
+    return batchSize
+
+
+
+
+
+def recordBatch(table, rows, seconds, thisConfig):
+
+    # Record the commit latency of a batch of rows.
+    tuner = getTuner(thisConfig)
+    if tuner is not None:
+        tuner.record(table, rows, seconds)
+
+
+
+
+
+def recordLoad(table, rows, batchSize, seconds, thisConfig):
+
+    # Record a load committed in batches of batchSize rows (e.g. a Bulk Insert), as a full batch of batchSize rows
+    # taking its share of the time. A load of fewer rows than batchSize was one short batch, so isn't measured.
+    if rows < batchSize:
+        return
+    recordBatch(table, batchSize, seconds * batchSize / rows, thisConfig)
+
+
+
+
+
+def save(thisConfig):
+
+    # Save the tuned batch sizes, if changed. Called once each table is loaded.
+    tuner = getTuner(thisConfig)
+    if tuner is not None:
+        tuner.save()
@@ -0,0 +1,219 @@
+'''
+Purpose:
+
+    This module loads claim tables directly from the in-memory table dictionary lists over the database
+    connection, in batches of SQL_BULKINSERT_BATCHSIZE rows, or of the table's tuned batch size (see batchTuner).
+    See APP_UPDATE_TYPE "BATCHED".
+
+    Unlike the T-SQL Bulk Insert, no staging file is required, so SQL Server doesn't need access to the
+    application's file system. Rows are sent as parameter arrays using pyodbc fast_executemany, and the
+    application allocated identity values are kept (IDENTITY_INSERT).
+
+    This is not a bulk copy. Each row is a parameterised INSERT, and is fully logged, so a batch costs about the
+    same as a MANY insert of the same rows. What differs from MANY is that the batches are committed on their own.
+
+    insertRowBatches loads batches of row value tuples from any source, e.g. the CSV job's csvLoader.
+    insertRowsIsolatingFailures loads row value tuples, isolating and returning the rows that fail, e.g. to
+    re-drive the rows rejected by a Bulk Insert (see bulkErrorProcessing). Both use insertBisecting, which is also
+    used by multiRowInsertControl.
+
+    Each batch is committed on its own. If a batch fails, it is rolled back and its rows are counted as failed
+    inserts, and loading continues with the next batch, up to SQL_BULKINSERT_MAXERRORS failed rows.
+
+Revision History:
+
+    19/10/2026   agent            insertBisecting takes the function executing a batch, so it can be shared.
+    19/10/2026   agent            Renamed from bulkCopyControl, and dropped the TABLOCK hint. The rows are ordinary
+                                  INSERTs, so the table lock only blocked other sessions.
+    19/10/2026   agent            Added insertRowsIsolatingFailures.
+    19/10/2026   agent            Added insertRowBatches.
+    19/10/2026   agent            Tune the batch size from each batch's commit latency. See SQL_BATCH_TUNER_FILE.
+    19/10/2026   agent            Created.
+
+'''
+
+## Standard Libraries
+import logging
+import sys
+import time
+
+## Local Libraries
+from database import batchTuner, connection
+from models import tableSchema
+
+## Module logger
+logger = logging.getLogger(__name__)
+
+
+
+
+
+def insertBatchedClaimTableRows(table, ClaimsTableDictList, thisConfig, thisJob):
+
+    # Assertion: We only get here if the list has at least one row, so rely on ClaimsTableDictList[0] having data.
+    keys = tuple(ClaimsTableDictList[0])
+    rowBytes = batchTuner.estimateRowBytes(ClaimsTableDictList)
+
+    def getRowBatches():
+        # Batches are built as they are inserted, so the tuner's adjustments apply to the next batch.
+        batchSize = batchTuner.getExecuteManyBatchSize(table, thisConfig, rowBytes=rowBytes)
+        batch = list()
+        for d in ClaimsTableDictList:
+            batch.append(tuple(d[key] for key in keys))
+            if len(batch) >= batchSize:
+                yield batch
+                batch = list()
+                batchSize = batchTuner.getExecuteManyBatchSize(table, thisConfig)
+        if len(batch) > 0:
+            yield batch
+
+    return insertRowBatches(table, keys, getRowBatches(), thisConfig, thisJob)
+
+
+
+
+
+def insertRowBatches(table, keys, rowBatches, thisConfig, thisJob):
+
+    # Insert batches of row value tuples, in keys (column) order. Each batch is committed on its own.
+    sql = getInsertSql(table, keys)
+
+    rowsToInsert = 0
+    successfulInserts = 0
+    failedInserts = 0
+
+    startTime = time.perf_counter()
+
+    conn = connection.getConnection(thisConfig)
+    try:
+        cursor = conn.cursor()
+        cursor.fast_executemany = True
+
+        # The application allocates the identity (Primary Key) values, so keep them.
+        if table in tableSchema.IDENTITY_TABLES:
+            cursor.execute(f"SET IDENTITY_INSERT [dbo].[{table}] ON")
+
+        for batch in rowBatches:
+            batchStartTime = time.perf_counter()
+            inserted = insertBatch(table, cursor, conn, sql, batch)
+            # Only successful batches are timed. The tuner may adjust the batch size from the commit latency.
+            if inserted == len(batch):
+                batchTuner.recordBatch(table, len(batch), time.perf_counter() - batchStartTime, thisConfig)
+            rowsToInsert += len(batch)
+            successfulInserts += inserted
+            failedInserts += len(batch) - inserted
+            if failedInserts > thisConfig['SQL_BULKINSERT_MAXERRORS']:
+                logger.error(f"{table:25} {'maximum errors reached: ':33}{failedInserts}")
+                break
+
+        if table in tableSchema.IDENTITY_TABLES:
+            cursor.execute(f"SET IDENTITY_INSERT [dbo].[{table}] OFF")
+
+        cursor.close()
+    finally:
+        conn.close()
+
+    batchTuner.save(thisConfig)
+
+    elapsedSeconds = time.perf_counter() - startTime
+
+    thisJob['TableDetails'].append({
+        'ClaimTable' : table,
+        'RowsToInsert' : rowsToInsert,
+        'SuccessfulInserts' : successfulInserts,
+        'FailedInserts' : failedInserts,
+        'ElapsedSeconds' : elapsedSeconds,
+    })
+
+    logger.info(f"{table:25} {'rows inserted in batches: ':33}{successfulInserts} of {rowsToInsert} in {elapsedSeconds:.1f}s")
+
+    return thisJob
+
+
+
+
+
+def getInsertSql(table, keys):
+
+    columns = ', '.join(f"[{key}]" for key in keys)
+    parameters = ', '.join('?' for key in keys)
+    return f"INSERT INTO [dbo].[{table}] ({columns}) VALUES ({parameters})"
+
+
+
+
+
+def insertRowsIsolatingFailures(table, keys, rows, thisConfig):
+
+    # Insert row value tuples in batches, isolating the rows that fail. A failed batch is rolled back and split
+    # in half until each failing row is inserted on its own.
+    # Returns the number of rows inserted, and a list of (row, error) for the rows that failed.
+    sql = getInsertSql(table, keys)
+    batchSize = batchTuner.getExecuteManyBatchSize(table, thisConfig)
+    insertedRows = 0
+    failures = list()
+
+    conn = connection.getConnection(thisConfig)
+    try:
+        cursor = conn.cursor()
+        cursor.fast_executemany = True
+
+        if table in tableSchema.IDENTITY_TABLES:
+            cursor.execute(f"SET IDENTITY_INSERT [dbo].[{table}] ON")
+
+        for start in range(0, len(rows), batchSize):
+            batch = rows[start:start + batchSize]
+            batchFailures = insertBisecting(lambda rows: cursor.executemany(sql, rows), conn, batch)
+            insertedRows += len(batch) - len(batchFailures)
+            failures.extend(batchFailures)
+
+        if table in tableSchema.IDENTITY_TABLES:
+            cursor.execute(f"SET IDENTITY_INSERT [dbo].[{table}] OFF")
+
+        cursor.close()
+    finally:
+        conn.close()
+
+    return insertedRows, failures
+
+
+
+
+
+def insertBisecting(execute, conn, rows):
+
+    # Insert the rows with execute(rows), committing them together. If they fail, roll back and insert each half
+    # in turn, until each failing row is inserted on its own.
+    # Returns a list of (row, error) for the rows that failed.
+    try:
+        execute(rows)
+        conn.commit()
+        return list()
+    except:
+        conn.rollback()
+        error = str(sys.exc_info()[1])
+
+    if len(rows) == 1:
+        return [(rows[0], error)]
+
+    middle = len(rows) // 2
+    return insertBisecting(execute, conn, rows[:middle]) + insertBisecting(execute, conn, rows[middle:])
+
+
+
+
+
+def insertBatch(table, cursor, conn, sql, batch):
+
+    try:
+        cursor.executemany(sql, batch)
+        conn.commit()
+        return len(batch)
+
+    except:
+        conn.rollback()
+        message = "ERROR inserting " + table + " batch of"
+        logger.error(f"{message:55}: {len(batch)} rows")
+        logger.error(f"{' ':55}: {sys.exc_info()[0]}")
+        logger.error(f"{' ':55}: {sys.exc_info()[1]}")
+        return 0
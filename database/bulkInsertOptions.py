@@ -0,0 +1,157 @@
+'''
+Purpose:
+
+    This module builds the data file name and WITH options of the T-SQL Bulk Insert statement for a claim table,
+    according to the staging file format in use (see SQL_BULKINSERT_FILE_FORMAT), and runs the Bulk Insert.
+
+    insertBulkClaimTableRows builds its statement as:
+
+        dataFile, options = getBulkInsertOptions(table, filepath, thisConfig, batchSize)
+        sql = f"BULK INSERT [dbo].[{table}] FROM '{dataFile}' WITH ({', '.join(options)})"
+
+    So the staging file format, the ORDER and TABLOCK hints, and the tuned BATCHSIZE all apply to the load.
+
+Revision History:
+
+    19/10/2026   agent            Added CODEPAGE for csv staging files, as the insertControl statement had.
+    19/10/2026   agent            Added insertBulkClaimTableRows, so the options are applied to the Bulk Insert.
+    19/10/2026   agent            Take BATCHSIZE from the batch tuner. See SQL_BATCH_TUNER_FILE.
+    19/10/2026   agent            Added ORDER and TABLOCK hints. See SQL_BULKINSERT_ORDERED.
+    19/10/2026   agent            Created.
+
+'''
+
+## Standard Libraries
+import logging
+import os
+import sys
+import time
+
+## Local Libraries
+import constant
+from database import batchTuner, connection
+from models import tableSchema
+
+## Module logger
+logger = logging.getLogger(__name__)
+
+
+## Code page of the csv staging files, which are written as ISO latin-1 (see fileUtils). Without it, Bulk Insert
+#  reads char data as the server's OEM code page, and characters outside ASCII are mistranslated.
+#  Native format files hold character data as UTF-16 (see nativeFormat), so need no code page.
+CSV_CODEPAGE = '28591'
+
+
+
+
+
+def getBulkInsertOptions(table, filepath, thisConfig, batchSize=None, ordered=True):
+
+    # "filepath" is supplied without a file suffix. The suffix depends on the staging file format.
+    #   e.g. ClaimHeader.csv                          -  Pipe delimited latin-1 data file with a header row
+    #        ClaimHeader.dat / ClaimHeader.fmt        -  Native format data file and its format file
+    #        ClaimHeader.txt / ClaimHeader.txt.Error.Txt  -  Rejected rows and error messages
+
+    options = list()
+
+    if thisConfig['SQL_BULKINSERT_FILE_FORMAT'].upper() == constant.NATIVE_FILE_FORMAT:
+        dataFile = f"{filepath}.dat"
+        options.append(f"FORMATFILE = '{filepath}.fmt'")
+    else:
+        dataFile = f"{filepath}.csv"
+        options.append("FIELDTERMINATOR = '|'")
+        # Note: A row terminator of \n is interpreted by Bulk Insert as CRLF.
+        options.append("ROWTERMINATOR = '\\n'")
+        options.append("FIRSTROW = 2")
+        options.append(f"CODEPAGE = '{CSV_CODEPAGE}'")
+
+    options.append("KEEPIDENTITY")
+
+    # The staged rows are sorted by the clustered index key, so tell SQL Server, and take a table lock.
+    # The table lock allows a minimally logged load (under the simple or bulk-logged recovery model), and the ORDER
+    # hint saves SQL Server sorting the rows. ordered is False for a table whose rows couldn't be staged in order.
+    if thisConfig['SQL_BULKINSERT_ORDERED'] and ordered and table in tableSchema.CLUSTERED_KEY_COLUMNS:
+        orderColumns = ', '.join(f"[{column}] ASC" for column in tableSchema.CLUSTERED_KEY_COLUMNS[table])
+        options.append(f"ORDER ({orderColumns})")
+        options.append("TABLOCK")
+
+    # The table's tuned batch size, or SQL_BULKINSERT_BATCHSIZE when batch sizes aren't tuned.
+    if batchSize is None:
+        batchSize = batchTuner.getBatchSize(table, thisConfig)
+    options.append(f"BATCHSIZE = {batchSize}")
+    options.append(f"MAXERRORS = {thisConfig['SQL_BULKINSERT_MAXERRORS']}")
+    options.append(f"ERRORFILE = '{filepath}.txt'")
+
+    return dataFile, options
+
+
+
+
+
+def insertBulkClaimTableRows(table, filepath, thisConfig, thisJob, rowsToInsert=None, batchSize=None, ordered=True):
+
+    # Bulk Insert the table's staging file. Each batch of batchSize rows is committed on its own.
+    # rowsToInsert is the number of rows staged, when known. Otherwise it is taken as the rows inserted plus the
+    # rows rejected to the ERRORFILE.
+    # The table detail entry's BulkInsertCompleted is False if the statement failed (e.g. MAXERRORS was exceeded),
+    # in which case the batch being loaded was rolled back.
+    dataFile, options = getBulkInsertOptions(table, filepath, thisConfig, batchSize, ordered)
+    sql = f"BULK INSERT [dbo].[{table}] FROM '{dataFile}' WITH ({', '.join(options)})"
+
+    successfulInserts = 0
+    completed = False
+    startTime = time.perf_counter()
+
+    conn = connection.getConnection(thisConfig, autocommit=True)
+    try:
+        cursor = conn.cursor()
+        cursor.execute(sql)
+        successfulInserts = max(0, cursor.rowcount)
+        completed = True
+        cursor.close()
+    except:
+        message = "ERROR bulk inserting " + table + " rows from"
+        logger.error(f"{message:55}: {dataFile}")
+        logger.error(f"{' ':55}: {sys.exc_info()[0]}")
+        logger.error(f"{' ':55}: {sys.exc_info()[1]}")
+    finally:
+        conn.close()
+
+    elapsedSeconds = time.perf_counter() - startTime
+
+    if rowsToInsert is None:
+        rowsToInsert = successfulInserts + countErrorEntries(f"{filepath}.txt.Error.Txt")
+
+    failedInserts = max(0, rowsToInsert - successfulInserts)
+
+    thisJob['TableDetails'].append({
+        'ClaimTable' : table,
+        'RowsToInsert' : rowsToInsert,
+        'SuccessfulInserts' : successfulInserts,
+        'FailedInserts' : failedInserts,
+        'ElapsedSeconds' : elapsedSeconds,
+        'BulkInsertCompleted' : completed,
+    })
+
+    logger.info(f"{table:25} {'rows bulk inserted: ':33}{successfulInserts} of {rowsToInsert} in {elapsedSeconds:.1f}s")
+
+    return thisJob
+
+
+
+
+
+def countErrorEntries(filePathAndName):
+
+    # The error file holds an entry per rejected row, e.g. "Row 12 File Offset 2311 ErrorFile Offset 0 - ..."
+    if not os.path.exists(filePathAndName):
+        return 0
+
+    with open(filePathAndName, 'rb') as f:
+        data = f.read()
+
+    # The error file may be written as UTF-16.
+    if data.startswith(b'\xff\xfe'):
+        data = data.decode('utf-16').encode('latin-1', errors='replace')
+
+    return data.count(b'ErrorFile Offset')
@@ -0,0 +1,38 @@
+'''
+Purpose:
+
+    This module provides pyodbc connections to the Claims Reporting database for the modules that manage
+    their own connections, e.g. batchedInsertControl.
+
+    pyodbc enables ODBC Driver Manager connection pooling by default. The pool is process wide, so closing
+    a connection returns it to the pool, and connections are shared across insurers when several insurers
+    are processed concurrently.
+
+Revision History:
+
+    19/10/2026   agent            Created.
+
+'''
+
+## Third Party Libraries
+import pyodbc
+
+
+
+
+
+def getConnectionString(thisConfig):
+
+    return (f"DRIVER={{{thisConfig['SQL_DATABASE_DRIVER']}}};"
+            f"SERVER={thisConfig['SQL_DATABASE_IP']};"
+            f"DATABASE={thisConfig['SQL_DATABASE_NAME']};"
+            f"UID={thisConfig['SQL_DATABASE_USERNAME']};"
+            f"PWD={thisConfig['SQL_DATABASE_PASSWORD']}")
+
+
+
+
+
+def getConnection(thisConfig, autocommit=False):
+
+    return pyodbc.connect(getConnectionString(thisConfig), autocommit=autocommit)
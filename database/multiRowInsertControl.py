@@ -0,0 +1,173 @@
+'''
+Purpose:
+
+    This module loads claim tables from the table dictionary lists in multi-row INSERT statements, for the SINGLE
+    update type. See APP_UPDATE_TYPE_SINGLE_BATCH_ROWS.
+
+    A SINGLE insert makes a round trip, and a commit, per row, so any row failing is isolated and logged on its own.
+    Here rows are sent in batches, each one INSERT statement with a VALUES row per table row, e.g.
+
+        INSERT INTO [dbo].[ClaimPayment] ([ClaimPaymentId], [ClaimId], ...) VALUES (?, ?, ...), (?, ?, ...), ...
+
+    and each batch is committed on its own. If a batch fails, it is rolled back and split in half, and each half is
+    inserted again, until each failing row has been inserted on its own (see batchedInsertControl.insertBisecting).
+    So the rows that fail are isolated, and logged, as they are by SINGLE inserts, while the rows that don't fail are
+    inserted a batch at a time.
+
+    The statements are prepared once per table and batch size. pyodbc re-uses a cursor's prepared statement while
+    the same SQL is executed, so a cursor is kept for each batch size used (see StatementCache). All the full
+    batches of a table share one prepared statement.
+
+    A batch is bounded by SQL Server's limits of 2,100 parameters per statement and 1,000 rows per VALUES clause.
+    The application allocated identity values are kept (IDENTITY_INSERT), as the child tables reference them.
+
+Revision History:
+
+    19/10/2026   agent            Isolate failing rows with batchedInsertControl.insertBisecting.
+    19/10/2026   agent            Created.
+
+'''
+
+## Standard Libraries
+import logging
+import time
+
+## Local Libraries
+from database import batchedInsertControl, connection
+from models import tableSchema
+
+## Module logger
+logger = logging.getLogger(__name__)
+
+
+## SQL Server limits. A statement takes fewer than 2,100 parameters, and a VALUES clause up to 1,000 rows.
+MAX_PARAMETERS = 2099
+MAX_VALUES_ROWS = 1000
+
+
+
+
+
+class StatementCache:
+
+    # A cursor per batch size (rows per statement), each re-using its prepared multi-row INSERT statement.
+
+    def __init__(self, table, keys, conn):
+
+        self.table = table
+        self.keys = keys
+        self.conn = conn
+        self.statements = dict()
+
+
+    def execute(self, rows):
+
+        rowCount = len(rows)
+        if rowCount not in self.statements:
+            self.statements[rowCount] = (self.conn.cursor(), getInsertSql(self.table, self.keys, rowCount))
+        cursor, sql = self.statements[rowCount]
+        cursor.execute(sql, [value for row in rows for value in row])
+
+
+    def close(self):
+
+        for cursor, sql in self.statements.values():
+            cursor.close()
+        self.statements.clear()
+
+
+
+
+
+def getInsertSql(table, keys, rowCount):
+
+    columns = ', '.join(f"[{key}]" for key in keys)
+    rowParameters = '(' + ', '.join('?' for key in keys) + ')'
+    return f"INSERT INTO [dbo].[{table}] ({columns}) VALUES " + ', '.join(rowParameters for row in range(rowCount))
+
+
+
+
+
+def getBatchRows(keys, thisConfig):
+
+    # The configured rows per batch, within SQL Server's statement limits.
+    return max(1, min(thisConfig['APP_UPDATE_TYPE_SINGLE_BATCH_ROWS'], MAX_PARAMETERS // len(keys), MAX_VALUES_ROWS))
+
+
+
+
+
+def insertMultiRowClaimTableRows(table, ClaimsTableDictList, thisConfig, thisJob):
+
+    # Assertion: We only get here if the list has at least one row, so rely on ClaimsTableDictList[0] having data.
+    keys = tuple(ClaimsTableDictList[0])
+    batchRows = getBatchRows(keys, thisConfig)
+
+    # The key column identifies each failed row in the log.
+    keyColumn = tableSchema.KEY_COLUMNS[table]
+    keyIndex = keys.index(keyColumn) if keyColumn in keys else None
+
+    rowsToInsert = 0
+    failedInserts = 0
+
+    startTime = time.perf_counter()
+
+    conn = connection.getConnection(thisConfig)
+    try:
+        statements = StatementCache(table, keys, conn)
+
+        # The application allocates the identity (Primary Key) values, so keep them.
+        identityCursor = conn.cursor()
+        if table in tableSchema.IDENTITY_TABLES:
+            identityCursor.execute(f"SET IDENTITY_INSERT [dbo].[{table}] ON")
+
+        batch = list()
+        for d in ClaimsTableDictList:
+            batch.append(tuple(d[key] for key in keys))
+            if len(batch) >= batchRows:
+                failedInserts += insertBatch(table, statements, conn, batch, keyColumn, keyIndex)
+                rowsToInsert += len(batch)
+                batch = list()
+        if len(batch) > 0:
+            failedInserts += insertBatch(table, statements, conn, batch, keyColumn, keyIndex)
+            rowsToInsert += len(batch)
+
+        if table in tableSchema.IDENTITY_TABLES:
+            identityCursor.execute(f"SET IDENTITY_INSERT [dbo].[{table}] OFF")
+
+        identityCursor.close()
+        statements.close()
+    finally:
+        conn.close()
+
+    successfulInserts = rowsToInsert - failedInserts
+    elapsedSeconds = time.perf_counter() - startTime
+
+    thisJob['TableDetails'].append({
+        'ClaimTable' : table,
+        'RowsToInsert' : rowsToInsert,
+        'SuccessfulInserts' : successfulInserts,
+        'FailedInserts' : failedInserts,
+        'ElapsedSeconds' : elapsedSeconds,
+    })
+
+    logger.info(f"{table:25} {'rows inserted: ':33}{successfulInserts} of {rowsToInsert} in {elapsedSeconds:.1f}s")
+
+    return thisJob
+
+
+
+
+
+def insertBatch(table, statements, conn, rows, keyColumn, keyIndex):
+
+    # Insert the rows, isolating those that fail. Returns the number of rows that failed, each of which is logged.
+    failures = batchedInsertControl.insertBisecting(statements.execute, conn, rows)
+
+    for row, error in failures:
+        message = "ERROR inserting " + table + " row"
+        logger.error(f"{message:55}: {keyColumn} {row[keyIndex] if keyIndex is not None else ''}")
+        logger.error(f"{' ':55}: {error}")
+
+    return len(failures)
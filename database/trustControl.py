@@ -0,0 +1,139 @@
+'''
+Purpose:
+
+    This module re-marks the Foreign Key constraints of the claim tables loaded by a job as trusted.
+
+    A Bulk Insert (without CHECK_CONSTRAINTS) leaves the Foreign Keys of the table it loads marked as not trusted,
+    so the query optimizer can't rely on them. Re-checking a constraint (ALTER TABLE ... WITH CHECK CHECK CONSTRAINT)
+    scans the table, which for large tables is the most expensive step at the end of a job.
+
+    Unlike insertControl.remarkClaimTablesAsTrusted, which re-checks the constraints of every claim table:
+     - Only the tables loaded by this job (thisJob['TableDetails'] entries with successful inserts) are checked.
+     - Constraints already trusted (sys.foreign_keys.is_not_trusted = 0) are skipped.
+     - The tables are checked concurrently, each on its own connection, up to SQL_TRUST_WORKERS at a time.
+       The constraints of one table are checked in turn, as each check locks the table.
+
+    The constraints left not trusted, e.g. because of rows violating them, are logged and recorded in
+    thisJob['UntrustedConstraints'].
+
+Revision History:
+
+    19/10/2026   agent            Created.
+
+'''
+
+## Standard Libraries
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import sys
+import threading
+import time
+
+## Local Libraries
+from database import connection
+
+## Module logger
+logger = logging.getLogger(__name__)
+
+
+## Foreign Keys of the given tables not yet trusted. Disabled constraints are left as they are.
+UNTRUSTED_FOREIGN_KEYS_SQL = '''
+    SELECT OBJECT_NAME(fk.parent_object_id), fk.name
+    FROM sys.foreign_keys fk
+    WHERE fk.is_not_trusted = 1
+      AND fk.is_disabled = 0
+      AND OBJECT_SCHEMA_NAME(fk.parent_object_id) = 'dbo'
+      AND OBJECT_NAME(fk.parent_object_id) IN ({tables})
+'''
+
+
+
+
+
+def remarkLoadedTablesAsTrusted(thisConfig, thisJob):
+
+    loadedTables = getLoadedTables(thisJob)
+    if len(loadedTables) == 0:
+        logger.info(f"{'Foreign Keys re-trusted':30}: No tables loaded")
+        return thisJob
+
+    untrustedForeignKeys = getUntrustedForeignKeys(loadedTables, thisConfig)
+    if len(untrustedForeignKeys) == 0:
+        logger.info(f"{'Foreign Keys re-trusted':30}: All constraints of the loaded tables already trusted")
+        return thisJob
+
+    startTime = time.perf_counter()
+    untrustedConstraints = list()
+
+    # Name the worker threads after this thread, so log records are routed to the right insurer's log file.
+    with ThreadPoolExecutor(max_workers=thisConfig['SQL_TRUST_WORKERS'], thread_name_prefix=threading.current_thread().name) as executor:
+        futures = [executor.submit(checkTableConstraints, table, constraints, thisConfig)
+            for table, constraints in untrustedForeignKeys.items()]
+        for future in futures:
+            untrustedConstraints.extend(future.result())
+
+    thisJob['UntrustedConstraints'] = untrustedConstraints
+
+    constraintCount = sum(len(constraints) for constraints in untrustedForeignKeys.values())
+    logger.info(f"{'Foreign Keys re-trusted':30}: {constraintCount - len(untrustedConstraints)} of {constraintCount} "
+        f"on {len(untrustedForeignKeys)} tables in {time.perf_counter() - startTime:.1f}s")
+
+    return thisJob
+
+
+
+
+
+def getLoadedTables(thisJob):
+
+    return sorted(set(tableDetail['ClaimTable'] for tableDetail in thisJob['TableDetails']
+        if tableDetail.get('SuccessfulInserts', 0) > 0))
+
+
+
+
+
+def getUntrustedForeignKeys(tables, thisConfig):
+
+    # Returns the untrusted constraint names of each table.
+    untrustedForeignKeys = dict()
+
+    conn = connection.getConnection(thisConfig, autocommit=True)
+    try:
+        cursor = conn.cursor()
+        cursor.execute(UNTRUSTED_FOREIGN_KEYS_SQL.format(tables=', '.join('?' for table in tables)), tables)
+        for table, constraint in cursor.fetchall():
+            untrustedForeignKeys.setdefault(table, list()).append(constraint)
+        cursor.close()
+    finally:
+        conn.close()
+
+    return untrustedForeignKeys
+
+
+
+
+
+def checkTableConstraints(table, constraints, thisConfig):
+
+    # Returns the constraints that could not be re-marked as trusted.
+    untrustedConstraints = list()
+
+    conn = connection.getConnection(thisConfig, autocommit=True)
+    try:
+        cursor = conn.cursor()
+        for constraint in constraints:
+            startTime = time.perf_counter()
+            try:
+                cursor.execute(f"ALTER TABLE [dbo].[{table}] WITH CHECK CHECK CONSTRAINT [{constraint}]")
+                logger.info(f"{table:25} {'constraint re-trusted: ':33}{constraint} in {time.perf_counter() - startTime:.1f}s")
+            except:
+                message = "Unable to re-mark constraint as trusted"
+                logger.error(f"{message:55}: {table}: {constraint}")
+                logger.error(f"{' ':55}: {sys.exc_info()[1]}")
+                untrustedConstraints.append({'ClaimTable' : table, 'Constraint' : constraint, 'Error' : str(sys.exc_info()[1])})
+        cursor.close()
+    finally:
+        conn.close()
+
+    return untrustedConstraints
@@ -0,0 +1,177 @@
+'''
+Purpose:
+
+    This module defines schema details for the Claims Reporting database tables that are needed when
+    staging and loading table rows, as opposed to mapping them (see the mappings module).
+
+    Column types are those of the SQL Server columns, using the following type names:
+     - 'int', 'bigint', 'bit', 'float'
+     - 'nvarchar'            - Any character, date, time or decimal column. Staged as text and converted by SQL Server.
+
+    Only columns whose type can't be reliably inferred from the Python values need to be listed.
+    e.g. Bit columns, since the values may be None for every row in a batch.
+
+    Validation rules are declared per table column. See VALIDATION_RULES and control/validation.py.
+
+    Low cardinality (categorical) columns are declared per table. See CATEGORICAL_COLUMNS.
+
+Revision History:
+
+    19/10/2026   agent            Only list the CATEGORICAL_COLUMNS known to be mapped.
+    19/10/2026   agent            Added CATEGORICAL_COLUMNS.
+    19/10/2026   agent            Added PARENT_TABLES and LOAD_LEVELS.
+    19/10/2026   agent            Added CLUSTERED_KEY_COLUMNS.
+    19/10/2026   agent            Added VALIDATION_RULES.
+    19/10/2026   agent            Added IDENTITY_TABLES.
+    19/10/2026   agent            Created.
+
+'''
+
+
+## Claim tables, in the order they are processed and loaded (parent tables before child tables).
+CLAIM_TABLES = (
+    'ClaimObject',
+    'ClaimHeader',
+    'ClaimInsured',
+    'ClaimBroker',
+    'ClaimStatusHistory',
+    'ClaimMotorDetail',
+    'ClaimFeedback',
+    'ClaimReserveMovement',
+    'ClaimPayment',
+    'ClaimPaymentDetail',
+    'ClaimPaymentHistory',
+    'ClaimRecovery',
+    'ClaimRecoveryDetail',
+    'ClaimRecoveryHistory',
+)
+
+
+## Parent tables of each table, i.e. the tables its Foreign Keys reference.
+PARENT_TABLES = {
+    'ClaimObject'           : (),
+    'ClaimHeader'           : ('ClaimObject',),
+    'ClaimInsured'          : ('ClaimHeader',),
+    'ClaimBroker'           : ('ClaimHeader',),
+    'ClaimStatusHistory'    : ('ClaimHeader',),
+    'ClaimMotorDetail'      : ('ClaimHeader',),
+    'ClaimFeedback'         : ('ClaimHeader',),
+    'ClaimReserveMovement'  : ('ClaimHeader',),
+    'ClaimPayment'          : ('ClaimHeader',),
+    'ClaimPaymentDetail'    : ('ClaimPayment',),
+    'ClaimPaymentHistory'   : ('ClaimPayment',),
+    'ClaimRecovery'         : ('ClaimHeader',),
+    'ClaimRecoveryDetail'   : ('ClaimRecovery',),
+    'ClaimRecoveryHistory'  : ('ClaimRecovery',),
+}
+
+
+## Claim tables grouped by Foreign Key level. The tables of a level only reference tables of earlier levels,
+#  so can be loaded concurrently once the earlier levels are loaded.
+def getLoadLevels():
+    levels = dict()
+    for table in CLAIM_TABLES:
+        levels[table] = max((levels[parent] + 1 for parent in PARENT_TABLES[table]), default=0)
+    return tuple(tuple(table for table in CLAIM_TABLES if levels[table] == level) for level in range(max(levels.values()) + 1))
+
+LOAD_LEVELS = getLoadLevels()
+
+
+## Identity (Primary Key) column of each table. Allocated by the application. See response.processResponseDetail.
+KEY_COLUMNS = {
+    'ClaimObject'           : 'ClaimId',
+    'ClaimHeader'           : 'ClaimId',
+    'ClaimInsured'          : 'ClaimInsuredId',
+    'ClaimBroker'           : 'ClaimBrokerId',
+    'ClaimStatusHistory'    : 'ClaimStatusHistoryId',
+    'ClaimMotorDetail'      : 'ClaimMotorDetailId',
+    'ClaimFeedback'         : 'ClaimFeedbackId',
+    'ClaimReserveMovement'  : 'ClaimReserveMovementId',
+    'ClaimPayment'          : 'ClaimPaymentId',
+    'ClaimPaymentDetail'    : 'ClaimPaymentDetailId',
+    'ClaimPaymentHistory'   : 'ClaimPaymentHistoryId',
+    'ClaimRecovery'         : 'ClaimRecoveryId',
+    'ClaimRecoveryDetail'   : 'ClaimRecoveryDetailId',
+    'ClaimRecoveryHistory'  : 'ClaimRecoveryHistoryId',
+}
+
+
+## Clustered index key columns of each table, in key order. See SQL_BULKINSERT_ORDERED.
+#  Each table is clustered on its application allocated identity column.
+CLUSTERED_KEY_COLUMNS = {table : (column,) for table, column in KEY_COLUMNS.items()}
+
+
+## Tables with an identity column. i.e. All tables except ClaimObject, which is keyed by its ClaimHeader's ClaimId.
+IDENTITY_TABLES = tuple(table for table in CLAIM_TABLES if table != 'ClaimObject')
+
+
+## Low cardinality (categorical) columns of each table. i.e. Columns repeating a small set of values, such as a
+#  broker's head office or a vehicle's make. Their string values are interned as rows are appended to a table
+#  dictionary list (see spillBuffer.newTableDictList), so every occurrence of a value shares one string object.
+#  Free text columns, e.g. names and models, aren't categorical. Only columns known to be mapped are listed.
+#  As the values are ordinary strings, nothing needs decoding when the rows are staged or loaded.
+CATEGORICAL_COLUMNS = {
+    'ClaimBroker'           : frozenset({'HeadOffice'}),
+    'ClaimMotorDetail'      : frozenset({'VehicleMake'}),
+}
+
+
+## Column types that can't be reliably inferred from the Python values.
+COLUMN_TYPES = {
+    'ClaimObject'           : {'ClaimId': 'int'},
+    'ClaimHeader'           : {'ClaimId': 'int', 'IsCurrentVersion': 'bit', 'IsMultiRiskPolicy': 'bit'},
+    'ClaimInsured'          : {'ClaimInsuredId': 'int'},
+    'ClaimBroker'           : {'ClaimBrokerId': 'int'},
+    'ClaimStatusHistory'    : {'ClaimStatusHistoryId': 'int'},
+    'ClaimMotorDetail'      : {'ClaimMotorDetailId': 'int', 'IsVehicleTotalLoss': 'bit', 'IsDriverListed': 'bit', 'IsTPInvolved': 'bit'},
+    'ClaimFeedback'         : {'ClaimFeedbackId': 'int'},
+    'ClaimReserveMovement'  : {'ClaimReserveMovementId': 'int', 'IsSystemCreated': 'bit'},
+    'ClaimPayment'          : {'ClaimPaymentId': 'int', 'IsInvoice': 'bit', 'XsCollectedOnInvoice': 'bit'},
+    'ClaimPaymentDetail'    : {'ClaimPaymentDetailId': 'int', 'IsTaxFree': 'bit'},
+    'ClaimPaymentHistory'   : {'ClaimPaymentHistoryId': 'int', 'IsSystemCreated': 'bit'},
+    'ClaimRecovery'         : {'ClaimRecoveryId': 'int', 'IsInvoice': 'bit', 'IsXsCollection': 'bit', 'IsSalvage': 'bit'},
+    'ClaimRecoveryDetail'   : {'ClaimRecoveryDetailId': 'int', 'IsTaxFree': 'bit'},
+    'ClaimRecoveryHistory'  : {'ClaimRecoveryHistoryId': 'int', 'IsSystemCreated': 'bit'},
+}
+
+
+## Validation rules, per table column. See control/validation.py. Applied when APP_VALIDATE_ROWS is True.
+#  Rule keys (all optional):
+#   - 'Type'       - A COLUMN_TYPES type name, or 'date'. The Python value must be of a matching type.
+#   - 'Nullable'   - Default True. If False, None (or a missing column) is rejected.
+#   - 'MaxLength'  - Maximum string length.
+#   - 'Pattern'    - Regular expression the whole string must match.
+#   - 'Min', 'Max' - Inclusive range of a numeric value.
+#  Columns not listed aren't validated.
+VALIDATION_RULES = {
+    'ClaimObject'           : {'ClaimId': {'Type': 'int', 'Nullable': False, 'Min': 1}},
+    'ClaimHeader'           : {'ClaimId': {'Type': 'int', 'Nullable': False, 'Min': 1},
+                               'ClaimNo': {'Type': 'nvarchar', 'Nullable': False, 'Pattern': r'\S.*'},
+                               'IsCurrentVersion': {'Type': 'bit'},
+                               'IsMultiRiskPolicy': {'Type': 'bit'}},
+    'ClaimInsured'          : {'ClaimInsuredId': {'Type': 'int', 'Nullable': False, 'Min': 1}},
+    'ClaimBroker'           : {'ClaimBrokerId': {'Type': 'int', 'Nullable': False, 'Min': 1}},
+    'ClaimStatusHistory'    : {'ClaimStatusHistoryId': {'Type': 'int', 'Nullable': False, 'Min': 1}},
+    'ClaimMotorDetail'      : {'ClaimMotorDetailId': {'Type': 'int', 'Nullable': False, 'Min': 1},
+                               'IsVehicleTotalLoss': {'Type': 'bit'},
+                               'IsDriverListed': {'Type': 'bit'},
+                               'IsTPInvolved': {'Type': 'bit'}},
+    'ClaimFeedback'         : {'ClaimFeedbackId': {'Type': 'int', 'Nullable': False, 'Min': 1}},
+    'ClaimReserveMovement'  : {'ClaimReserveMovementId': {'Type': 'int', 'Nullable': False, 'Min': 1},
+                               'IsSystemCreated': {'Type': 'bit'}},
+    'ClaimPayment'          : {'ClaimPaymentId': {'Type': 'int', 'Nullable': False, 'Min': 1},
+                               'IsInvoice': {'Type': 'bit'},
+                               'XsCollectedOnInvoice': {'Type': 'bit'}},
+    'ClaimPaymentDetail'    : {'ClaimPaymentDetailId': {'Type': 'int', 'Nullable': False, 'Min': 1},
+                               'IsTaxFree': {'Type': 'bit'}},
+    'ClaimPaymentHistory'   : {'ClaimPaymentHistoryId': {'Type': 'int', 'Nullable': False, 'Min': 1},
+                               'IsSystemCreated': {'Type': 'bit'}},
+    'ClaimRecovery'         : {'ClaimRecoveryId': {'Type': 'int', 'Nullable': False, 'Min': 1},
+                               'IsInvoice': {'Type': 'bit'},
+                               'IsXsCollection': {'Type': 'bit'},
+                               'IsSalvage': {'Type': 'bit'}},
+    'ClaimRecoveryDetail'   : {'ClaimRecoveryDetailId': {'Type': 'int', 'Nullable': False, 'Min': 1},
+                               'IsTaxFree': {'Type': 'bit'}},
+    'ClaimRecoveryHistory'  : {'ClaimRecoveryHistoryId': {'Type': 'int', 'Nullable': False, 'Min': 1},
+                               'IsSystemCreated': {'Type': 'bit'}},
+}
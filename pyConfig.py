@@ -11,12 +11,37 @@ Configuration Options:
      1) "ORG_1"                    - Process ORG_1 Claims.
      2) "ORG_2"                    - Process ORG_2 Claims.
      3) "ORG_3"                    - Process ORG_3 Claims.
+    Notes:
+     1) Taken from the "insurer" environment variable.
+     2) To process several insurers concurrently within the one process, set the "insurers" environment variable
+        to a comma separated list instead, e.g. "ORG_1,ORG_2,ORG_3". See getInsurerList.
+        Each insurer is given its own configuration, with APP_MULTI_INSURER set to True.
+        The insurers' API calls run concurrently, but their keys are allocated, and their rows loaded, one insurer at a time.
+        If any insurer's job fails, the application exits with status 1 once the other insurers' jobs have finished.
+
+  APP_MULTI_INSURER                Type: Boolean; Default: False
+    Notes:
+     1) Set by the application, not configured. True when this insurer is one of several being processed concurrently.
+     2) When True, staging (csv) files are written to an insurer sub-directory of SQL_BULKINSERT_INPUT_FILEPATH
+        and log records are written to an insurer specific log file.
 
   APP_JOB_TYPE                     Type: String; Default:. 'API'
     Options:
      1) "API"                      - Call Get Claims API to retrieve data to be processed.
      2) "CSV"                      - Read "csv" files to get data to be processed.
 
+  APP_CSV_READER                   Type: String; Default: 'STANDARD'
+    Options:
+     1) "STANDARD"                 - CSV jobs read the staged files with fileProcessing.processCSVFiles.
+     2) "STREAMING"                - CSV jobs read the staged files in large blocks into typed column batches, and load
+                                     the tables concurrently by Foreign Key level. See control/csvLoader.py.
+     3) "MMAP"                     - As "STREAMING", reading the staged files through a memory map.
+
+  APP_CSV_LOAD_WORKERS             Type: Integer; Default: 4
+    Notes:
+     1) The maximum number of tables loaded concurrently by the "STREAMING" and "MMAP" CSV readers.
+     2) Datatype is integer - that is, enter without quotes.
+
   APP_RUN_TYPE                     Type: String; Default: 'INSERT'
     Options:
      1) "JSON"                     - Retrieves the JSON response only. It is not processed against the Claims Reporting database.
@@ -45,6 +70,76 @@ Configuration Options:
                                      ensure database integrity is maintained. The bulk insert takes input from a file which means SQL
                                      Server requires access to the file across the network. For ORG_1, at least across lower environments,
                                      the network SQL Server is hosted on can't see the network the application is hosted on.
+     4) "BATCHED"                  - Inserts rows from memory over the database connection in batches of SQL_BULKINSERT_BATCHSIZE,
+                                     using pyodbc fast_executemany. As for MANY, each row is a fully logged INSERT, so it is not
+                                     a bulk copy, and is not as fast as BULK. No staging file is written, so SQL Server doesn't
+                                     need access to the application's file system.
+                                     Each batch is committed separately. A failed batch is rolled back and counted as failed inserts.
+                                     See database/batchedInsertControl.py.
+
+  APP_UPDATE_TYPE_SINGLE_BATCH_ROWS Type: Integer; Default: 0
+    Options:
+     1) 0 or 1                     - SINGLE inserts each row in its own statement and transaction.
+     2) n > 1                      - SINGLE inserts up to n rows per multi-row INSERT statement and transaction. A batch that
+                                     fails is rolled back and split in half until each failing row is inserted, and logged,
+                                     on its own. See database/multiRowInsertControl.py.
+    Notes:
+     1) Only applies when APP_UPDATE_TYPE is "SINGLE".
+     2) Batches are capped at 1,000 rows, and at 2,099 parameters (columns x rows), by SQL Server.
+     3) Datatype is integer - that is, enter without quotes.
+
+  APP_CHUNK_SIZE                   Type: Integer; Default: 0
+    Options:
+     1) 0                          - Map all claims in the response before writing and loading the tables.
+     2) n > 0                      - Write and load the tables every n claims. Bounds memory use for large responses.
+    Notes:
+     1) Key allocation and per table reconciliation (thisJob['TableDetails']) carry across chunks.
+     2) The ClaimHeader set to not current updates are applied with each chunk.
+     3) For BULK, each chunk's Bulk Insert error files are moved to the BulkErrors directory of the staging
+        directory, so the next chunk's Bulk Insert can write its own.
+     4) Datatype is integer - that is, enter without quotes.
+
+  APP_BUFFER_MEMORY_BUDGET_MB      Type: Integer; Default: 0
+    Options:
+     1) 0                          - Hold all table rows in memory.
+     2) n > 0                      - Hold up to n MB (estimated) of table rows in memory. Past this, the table holding the
+                                     most memory spills its rows to temporary segment files, which are streamed back when
+                                     the table is written to file or loaded.
+    Notes:
+     1) An alternative to APP_CHUNK_SIZE. Each table is still loaded all-or-nothing.
+     2) For MANY and SINGLE updates, each table is read back into memory in turn when loaded.
+     3) Datatype is integer - that is, enter without quotes.
+
+  APP_BUFFER_SPILL_DIRECTORY       Type: String; Default ''
+    Notes:
+     1) Local directory for segment files. If '', the system temporary directory is used.
+
+  APP_VALIDATE_ROWS                Type: Boolean; Default: False
+    Options:
+     1) True                       - Validate the table rows against the rules declared in tableSchema.VALIDATION_RULES
+                                     before they are written or loaded. Rows failing validation are not loaded, and are
+                                     written to <table>.Rejects.csv in the SQL_BULKINSERT_INPUT_FILEPATH directory.
+     2) False                      - Don't validate. Invalid rows fail when loaded.
+    Notes:
+     1) Recommended for MANY updates, where executemany aborts on the first invalid row.
+     2) The rows rejected are counted as RejectedRows in each table's details. A claim whose ClaimHeader row is
+        rejected keeps its current version current.
+     3) Datatype is boolean - that is, enter without quotes.
+
+  APP_CHECKPOINT_DIRECTORY         Type: String; Default ''
+    Options:
+     1) ''                         - No checkpoints. A failed job is rerun from the start.
+     2) A directory                - Keep a checkpoint journal of completed pages, staged files and committed tables in
+                                     this directory, so a rerun of a failed job skips work already done.
+    Notes:
+     1) The journal is identified by INSURER, API_URL, API_PARAM_LASTUPDATED, APP_RUN_TYPE and APP_UPDATE_TYPE, so
+        rerun the failed job with the same parameters. The journal is removed when the job completes.
+     2) Table level resume (load only the tables not yet committed, from the staged files) applies to BULK updates,
+        when APP_CHUNK_SIZE is 0 and SQL_BULKINSERT_COMPRESSION is "NONE". Otherwise pages are resumed as a whole.
+     3) When pages are resumed as a whole, a page partly loaded by the failed run (e.g. some chunks, or some tables,
+        committed) isn't loaded again, as its committed rows would be inserted twice. The rerun stops at that page,
+        and keeps the journal, so its rows can be reconciled first.
+     4) See utilities/checkpointUtils.py.
 
   APP_KEEP_RESPONSE                Type: String; Default: 'FALSE'
     Options:
@@ -68,6 +163,53 @@ Configuration Options:
      1) True                       - Retrieve data in stream mode - all data meeting the LastUpdate criteria retrieved in one call - but maybe inefficient.
      2) False                      - Retrieve data in pagination mode - only data up to the specified page limit retrieved per call - maybe more efficient.
 
+  API_LAZY_JSON                    Type: Boolean; Default: False
+    Options:
+     1) True                       - Parse each response with pysimdjson into lazy, read-only claim views, converting only the
+                                     fields the mappings read. See control/claimView.py.
+     2) False                      - Parse each response into Python dictionaries and lists (response.json()).
+    Notes:
+     1) Requires the pysimdjson package. If it isn't installed, responses are parsed with response.json().
+     2) Not used when APP_KEEP_RESPONSE is "TRUE", as the kept response is written from the whole document.
+     3) Datatype is boolean - that is, enter without quotes.
+
+
+  API_ADAPTIVE_FETCH               Type: Boolean; Default: False
+    Options:
+     1) True                       - Fetch pages concurrently, adjusting the number of requests in flight and the page size
+                                     from the observed latency, payload size and 429/5xx rate (AIMD). Pages are processed in order.
+                                     The settings chosen are recorded in thisJob['AdaptiveFetch']. See control/fetchControl.py.
+     2) False                      - Fetch the page API_PARAM_PAGE of API_PARAM_PERPAGE claims only.
+    Notes:
+     1) Not used when API_PARAM_STREAM is True.
+
+  API_ADAPTIVE_MIN_PERPAGE         Type: Integer; Default: 500
+  API_ADAPTIVE_MAX_PERPAGE         Type: Integer; Default: 20000
+    Notes:
+     1) Page size bounds. Page sizes are API_PARAM_PERPAGE doubled or halved within these bounds.
+
+  API_ADAPTIVE_MAX_CONCURRENCY     Type: Integer; Default: 4
+    Notes:
+     1) Maximum number of requests in flight.
+
+  API_ADAPTIVE_TARGET_SECONDS      Type: Integer; Default: 30
+    Notes:
+     1) Responses slower than this reduce concurrency and page size. Responses faster than half this may increase page size.
+
+  API_ADAPTIVE_MAX_PAGE_MB         Type: Integer; Default: 100
+    Notes:
+     1) The page size is not increased if the doubled payload would exceed this size.
+
+  API_VALIDATOR_CACHE_FILE         Type: String; Default: ''; e.g. 'C:\\ProgramData\\ClaimsReporting\\dev\\validators.json'
+    Options:
+     1) ""                         - Requests are not conditional.
+     2) file path                  - Cache each request's ETag / Last-Modified response headers in this file, and send them as
+                                     If-None-Match / If-Modified-Since on the next identical request. An unchanged response
+                                     then returns 304 Not Modified and no claims are processed.
+
+  SQL_DATABASE_DRIVER              Type: String; Default: 'ODBC Driver 17 for SQL Server'
+    Notes:
+     1) ODBC driver used by modules that open their own connections. See database/connection.py.
 
   SQL_BULKINSERT_INPUT_FILEPATH    Type: String; Default "";
                                    e.g. '\\\\DESKTOP-XXXXXXX\\ClaimsReporting\\temp\\csvfiles\\'
@@ -89,6 +231,66 @@ Configuration Options:
      
      8) Full details: https://docs.microsoft.com/en-us/sql/t-sql/statements/bulk-insert-transact-sql?redirectedfrom=MSDN&view=sql-server-ver15
       
+  SQL_BULKINSERT_FILE_FORMAT       Type: String; Default: 'CSV'
+    Options:
+     1) "CSV"                      - Stage table rows as pipe delimited latin-1 text files (.csv).
+     2) "NATIVE"                   - Stage table rows as SQL Server native format files (.dat) with format files (.fmt).
+                                     Avoids text formatting and parsing of every value, and stores character data as
+                                     UTF-16, so unicode data is not escaped. See utilities/nativeFormat.py.
+
+  SQL_BULKINSERT_ORDERED           Type: Boolean; Default: False
+    Options:
+     1) True                       - Sort each table's staged rows by its clustered index key (tableSchema.CLUSTERED_KEY_COLUMNS),
+                                     and pass the matching ORDER hint, with TABLOCK, to the Bulk Insert. Under the simple or
+                                     bulk-logged recovery model, allows minimally logged, pre-sorted loads, which avoid a sort
+                                     by SQL Server. A table spilled to disk (APP_BUFFER_MEMORY_BUDGET_MB) isn't sorted. If its
+                                     rows aren't already in key order, it is loaded without the ORDER hint.
+     2) False                      - Stage rows in the order they were mapped. No ORDER or TABLOCK hint.
+    Notes:
+     1) TABLOCK takes a table lock for the duration of each table's load.
+     2) Datatype is boolean - that is, enter without quotes.
+
+  SQL_BULKINSERT_REDRIVE           Type: Boolean; Default: False
+    Options:
+     1) True                       - After each table's Bulk Insert, read the rows it rejected (the ERRORFILE) and re-drive
+                                     them with executemany inserts, isolating the rows that fail again. Rows that still fail
+                                     are reported per table in <table>.BulkRejects.csv. The error files are then moved to
+                                     the BulkErrors directory of the staging directory. See control/bulkErrorProcessing.py.
+     2) False                      - Leave the error files for investigation. The next Bulk Insert of the table fails
+                                     until they are removed.
+    Notes:
+     1) Requires SQL_BULKINSERT_INPUT_FILEPATH to be readable by the application, as SQL Server writes the error files there.
+     2) Datatype is boolean - that is, enter without quotes.
+
+  SQL_BULKINSERT_OVERLAP_LOAD      Type: Boolean; Default: False
+    Options:
+     1) True                       - Bulk Insert each table as soon as its staging files are written, on a background worker,
+                                     while the next table's files are written. Tables are still loaded one at a time, in
+                                     table order. Each table's load is recorded as a future in thisJob['LoadFutures'].
+     2) False                      - Write every table's staging files, then Bulk Insert the tables.
+    Notes:
+     1) Only applies when APP_UPDATE_TYPE is "BULK".
+     2) Ignored when APP_CHECKPOINT_DIRECTORY is set, as a page is recorded as staged before its tables are loaded.
+     3) Datatype is boolean - that is, enter without quotes.
+
+  SQL_BULKINSERT_COMPRESSION       Type: String; Default: 'NONE'
+    Options:
+     1) "NONE"                     - Write staging files directly to SQL_BULKINSERT_INPUT_FILEPATH.
+     2) "GZIP"                     - Write staging files to SQL_BULKINSERT_LOCAL_FILEPATH, gzip them, and transfer the
+                                     compressed files to SQL_BULKINSERT_INPUT_FILEPATH. Transfers are reported per table.
+    Notes:
+     1) For "GZIP", the files must be expanded on the SQL Server host before the Bulk Insert. Run the expander there:
+        python -m utilities.stagingTransfer <local path of the share> --watch
+        See utilities/stagingTransfer.py.
+
+  SQL_BULKINSERT_LOCAL_FILEPATH    Type: String; Default: ''; e.g. 'C:\\ProgramData\\ClaimsReporting\\temp\\staging\\'
+    Notes:
+     1) Local directory staging files are written to before being compressed. Used when SQL_BULKINSERT_COMPRESSION is "GZIP".
+
+  SQL_BULKINSERT_EXPAND_TIMEOUT    Type: Integer; Default: 600
+    Notes:
+     1) Seconds to wait for a table's compressed staging files to be expanded before running its Bulk Insert.
+
   SQL_BULKINSERT_BATCHSIZE         Type: Integer; Default: 1000 
     Notes:
      1) This is the number of records processed in a batch and committed at one time.
@@ -100,6 +302,26 @@ Configuration Options:
      1) Job will terminate if the maximum number of errors is reached.
      2) Datatype is integer - that is, enter without quotes.
 
+  SQL_BATCH_TUNER_FILE             Type: String; Default ''
+    Options:
+     1) ''                         - Use SQL_BULKINSERT_BATCHSIZE for every table.
+     2) A file name                - Tune each table's batch size from its row width and measured commit latency, and
+                                     keep the tuned sizes in this (JSON) file across runs. Applies to BULK (BATCHSIZE)
+                                     and BATCHED (rows per executemany). MANY always passes each table's rows in one
+                                     executemany, so each table is loaded all-or-nothing. See database/batchTuner.py.
+
+  SQL_EXECUTEMANY_MAX_MB           Type: Integer; Default: 64
+    Notes:
+     1) Caps the rows per executemany (BATCHED) so the fast_executemany parameter arrays,
+        estimated from the row width, fit within this many MB.
+     2) Datatype is integer - that is, enter without quotes.
+
+  SQL_TRUST_WORKERS                Type: Integer; Default: 4
+    Notes:
+     1) At the end of a job, the Foreign Keys of the tables it loaded are re-marked as trusted. This is the maximum
+        number of tables checked concurrently, each on its own connection. See database/trustControl.py.
+     2) Datatype is integer - that is, enter without quotes.
+
   LOG_LEVEL                        Type: String; Default: "INFO"
     Options:
      1) "DEBUG"                    - Detailed information, typically of interest only when diagnosing problems.
@@ -116,6 +338,24 @@ Configuration Options:
          
 Revision History:
 
+    19/10/2026   agent            Added SQL_BULKINSERT_OVERLAP_LOAD parameter.
+    19/10/2026   agent            Added APP_UPDATE_TYPE_SINGLE_BATCH_ROWS parameter.
+    19/10/2026   agent            Added API_LAZY_JSON parameter.
+    19/10/2026   agent            Added SQL_TRUST_WORKERS parameter.
+    19/10/2026   agent            Added SQL_BULKINSERT_REDRIVE parameter.
+    19/10/2026   agent            Added APP_CSV_READER and APP_CSV_LOAD_WORKERS parameters.
+    19/10/2026   agent            Added SQL_BATCH_TUNER_FILE and SQL_EXECUTEMANY_MAX_MB parameters.
+    19/10/2026   agent            Added SQL_BULKINSERT_ORDERED parameter.
+    19/10/2026   agent            Added APP_VALIDATE_ROWS parameter.
+    19/10/2026   agent            Added APP_CHECKPOINT_DIRECTORY parameter.
+    19/10/2026   agent            Added API_ADAPTIVE_ parameters.
+    19/10/2026   agent            Added API_VALIDATOR_CACHE_FILE parameter.
+    19/10/2026   agent            Added BATCHED APP_UPDATE_TYPE and SQL_DATABASE_DRIVER parameter.
+    19/10/2026   agent            Added SQL_BULKINSERT_COMPRESSION, SQL_BULKINSERT_LOCAL_FILEPATH and SQL_BULKINSERT_EXPAND_TIMEOUT parameters.
+    19/10/2026   agent            Added SQL_BULKINSERT_FILE_FORMAT parameter.
+    19/10/2026   agent            Added APP_BUFFER_MEMORY_BUDGET_MB and APP_BUFFER_SPILL_DIRECTORY parameters.
+    19/10/2026   agent            Added APP_CHUNK_SIZE parameter.
+    19/10/2026   agent            Added getInsurerList and the insurer/multiInsurer parameters to genConfig.
     16/11/2020   Mark Schaafsma   Added logging parameters and validation.
     12/10/2020   Mark Schaafsma   Added further parameter validation and default processing.
     14/09/2020   Mark Schaafsma   Added APP_JOB_TYPE parameter.
@@ -133,7 +373,23 @@ import constant
 
 
    
-def genConfig():
+def getInsurerList():
+
+    # Returns the list of insurers to be processed, from the "insurers" environment variable.
+    # Several insurers are processed concurrently. A single insurer is processed as if set by the "insurer"
+    # environment variable. An empty list means the "insurer" environment variable is used.
+    try:
+        insurers = os.environ['insurers']
+    except:
+        insurers = ''
+
+    return [insurer.strip() for insurer in insurers.split(',') if insurer.strip() != '']
+
+
+
+
+
+def genConfig(insurer=None, multiInsurer=False):
 
     config = dict()
 
@@ -142,19 +398,32 @@ def genConfig():
     except:
         config['ENV'] = constant.LOC_ENV
     
-    try:
-        config['INSURER'] = os.environ['insurer']
-    except:
-        config['INSURER'] = constant.ZURICH
+    if insurer is not None:
+        config['INSURER'] = insurer
+    else:
+        try:
+            config['INSURER'] = os.environ['insurer']
+        except:
+            config['INSURER'] = constant.ZURICH
+
+    config['APP_MULTI_INSURER'] = multiInsurer
 
     
     if str(config['ENV']).upper() == constant.UAT_ENV:
 
         # Application Parameters
         config['APP_JOB_TYPE'] = 'api'
+        config['APP_CSV_READER'] = 'standard'
+        config['APP_CSV_LOAD_WORKERS'] = 4
         config['APP_RUN_TYPE'] = 'insert'
         config['APP_UPDATE_TYPE'] = 'many'
         config['APP_UPDATE_TYPE_FAST_EXECUTEMANY'] = True
+        config['APP_UPDATE_TYPE_SINGLE_BATCH_ROWS'] = 0
+        config['APP_CHUNK_SIZE'] = 0
+        config['APP_BUFFER_MEMORY_BUDGET_MB'] = 0
+        config['APP_BUFFER_SPILL_DIRECTORY'] = ''
+        config['APP_VALIDATE_ROWS'] = False
+        config['APP_CHECKPOINT_DIRECTORY'] = ''
         config['APP_KEEP_RESPONSE'] = 'false'
         config['APP_RESPONSE_DIRECTORY'] = ''
 
@@ -164,6 +433,7 @@ def genConfig():
         config['API_PARAM_PAGE'] = 1
         config['API_PARAM_PERPAGE'] = 5000
         config['API_PARAM_STREAM'] = False
+        config['API_LAZY_JSON'] = False
         
         if config['INSURER'].upper() == constant.ORG_1:  
             config['API_HEADER_AUTH_TOKEN'] = ''
@@ -175,18 +445,36 @@ def genConfig():
             config['API_HEADER_AUTH_TOKEN'] = ''
         
         config['API_HEADER_ACCEPT'] = 'application/json'
+        config['API_VALIDATOR_CACHE_FILE'] = ''
+        config['API_ADAPTIVE_FETCH'] = False
+        config['API_ADAPTIVE_MIN_PERPAGE'] = 500
+        config['API_ADAPTIVE_MAX_PERPAGE'] = 20000
+        config['API_ADAPTIVE_MAX_CONCURRENCY'] = 4
+        config['API_ADAPTIVE_TARGET_SECONDS'] = 30
+        config['API_ADAPTIVE_MAX_PAGE_MB'] = 100
 
         # SQL Server Database Parameters        
         config['SQL_DATABASE_IP'] = '###'
         config['SQL_DATABASE_NAME'] = '###'
         config['SQL_DATABASE_USERNAME'] = '###'
         config['SQL_DATABASE_PASSWORD'] = '###'        
+        config['SQL_DATABASE_DRIVER'] = 'ODBC Driver 17 for SQL Server'
         
         # For remote, specify in UNC format as follows where:
         #   '\\\\ShareName' refers to a Share drive that has been established.        
         config['SQL_BULKINSERT_INPUT_FILEPATH'] = '\\\\ShareName\\uat\\csvfiles\\'
+        config['SQL_BULKINSERT_FILE_FORMAT'] = 'csv'
+        config['SQL_BULKINSERT_ORDERED'] = False
+        config['SQL_BULKINSERT_REDRIVE'] = False
+        config['SQL_BULKINSERT_OVERLAP_LOAD'] = False
+        config['SQL_BULKINSERT_COMPRESSION'] = 'none'
+        config['SQL_BULKINSERT_LOCAL_FILEPATH'] = ''
+        config['SQL_BULKINSERT_EXPAND_TIMEOUT'] = 600
         config['SQL_BULKINSERT_BATCHSIZE'] = 5000
         config['SQL_BULKINSERT_MAXERRORS'] = 10000
+        config['SQL_BATCH_TUNER_FILE'] = ''
+        config['SQL_EXECUTEMANY_MAX_MB'] = 64
+        config['SQL_TRUST_WORKERS'] = 4
         
         config['LOG_LEVEL'] = 'INFO'
         config['LOG_DIRECTORY'] = 'C:\\ClaimsReporting\\uat\\logs\\'
@@ -197,9 +485,17 @@ def genConfig():
 
         # Application Parameters
         config['APP_JOB_TYPE'] = 'api'
+        config['APP_CSV_READER'] = 'standard'
+        config['APP_CSV_LOAD_WORKERS'] = 4
         config['APP_RUN_TYPE'] = 'insert'
         config['APP_UPDATE_TYPE'] = 'many'
         config['APP_UPDATE_TYPE_FAST_EXECUTEMANY'] = True
+        config['APP_UPDATE_TYPE_SINGLE_BATCH_ROWS'] = 0
+        config['APP_CHUNK_SIZE'] = 0
+        config['APP_BUFFER_MEMORY_BUDGET_MB'] = 0
+        config['APP_BUFFER_SPILL_DIRECTORY'] = ''
+        config['APP_VALIDATE_ROWS'] = False
+        config['APP_CHECKPOINT_DIRECTORY'] = ''
         config['APP_KEEP_RESPONSE'] = 'false'
         config['APP_RESPONSE_DIRECTORY'] = ''
 
@@ -210,6 +506,7 @@ def genConfig():
         config['API_PARAM_PAGE'] = 1
         config['API_PARAM_PERPAGE'] = 5000
         config['API_PARAM_STREAM'] = False
+        config['API_LAZY_JSON'] = False
     
         if config['INSURER'].upper() == constant.ORG_1:  
             config['API_HEADER_AUTH_TOKEN'] = ''
@@ -221,12 +518,20 @@ def genConfig():
             config['API_HEADER_AUTH_TOKEN'] = ''
         
         config['API_HEADER_ACCEPT'] = 'application/json'
+        config['API_VALIDATOR_CACHE_FILE'] = ''
+        config['API_ADAPTIVE_FETCH'] = False
+        config['API_ADAPTIVE_MIN_PERPAGE'] = 500
+        config['API_ADAPTIVE_MAX_PERPAGE'] = 20000
+        config['API_ADAPTIVE_MAX_CONCURRENCY'] = 4
+        config['API_ADAPTIVE_TARGET_SECONDS'] = 30
+        config['API_ADAPTIVE_MAX_PAGE_MB'] = 100
 
         # SQL Server Database Parameters              
         config['SQL_DATABASE_IP'] = ''
         config['SQL_DATABASE_NAME'] = 'DEV_CLAIMS'
         config['SQL_DATABASE_USERNAME'] = ''
         config['SQL_DATABASE_PASSWORD'] = ''        
+        config['SQL_DATABASE_DRIVER'] = 'ODBC Driver 17 for SQL Server'
 
 
         # For remote, specify in UNC format as follows:
@@ -235,8 +540,18 @@ def genConfig():
         #config['SQL_BULKINSERT_INPUT_FILEPATH'] = '//DESKTOP-XXXXXXX//ClaimsReporting//dev//csvfiles//'
         # For local specify as follows:
         #config['SQL_BULKINSERT_INPUT_FILEPATH'] = 'C:\\ProgramData\\ClaimsReporting\\dev\\csvfiles\\'
+        config['SQL_BULKINSERT_FILE_FORMAT'] = 'csv'
+        config['SQL_BULKINSERT_ORDERED'] = False
+        config['SQL_BULKINSERT_REDRIVE'] = False
+        config['SQL_BULKINSERT_OVERLAP_LOAD'] = False
+        config['SQL_BULKINSERT_COMPRESSION'] = 'none'
+        config['SQL_BULKINSERT_LOCAL_FILEPATH'] = ''
+        config['SQL_BULKINSERT_EXPAND_TIMEOUT'] = 600
         config['SQL_BULKINSERT_BATCHSIZE'] = 5000
         config['SQL_BULKINSERT_MAXERRORS'] = 5000
+        config['SQL_BATCH_TUNER_FILE'] = ''
+        config['SQL_EXECUTEMANY_MAX_MB'] = 64
+        config['SQL_TRUST_WORKERS'] = 4
         
         config['LOG_LEVEL'] = 'INFO'
         config['LOG_DIRECTORY'] = 'C:\\ProgramData\\ClaimsReporting\\dev\\logs\\'
@@ -269,6 +584,19 @@ def genConfig():
                 quit()
 
 
+    if not isinstance(config['APP_CSV_READER'], str):
+        config['APP_CSV_READER'] = constant.STANDARD_CSV_READER
+    else:
+        # If no value supplied, or invalid value supplied, default to STANDARD_CSV_READER.
+        if not (config['APP_CSV_READER'].upper() == constant.STANDARD_CSV_READER
+             or config['APP_CSV_READER'].upper() == constant.STREAMING_CSV_READER
+             or config['APP_CSV_READER'].upper() == constant.MMAP_CSV_READER):
+            config['APP_CSV_READER'] = constant.STANDARD_CSV_READER
+
+    if not isinstance(config['APP_CSV_LOAD_WORKERS'], int) or config['APP_CSV_LOAD_WORKERS'] < 1:
+        config['APP_CSV_LOAD_WORKERS'] = 4
+
+
     if not isinstance(config['APP_RUN_TYPE'], str):
         print(f"{'Invalid job parameter supplied':30}: APP-RUN-TYPE: {config['APP_RUN_TYPE']}")
         print(f"{'Valid values are':30}: 'JSON', 'INSERT' or 'INSERT-AND-UPDATE'")
@@ -294,18 +622,19 @@ def genConfig():
 
     if not isinstance(config['APP_UPDATE_TYPE'], str):
         print(f"{'Invalid job parameter supplied':30}: APP_UPDATE_TYPE: {config['APP_UPDATE_TYPE']}")
-        print(f"{'Valid values are':30}: {constant.SINGLE_UPDATE_TYPE}, {constant.MANY_UPDATE_TYPE} or {constant.BULK_UPDATE_TYPE}")
+        print(f"{'Valid values are':30}: {constant.SINGLE_UPDATE_TYPE}, {constant.MANY_UPDATE_TYPE}, {constant.BULK_UPDATE_TYPE} or {constant.BATCHED_UPDATE_TYPE}")
         quit()
     else:
         if not (config['APP_UPDATE_TYPE'].upper() == constant.SINGLE_UPDATE_TYPE
              or config['APP_UPDATE_TYPE'].upper() == constant.MANY_UPDATE_TYPE
-             or config['APP_UPDATE_TYPE'].upper() == constant.BULK_UPDATE_TYPE):
+             or config['APP_UPDATE_TYPE'].upper() == constant.BULK_UPDATE_TYPE
+             or config['APP_UPDATE_TYPE'].upper() == constant.BATCHED_UPDATE_TYPE):
             # If no value supplied, default to BULK_UPDATE_TYPE, else terminate.
             if config['APP_UPDATE_TYPE'].upper() == '':
                 config['APP_UPDATE_TYPE'] = constant.BULK_UPDATE_TYPE
             else:
                 print(f"{'Invalid job parameter supplied':30}: APP_UPDATE_TYPE: {config['APP_UPDATE_TYPE']}")
-                print(f"{'Valid values are':30}: {constant.SINGLE_UPDATE_TYPE}, {constant.MANY_UPDATE_TYPE} or {constant.BULK_UPDATE_TYPE}")
+                print(f"{'Valid values are':30}: {constant.SINGLE_UPDATE_TYPE}, {constant.MANY_UPDATE_TYPE}, {constant.BULK_UPDATE_TYPE} or {constant.BATCHED_UPDATE_TYPE}")
                 quit()
 
 
@@ -314,6 +643,34 @@ def genConfig():
         config['APP_UPDATE_TYPE_FAST_EXECUTEMANY'] = True
 
 
+    if not isinstance(config['APP_UPDATE_TYPE_SINGLE_BATCH_ROWS'], int) or config['APP_UPDATE_TYPE_SINGLE_BATCH_ROWS'] < 0:
+        # If no value supplied, or invalid datatype supplied, default to 0 (a row per statement).
+        config['APP_UPDATE_TYPE_SINGLE_BATCH_ROWS'] = 0
+
+
+    if not isinstance(config['APP_CHUNK_SIZE'], int) or config['APP_CHUNK_SIZE'] < 0:
+        # If no value supplied, or invalid datatype supplied, default to 0 (not chunked).
+        config['APP_CHUNK_SIZE'] = 0
+
+
+    if not isinstance(config['APP_BUFFER_MEMORY_BUDGET_MB'], int) or config['APP_BUFFER_MEMORY_BUDGET_MB'] < 0:
+        # If no value supplied, or invalid datatype supplied, default to 0 (no budget).
+        config['APP_BUFFER_MEMORY_BUDGET_MB'] = 0
+
+    if not isinstance(config['APP_BUFFER_SPILL_DIRECTORY'], str):
+        config['APP_BUFFER_SPILL_DIRECTORY'] = ''
+
+
+    if not isinstance(config['APP_VALIDATE_ROWS'], bool):
+        # If no value supplied, or invalid datatype supplied, default to False.
+        config['APP_VALIDATE_ROWS'] = False
+
+
+    if not isinstance(config['APP_CHECKPOINT_DIRECTORY'], str):
+        # If no value supplied, or invalid datatype supplied, default to '' (no checkpoints).
+        config['APP_CHECKPOINT_DIRECTORY'] = ''
+
+
     if not isinstance(config['APP_KEEP_RESPONSE'], str):
         config['APP_KEEP_RESPONSE'] = constant.FALSE_KEEP_RESPONSE
     else:
@@ -353,18 +710,97 @@ def genConfig():
     if not isinstance(config['API_PARAM_STREAM'], bool):
         config['API_PARAM_STREAM'] = False
 
+    if not isinstance(config['API_LAZY_JSON'], bool):
+        # If no value supplied, or invalid datatype supplied, default to False.
+        config['API_LAZY_JSON'] = False
+
+
+    if not isinstance(config['API_ADAPTIVE_FETCH'], bool):
+        config['API_ADAPTIVE_FETCH'] = False
+
+    if not isinstance(config['API_ADAPTIVE_MIN_PERPAGE'], int) or config['API_ADAPTIVE_MIN_PERPAGE'] < 1:
+        config['API_ADAPTIVE_MIN_PERPAGE'] = 500
+
+    if not isinstance(config['API_ADAPTIVE_MAX_PERPAGE'], int) or config['API_ADAPTIVE_MAX_PERPAGE'] < config['API_PARAM_PERPAGE']:
+        config['API_ADAPTIVE_MAX_PERPAGE'] = max(20000, config['API_PARAM_PERPAGE'])
+
+    if not isinstance(config['API_ADAPTIVE_MAX_CONCURRENCY'], int) or config['API_ADAPTIVE_MAX_CONCURRENCY'] < 1:
+        config['API_ADAPTIVE_MAX_CONCURRENCY'] = 4
+
+    if not isinstance(config['API_ADAPTIVE_TARGET_SECONDS'], int) or config['API_ADAPTIVE_TARGET_SECONDS'] < 1:
+        config['API_ADAPTIVE_TARGET_SECONDS'] = 30
+
+    if not isinstance(config['API_ADAPTIVE_MAX_PAGE_MB'], int) or config['API_ADAPTIVE_MAX_PAGE_MB'] < 1:
+        config['API_ADAPTIVE_MAX_PAGE_MB'] = 100
+
+
+    if not isinstance(config['API_VALIDATOR_CACHE_FILE'], str):
+        config['API_VALIDATOR_CACHE_FILE'] = ''
+
+
+    if not isinstance(config['SQL_DATABASE_DRIVER'], str) or config['SQL_DATABASE_DRIVER'] == '':
+        config['SQL_DATABASE_DRIVER'] = 'ODBC Driver 17 for SQL Server'
+
 
     if not isinstance(config['SQL_BULKINSERT_INPUT_FILEPATH'], str):
         print(f"{'Invalid job parameter supplied':30}: SQL_BULKINSERT_INPUT_FILEPATH: {config['SQL_BULKINSERT_INPUT_FILEPATH']}")
         print(f"{'Value should be passed as a string in quote marks':30}")
         quit()
 
+    if not isinstance(config['SQL_BULKINSERT_FILE_FORMAT'], str):
+        config['SQL_BULKINSERT_FILE_FORMAT'] = constant.CSV_FILE_FORMAT
+    else:
+        # If no value supplied, or invalid value supplied, default to CSV_FILE_FORMAT.
+        if not (config['SQL_BULKINSERT_FILE_FORMAT'].upper() == constant.CSV_FILE_FORMAT
+             or config['SQL_BULKINSERT_FILE_FORMAT'].upper() == constant.NATIVE_FILE_FORMAT):
+            config['SQL_BULKINSERT_FILE_FORMAT'] = constant.CSV_FILE_FORMAT
+
+    if not isinstance(config['SQL_BULKINSERT_ORDERED'], bool):
+        # If no value supplied, or invalid datatype supplied, default to False.
+        config['SQL_BULKINSERT_ORDERED'] = False
+
+    if not isinstance(config['SQL_BULKINSERT_REDRIVE'], bool):
+        # If no value supplied, or invalid datatype supplied, default to False.
+        config['SQL_BULKINSERT_REDRIVE'] = False
+
+    if not isinstance(config['SQL_BULKINSERT_OVERLAP_LOAD'], bool):
+        # If no value supplied, or invalid datatype supplied, default to False.
+        config['SQL_BULKINSERT_OVERLAP_LOAD'] = False
+
+    if not isinstance(config['SQL_BULKINSERT_COMPRESSION'], str):
+        config['SQL_BULKINSERT_COMPRESSION'] = constant.NO_COMPRESSION
+    else:
+        # If no value supplied, or invalid value supplied, default to NO_COMPRESSION.
+        if not (config['SQL_BULKINSERT_COMPRESSION'].upper() == constant.NO_COMPRESSION
+             or config['SQL_BULKINSERT_COMPRESSION'].upper() == constant.GZIP_COMPRESSION):
+            config['SQL_BULKINSERT_COMPRESSION'] = constant.NO_COMPRESSION
+
+    if config['SQL_BULKINSERT_COMPRESSION'].upper() == constant.GZIP_COMPRESSION:
+        if not isinstance(config['SQL_BULKINSERT_LOCAL_FILEPATH'], str) or config['SQL_BULKINSERT_LOCAL_FILEPATH'] == '':
+            print(f"{'Invalid job parameter supplied':30}: SQL_BULKINSERT_LOCAL_FILEPATH: {config['SQL_BULKINSERT_LOCAL_FILEPATH']}")
+            print(f"{'A local path is required when SQL_BULKINSERT_COMPRESSION is':30}: {constant.GZIP_COMPRESSION}")
+            print(f"Job terminated.")
+            quit()
+
+    if not isinstance(config['SQL_BULKINSERT_EXPAND_TIMEOUT'], int):
+        config['SQL_BULKINSERT_EXPAND_TIMEOUT'] = 600
+
     if not isinstance(config['SQL_BULKINSERT_BATCHSIZE'], int):       
         config['SQL_BULKINSERT_BATCHSIZE'] = 5000
 
     if not isinstance(config['SQL_BULKINSERT_MAXERRORS'], int):       
         config['SQL_BULKINSERT_MAXERRORS'] = 5000
 
+    if not isinstance(config['SQL_BATCH_TUNER_FILE'], str):
+        # If no value supplied, or invalid datatype supplied, default to '' (not tuned).
+        config['SQL_BATCH_TUNER_FILE'] = ''
+
+    if not isinstance(config['SQL_EXECUTEMANY_MAX_MB'], int) or config['SQL_EXECUTEMANY_MAX_MB'] <= 0:
+        config['SQL_EXECUTEMANY_MAX_MB'] = 64
+
+    if not isinstance(config['SQL_TRUST_WORKERS'], int) or config['SQL_TRUST_WORKERS'] < 1:
+        config['SQL_TRUST_WORKERS'] = 4
+
 
     if not isinstance(config['LOG_LEVEL'], str):
         print(f"{'Invalid job parameter supplied':30}: LOG_LEVEL: {config['LOG_LEVEL']}")
@@ -0,0 +1,141 @@
+'''
+Purpose:
+
+    This module provides stand-ins for the modules the tests can't rely on:
+     - pyodbc          - A fake driver. Connections record the rows inserted and committed, per table, and
+                         any row whose first value is in FakeConnection.failingValues fails to insert.
+     - logUtils        - The log headers only, when utilities/logUtils.py isn't available.
+
+    installStubs() adds them to sys.modules only if the real modules can't be imported, so the tests run the
+    same against a full build environment.
+
+'''
+
+## Standard Libraries
+import importlib.util
+import re
+import sys
+import types
+
+
+## INSERT statement, as written by the insert modules.
+INSERT_PATTERN = re.compile(r'INSERT INTO \[dbo\]\.\[(\w+)\]')
+
+
+
+
+
+class FakeCursor:
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.fast_executemany = False
+
+    def execute(self, sql, parameters=None):
+        self.connection.statements.append(sql)
+        match = INSERT_PATTERN.match(sql)
+        if match is None:
+            return
+        # A multi-row INSERT has one parameter group per row.
+        rowCount = sql.count('(?')
+        width = len(parameters) // rowCount
+        self.insert(match.group(1), [tuple(parameters[i * width:(i + 1) * width]) for i in range(rowCount)])
+
+    def executemany(self, sql, rows):
+        self.connection.statements.append(sql)
+        self.insert(INSERT_PATTERN.match(sql).group(1), [tuple(row) for row in rows])
+
+    def insert(self, table, rows):
+        for row in rows:
+            if row[0] in FakeConnection.failingValues:
+                raise ValueError(f"Row {row[0]} failed")
+        self.connection.pending.extend((table, row) for row in rows)
+
+    def close(self):
+        pass
+
+
+
+
+
+class FakeConnection:
+
+    # Rows whose first value is one of these fail to insert. Set by each test.
+    failingValues = set()
+
+    # Every connection made, most recent last.
+    connections = list()
+
+    def __init__(self, autocommit=False):
+        self.autocommit = autocommit
+        self.statements = list()
+        self.pending = list()
+        self.committed = list()
+        self.cursors = 0
+        FakeConnection.connections.append(self)
+
+    def cursor(self):
+        self.cursors += 1
+        return FakeCursor(self)
+
+    def commit(self):
+        self.committed.extend(self.pending)
+        self.pending = list()
+
+    def rollback(self):
+        self.pending = list()
+
+    def close(self):
+        pass
+
+    @classmethod
+    def reset(cls):
+        cls.failingValues = set()
+        cls.connections = list()
+
+
+
+
+
+def connect(connectionString, autocommit=False):
+    return FakeConnection(autocommit)
+
+
+
+
+
+def installStubs():
+
+    if 'pyodbc' not in sys.modules and importlib.util.find_spec('pyodbc') is None:
+        pyodbc = types.ModuleType('pyodbc')
+        pyodbc.connect = connect
+        sys.modules['pyodbc'] = pyodbc
+
+    if 'utilities.logUtils' not in sys.modules and importlib.util.find_spec('utilities.logUtils') is None:
+        logUtils = types.ModuleType('utilities.logUtils')
+        for name in ('logCsvFileHeader', 'logInsertProcessingHeader', 'logDataValidationHeader'):
+            setattr(logUtils, name, lambda *args, **kwargs: None)
+        sys.modules['utilities.logUtils'] = logUtils
+
+
+
+
+
+def getTestConfig(**overrides):
+
+    # The configuration keys used by the database modules, with their defaults.
+    thisConfig = {
+        'SQL_DATABASE_DRIVER' : 'ODBC Driver 17 for SQL Server',
+        'SQL_DATABASE_IP' : 'localhost',
+        'SQL_DATABASE_NAME' : 'ClaimsReporting',
+        'SQL_DATABASE_USERNAME' : 'user',
+        'SQL_DATABASE_PASSWORD' : 'password',
+        'SQL_BULKINSERT_BATCHSIZE' : 1000,
+        'SQL_BULKINSERT_MAXERRORS' : 10,
+        'SQL_BULKINSERT_FILE_FORMAT' : 'CSV',
+        'SQL_BATCH_TUNER_FILE' : '',
+        'SQL_EXECUTEMANY_MAX_MB' : 64,
+        'APP_UPDATE_TYPE_SINGLE_BATCH_ROWS' : 1,
+    }
+    thisConfig.update(overrides)
+    return thisConfig
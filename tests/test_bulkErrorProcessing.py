@@ -0,0 +1,138 @@
+'''
+Purpose:
+
+    Tests of control/bulkErrorProcessing.py. The re-driven rows are inserted through the fake pyodbc of tests/stubs.py.
+
+'''
+
+## Standard Libraries
+import os
+import tempfile
+import unittest
+
+## Local Libraries
+from tests import stubs
+stubs.installStubs()
+
+from control import bulkErrorProcessing
+
+
+
+
+
+class BulkErrorFileTests(unittest.TestCase):
+
+    # The rejected records of a ClaimPayment Bulk Insert of 10 rows:
+    #  - 101 and 104 are inserted when re-driven.
+    #  - 0 fails validation (ClaimPaymentId Min 1), so isn't re-driven.
+    #  - 103 fails again when re-driven.
+    #  - x can't be converted to an int.
+    REJECTED_RECORDS = ['101|1|10.5', '0|1|5', '103|2|7', 'x|2|1', '104|3|8']
+
+    def setUp(self):
+        stubs.FakeConnection.reset()
+        stubs.FakeConnection.failingValues = {103}
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.filepath = os.path.join(self.directory, 'ClaimPayment')
+
+        with open(f"{self.filepath}.csv", 'wb') as f:
+            f.write(b'ClaimPaymentId|ClaimId|Amount\r\n')
+
+        errorEntries = list()
+        with open(f"{self.filepath}.txt", 'wb') as f:
+            for row, record in enumerate(self.REJECTED_RECORDS, start=2):
+                errorEntries.append(f"Row {row} File Offset {row * 20} ErrorFile Offset {f.tell()} - HRESULT 0x80020005")
+                f.write(record.encode('latin-1') + b'\r\n')
+
+        # Entries out of error file offset order, as they are sorted when read.
+        with open(f"{self.filepath}.txt.Error.Txt", 'wb') as f:
+            f.write('\r\n'.join(reversed(errorEntries)).encode('latin-1'))
+
+        self.thisConfig = stubs.getTestConfig(SQL_BULKINSERT_FILE_FORMAT='csv')
+
+    def getThisJob(self, bulkInsertCompleted=True, successfulInserts=5):
+        return {'TableDetails' : [{
+            'ClaimTable' : 'ClaimPayment',
+            'RowsToInsert' : 10,
+            'SuccessfulInserts' : successfulInserts,
+            'FailedInserts' : 10 - successfulInserts,
+            'ElapsedSeconds' : 1.0,
+            'BulkInsertCompleted' : bulkInsertCompleted,
+        }]}
+
+    def getArchivedFiles(self):
+        archiveDirectory = os.path.join(self.directory, bulkErrorProcessing.ARCHIVE_DIRECTORY)
+        return sorted(os.listdir(archiveDirectory)) if os.path.exists(archiveDirectory) else []
+
+    def testErrorEntriesAreReadInErrorFileOffsetOrder(self):
+        entries = bulkErrorProcessing.readErrorEntries(f"{self.filepath}.txt.Error.Txt")
+
+        self.assertEqual([entry[0] for entry in entries], [2, 3, 4, 5, 6])
+        self.assertEqual(entries[1], (3, 60, 12, '0x80020005'))
+
+    def testUtf16ErrorFile(self):
+        with open(f"{self.filepath}.txt.Error.Txt", 'rb') as f:
+            data = f.read()
+        with open(f"{self.filepath}.txt.Error.Txt", 'wb') as f:
+            f.write(data.decode('latin-1').encode('utf-16'))
+
+        self.assertEqual(len(bulkErrorProcessing.readErrorEntries(f"{self.filepath}.txt.Error.Txt")), 5)
+
+    def testRejectedRecordsAreReadAtTheirOffsets(self):
+        entries = bulkErrorProcessing.readErrorEntries(f"{self.filepath}.txt.Error.Txt")
+
+        records = bulkErrorProcessing.readRejectedRecords(f"{self.filepath}.txt", entries)
+
+        self.assertEqual(records, [record.split('|') for record in self.REJECTED_RECORDS])
+
+    def testRejectedRowsAreRedriven(self):
+        thisJob = self.getThisJob()
+
+        bulkErrorProcessing.processBulkErrorFiles('ClaimPayment', self.filepath, self.thisConfig, thisJob)
+
+        committed = [row for connection in stubs.FakeConnection.connections for table, row in connection.committed]
+        self.assertEqual(committed, [(101, '1', '10.5'), (104, '3', '8')])
+
+        tableDetail = thisJob['TableDetails'][0]
+        self.assertEqual((tableDetail['SuccessfulInserts'], tableDetail['FailedInserts'], tableDetail['RedrivenInserts']), (7, 3, 2))
+
+        rejects = thisJob['BulkInsertRejects']['ClaimPayment']
+        self.assertEqual([(reject['Row'], reject['KeyValue']) for reject in rejects], [(3, 0), (4, 103), (5, 'x')])
+        self.assertIn('ClaimPaymentId: Less than 1', rejects[0]['Error'])
+        self.assertIn('Row 103 failed', rejects[1]['Error'])
+        self.assertTrue(os.path.exists(f"{self.filepath}.BulkRejects.csv"))
+
+        # The error files are moved aside, so the next Bulk Insert can write its own.
+        self.assertFalse(os.path.exists(f"{self.filepath}.txt"))
+        self.assertEqual(len(self.getArchivedFiles()), 2)
+
+    def testRejectedRowsOfAnUncommittedLoadAreNotRedriven(self):
+        thisJob = self.getThisJob(bulkInsertCompleted=False)
+
+        bulkErrorProcessing.processBulkErrorFiles('ClaimPayment', self.filepath, self.thisConfig, thisJob)
+
+        self.assertEqual(stubs.FakeConnection.connections, [])
+        self.assertEqual(thisJob['TableDetails'][0]['SuccessfulInserts'], 5)
+        rejects = thisJob['BulkInsertRejects']['ClaimPayment']
+        self.assertEqual(len(rejects), 5)
+        self.assertTrue(all(reject['Error'].endswith('load not committed, not re-driven') for reject in rejects))
+        self.assertEqual(len(self.getArchivedFiles()), 2)
+
+    def testLoadIsCommittedWhenEveryRowIsInsertedOrRejected(self):
+        entries = bulkErrorProcessing.readErrorEntries(f"{self.filepath}.txt.Error.Txt")
+
+        self.assertTrue(bulkErrorProcessing.isLoadCommitted('ClaimPayment', entries, self.getThisJob()))
+        self.assertFalse(bulkErrorProcessing.isLoadCommitted('ClaimPayment', entries, self.getThisJob(successfulInserts=4)))
+        self.assertFalse(bulkErrorProcessing.isLoadCommitted('ClaimPayment', entries, self.getThisJob(bulkInsertCompleted=False)))
+        self.assertFalse(bulkErrorProcessing.isLoadCommitted('ClaimHeader', entries, self.getThisJob()))
+
+    def testNativeFormatRejectsAreReportedOnly(self):
+        thisJob = self.getThisJob()
+
+        bulkErrorProcessing.processBulkErrorFiles('ClaimPayment', self.filepath, stubs.getTestConfig(SQL_BULKINSERT_FILE_FORMAT='native'), thisJob)
+
+        self.assertEqual(stubs.FakeConnection.connections, [])
+        self.assertEqual(len(thisJob['BulkInsertRejects']['ClaimPayment']), 5)
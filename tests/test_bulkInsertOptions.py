@@ -0,0 +1,39 @@
+'''
+Purpose:
+
+    Tests of database/bulkInsertOptions.py.
+
+'''
+
+## Standard Libraries
+import unittest
+
+## Local Libraries
+from tests import stubs
+stubs.installStubs()
+
+from database import bulkInsertOptions
+
+
+
+
+
+class BulkInsertOptionsTests(unittest.TestCase):
+
+    def getOptions(self, fileFormat):
+        thisConfig = stubs.getTestConfig(SQL_BULKINSERT_FILE_FORMAT=fileFormat, SQL_BULKINSERT_ORDERED=False)
+        return bulkInsertOptions.getBulkInsertOptions('ClaimPayment', '/staging/ClaimPayment', thisConfig)
+
+    def testCsvFilesAreReadWithTheirCodePage(self):
+        dataFile, options = self.getOptions('CSV')
+
+        self.assertEqual(dataFile, '/staging/ClaimPayment.csv')
+        self.assertIn("CODEPAGE = '28591'", options)
+        self.assertIn("FIELDTERMINATOR = '|'", options)
+
+    def testNativeFilesUseTheirFormatFile(self):
+        dataFile, options = self.getOptions('NATIVE')
+
+        self.assertEqual(dataFile, '/staging/ClaimPayment.dat')
+        self.assertIn("FORMATFILE = '/staging/ClaimPayment.fmt'", options)
+        self.assertFalse(any(option.startswith('CODEPAGE') for option in options))
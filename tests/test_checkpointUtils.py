@@ -0,0 +1,106 @@
+'''
+Purpose:
+
+    Tests of utilities/checkpointUtils.py.
+
+'''
+
+## Standard Libraries
+import os
+import tempfile
+import unittest
+
+## Local Libraries
+from utilities import checkpointUtils
+
+
+
+
+
+def getConfig(directory, **overrides):
+
+    thisConfig = {
+        'INSURER' : 'TEST',
+        'API_URL' : 'https://localhost/claims',
+        'API_PARAM_LASTUPDATED' : '2026-10-19',
+        'APP_RUN_TYPE' : 'API',
+        'APP_UPDATE_TYPE' : 'MANY',
+        'APP_CHUNK_SIZE' : 0,
+        'APP_CHECKPOINT_DIRECTORY' : directory,
+        'SQL_BULKINSERT_COMPRESSION' : 'NONE',
+    }
+    thisConfig.update(overrides)
+    return thisConfig
+
+
+
+
+
+class PartiallyLoadedPageTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def startRun(self, thisConfig, offset=0, perPage=100):
+        thisJob = dict()
+        checkpointUtils.openJournal(thisConfig, thisJob)
+        thisJob['CheckpointOffset'] = offset
+        thisJob['CheckpointPerPage'] = perPage
+        return thisJob
+
+    def testPageWithLoadsStartedIsRefusedOnRestart(self):
+        thisConfig = getConfig(self.directory.name)
+        thisJob = self.startRun(thisConfig)
+        checkpointUtils.recordPageLoadStarted(thisConfig, thisJob)
+        checkpointUtils.recordPageLoadStarted(thisConfig, thisJob)
+
+        # The failed run's journal is read by the rerun.
+        rerunJob = self.startRun(thisConfig)
+
+        self.assertEqual(checkpointUtils.getCheckpointedPage(thisConfig, rerunJob, 0), (100, {'PartiallyLoaded' : True}))
+        self.assertIsNone(checkpointUtils.getCheckpointedPage(thisConfig, rerunJob, 100))
+        with open(rerunJob['Checkpoint']['File']) as journal:
+            self.assertEqual(len(journal.readlines()), 1)
+
+    def testCompletedPageIsSkipped(self):
+        thisConfig = getConfig(self.directory.name, APP_CHUNK_SIZE=50)
+        thisJob = self.startRun(thisConfig)
+        checkpointUtils.recordPageLoadStarted(thisConfig, thisJob)
+        checkpointUtils.recordPageProcessed(thisConfig, thisJob)
+
+        rerunJob = self.startRun(thisConfig)
+
+        self.assertEqual(checkpointUtils.getCheckpointedPage(thisConfig, rerunJob, 0), (100, None))
+
+    def testTableResumableRunsDontRecordLoadsStarted(self):
+        thisConfig = getConfig(self.directory.name, APP_UPDATE_TYPE='BULK')
+        thisJob = self.startRun(thisConfig)
+        checkpointUtils.recordPageLoadStarted(thisConfig, thisJob)
+
+        self.assertEqual(thisJob['Checkpoint']['LoadStartedPages'], dict())
+        self.assertFalse(os.path.exists(thisJob['Checkpoint']['File']))
+
+    def testStagedPageWithCommittedTablesIsRefusedWhenNotTableResumable(self):
+        thisConfig = getConfig(self.directory.name, APP_UPDATE_TYPE='BULK')
+        thisJob = self.startRun(thisConfig)
+        checkpointUtils.recordPageStaged(thisJob, 100, list())
+        checkpointUtils.recordTableCommitted(thisJob, 'ClaimHeader')
+
+        # Rerun with chunking, which can't resume the page table by table.
+        rerunConfig = getConfig(self.directory.name, APP_UPDATE_TYPE='BULK', APP_CHUNK_SIZE=50)
+        rerunJob = self.startRun(rerunConfig)
+
+        self.assertEqual(checkpointUtils.getCheckpointedPage(rerunConfig, rerunJob, 0), (100, {'PartiallyLoaded' : True}))
+
+    def testJournalIsKeptWhilePagesArePartlyLoaded(self):
+        thisConfig = getConfig(self.directory.name)
+        thisJob = self.startRun(thisConfig)
+        checkpointUtils.recordPageLoadStarted(thisConfig, thisJob)
+
+        checkpointUtils.completeJournal(thisJob)
+        self.assertTrue(os.path.exists(thisJob['Checkpoint']['File']))
+
+        checkpointUtils.recordPageProcessed(thisConfig, thisJob)
+        checkpointUtils.completeJournal(thisJob)
+        self.assertFalse(os.path.exists(thisJob['Checkpoint']['File']))
@@ -0,0 +1,127 @@
+'''
+Purpose:
+
+    Tests of control/claimView.py, and of utilities/jsonUtils.py's response parsing.
+    The lazy view tests are skipped when pysimdjson isn't installed.
+
+'''
+
+## Standard Libraries
+import json
+import unittest
+
+## Local Libraries
+from tests import stubs
+stubs.installStubs()
+
+from control import claimView, response
+from utilities import jsonUtils
+
+
+DOCUMENT = {'master_reports' : {'items' : [
+    {'claim_number' : 'C1', 'last_updated' : '2026-10-01T00:00:00.000Z', 'payments' : [{'amount' : 1.5}]},
+    {'claim_number' : 'C2', 'last_updated' : '2026-10-02T00:00:00.000Z', 'payments' : []},
+    {'claim_number' : 'C1', 'last_updated' : '2026-10-03T00:00:00.000Z', 'payments' : [{'amount' : 2.5}]},
+    {'claim_number' : None, 'last_updated' : None, 'payments' : None},
+]}}
+
+
+
+
+
+class FakeResponse:
+
+    def __init__(self, document, encoding='utf-8'):
+        self.encoding = encoding
+        self.content = json.dumps(document, ensure_ascii=False).encode(encoding or 'utf-8')
+
+
+
+
+
+@unittest.skipUnless(claimView.LAZY_PARSER_AVAILABLE, 'pysimdjson is not installed')
+class LazyViewTests(unittest.TestCase):
+
+    def setUp(self):
+        self.document = claimView.parseResponse(FakeResponse(DOCUMENT), lazy=True)
+        self.claims = self.document['master_reports']['items']
+
+    def testViewsReadAsTheDocument(self):
+        self.assertIsInstance(self.claims, claimView.ListView)
+        self.assertEqual(len(self.claims), 4)
+        self.assertEqual(self.claims[0]['claim_number'], 'C1')
+        self.assertEqual(self.claims[2]['payments'][0]['amount'], 2.5)
+        self.assertEqual(self.claims[-1].get('claim_number', 'missing'), None)
+        self.assertEqual(self.claims[0].get('no_such_field', 'missing'), 'missing')
+        self.assertIn('payments', self.claims[0])
+        self.assertEqual(list(self.claims[0]), ['claim_number', 'last_updated', 'payments'])
+        self.assertEqual(self.claims[0].toDict(), DOCUMENT['master_reports']['items'][0])
+
+    def testMissingFieldsAndIndexesRaise(self):
+        with self.assertRaises(KeyError):
+            self.claims[0]['no_such_field']
+        with self.assertRaises(IndexError):
+            self.claims[4]
+
+    def testViewsAreKept(self):
+        # A claim read again (e.g. by collapseClaimVersions) is the view already built, with its converted fields.
+        claim = self.claims[0]
+        claim['payments']
+
+        self.assertIs(self.claims[0], claim)
+        self.assertIs(self.claims[-4], claim)
+        self.assertIs(self.claims[0:2][0], claim)
+        self.assertIs(next(iter(self.claims)), claim)
+        self.assertIn('payments', claim.values)
+
+    def testCollapseClaimVersionsKeepsTheLatestVersion(self):
+        thisJob = dict()
+
+        claims = response.collapseClaimVersions(self.claims, thisJob)
+
+        self.assertEqual([claim['last_updated'] for claim in claims], ['2026-10-02T00:00:00.000Z', '2026-10-03T00:00:00.000Z', None])
+        self.assertIs(claims[1], self.claims[2])
+        self.assertEqual(thisJob['DuplicateClaimsDropped'], 1)
+
+    def testDeclaredCharsetIsHonoured(self):
+        document = {'items' : [{'insured' : 'Caf\xe9'}]}
+
+        parsed = claimView.parseResponse(FakeResponse(document, encoding='cp1252'), lazy=True)
+
+        self.assertEqual(parsed['items'][0]['insured'], 'Caf\xe9')
+
+
+
+
+
+class ParseResponseTests(unittest.TestCase):
+
+    def testParsedInFullWhenNotLazy(self):
+        self.assertEqual(claimView.parseResponse(FakeResponse(DOCUMENT), lazy=False), DOCUMENT)
+
+    def testCollapseClaimVersions(self):
+        thisJob = dict()
+
+        claims = response.collapseClaimVersions(DOCUMENT['master_reports']['items'], thisJob)
+
+        self.assertEqual([claim['claim_number'] for claim in claims], ['C2', 'C1', None])
+        self.assertEqual(thisJob['DuplicateClaimsDropped'], 1)
+
+    def testDeclaredCharsetIsHonoured(self):
+        document = {'insured' : 'Caf\xe9'}
+
+        for encoding in ('utf-8', 'UTF8', 'ISO-8859-1', 'cp1252', 'utf-16'):
+            self.assertEqual(jsonUtils.parseResponse(FakeResponse(document, encoding=encoding)), document, encoding)
+
+    def testUndeclaredCharsetIsDetected(self):
+        responseWithoutCharset = FakeResponse({'insured' : 'Caf\xe9'}, encoding='utf-16')
+        responseWithoutCharset.encoding = None
+
+        self.assertEqual(jsonUtils.parseResponse(responseWithoutCharset), {'insured' : 'Caf\xe9'})
+
+    def testLazyRequiresTheResponseInFullWhenKept(self):
+        thisConfig = {'API_LAZY_JSON' : True, 'APP_KEEP_RESPONSE' : 'true'}
+
+        self.assertFalse(claimView.isLazy(thisConfig))
+        thisConfig['APP_KEEP_RESPONSE'] = 'false'
+        self.assertEqual(claimView.isLazy(thisConfig), claimView.LAZY_PARSER_AVAILABLE)
@@ -0,0 +1,116 @@
+'''
+Purpose:
+
+    Tests of control/csvLoader.py.
+
+'''
+
+## Standard Libraries
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+## Local Libraries
+from tests import stubs
+stubs.installStubs()
+
+from control import csvLoader
+
+
+
+
+
+class ParseColumnsTests(unittest.TestCase):
+
+    def testRecordsAreSplitIntoColumns(self):
+        columns = csvLoader.parseColumns('ClaimPayment', b'1|a|x\r\n2|b|y\r\n', 3)
+
+        self.assertEqual(columns, [['1', '2'], ['a', 'b'], ['x', 'y']])
+
+    def testQuotedFields(self):
+        columns = csvLoader.parseColumns('ClaimPayment', b'1|"a|b"|x\r\n2|"c\r\nd"|y', 3)
+
+        self.assertEqual(columns, [['1', '2'], ['a|b', 'c\r\nd'], ['x', 'y']])
+
+    def testRecordsWithTheWrongFieldCountAreDropped(self):
+        # A record a field short and another a field over have the right total field count between them.
+        columns = csvLoader.parseColumns('ClaimPayment', b'1|a|x\r\n2|b\r\n3|c|z|extra\r\n4|d|w', 3)
+
+        self.assertEqual(columns, [['1', '4'], ['a', 'd'], ['x', 'w']])
+
+    def testNoRecords(self):
+        self.assertIsNone(csvLoader.parseColumns('ClaimPayment', b'', 3))
+        self.assertIsNone(csvLoader.parseColumns('ClaimPayment', b'1|a\r\n', 3))
+
+    def testLatin1Text(self):
+        columns = csvLoader.parseColumns('ClaimPayment', 'caf\xe9|1'.encode('latin-1'), 2)
+
+        self.assertEqual(columns, [['caf\xe9'], ['1']])
+
+
+
+
+
+class GetLastRecordEndTests(unittest.TestCase):
+
+    def testRecordSeparatorWithinQuotesIsSkipped(self):
+        data = b'1|a\r\n2|"b\r\nc'
+
+        self.assertEqual(csvLoader.getLastRecordEnd(data), 5)
+
+    def testNoCompleteRecord(self):
+        self.assertEqual(csvLoader.getLastRecordEnd(b'1|a'), 0)
+
+
+
+
+
+class ReadColumnBatchesTests(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.filePathAndName = os.path.join(directory.name, 'ClaimPayment.csv')
+        records = [f'{index}|"name {index}"|{index * 1.5}' if index % 7 == 0 else f'{index}|name {index}|{index * 1.5}' for index in range(200)]
+        with open(self.filePathAndName, 'wb') as f:
+            f.write(b'ClaimPaymentId|Name|Amount\r\n')
+            f.write('\r\n'.join(records).encode('latin-1'))
+
+    def readRows(self, useMmap):
+        header, headerBytes = csvLoader.readHeader(self.filePathAndName)
+        rows = list()
+        # Small blocks, so records span blocks.
+        with mock.patch.object(csvLoader, 'BLOCK_BYTES', 64):
+            for columns in csvLoader.readColumnBatches('ClaimPayment', self.filePathAndName, headerBytes, len(header), 30, useMmap):
+                self.assertLessEqual(len(columns[0]), 30)
+                rows.extend(zip(*columns))
+        return header, rows
+
+    def testRecordsAreReadAcrossBlocks(self):
+        for useMmap in (False, True):
+            header, rows = self.readRows(useMmap)
+
+            self.assertEqual(header, ['ClaimPaymentId', 'Name', 'Amount'])
+            self.assertEqual(rows, [(str(index), f'name {index}', str(index * 1.5)) for index in range(200)])
+
+
+
+
+
+class ColumnConverterTests(unittest.TestCase):
+
+    def testColumnsAreConvertedByType(self):
+        converters = csvLoader.getColumnConverters('ClaimHeader', ['ClaimId', 'IsCurrentVersion', 'ClaimNo'])
+        columns = [['1', ''], ['1', '0'], ['C1', '']]
+
+        self.assertEqual(csvLoader.toRowTuples(columns, converters), [(1, 1, 'C1'), (None, 0, '')])
+
+    def testEmptyTextAsNull(self):
+        converters = csvLoader.getColumnConverters('ClaimHeader', ['ClaimId', 'ClaimNo'], emptyTextAsNull=True)
+
+        self.assertEqual(csvLoader.toRowTuples([['1'], ['']], converters), [(1, None)])
+
+    def testInvalidNumbersRaise(self):
+        with self.assertRaises(ValueError):
+            csvLoader.toInt(['x'])
@@ -0,0 +1,116 @@
+'''
+Purpose:
+
+    Tests of database/multiRowInsertControl.py, through the fake pyodbc of tests/stubs.py.
+
+'''
+
+## Standard Libraries
+import unittest
+
+## Local Libraries
+from tests import stubs
+stubs.installStubs()
+
+from database import batchedInsertControl, multiRowInsertControl
+
+
+
+
+
+def getRows(count):
+    return [{'ClaimPaymentId' : index, 'ClaimId' : index // 10, 'PayeeType' : 'Insured'} for index in range(1, count + 1)]
+
+
+
+
+
+class InsertMultiRowTests(unittest.TestCase):
+
+    def setUp(self):
+        stubs.FakeConnection.reset()
+        self.thisConfig = stubs.getTestConfig(APP_UPDATE_TYPE_SINGLE_BATCH_ROWS=8)
+
+    def insert(self, rows):
+        thisJob = {'TableDetails' : []}
+        multiRowInsertControl.insertMultiRowClaimTableRows('ClaimPayment', rows, self.thisConfig, thisJob)
+        return thisJob['TableDetails'][-1], stubs.FakeConnection.connections[-1]
+
+    def testRowsAreInsertedInBatches(self):
+        tableDetail, connection = self.insert(getRows(20))
+
+        self.assertEqual((tableDetail['RowsToInsert'], tableDetail['SuccessfulInserts'], tableDetail['FailedInserts']), (20, 20, 0))
+        self.assertEqual([row[0] for table, row in connection.committed], list(range(1, 21)))
+        inserts = [sql for sql in connection.statements if sql.startswith('INSERT')]
+        self.assertEqual([sql.count('(?') for sql in inserts], [8, 8, 4])
+
+    def testIdentityValuesAreKept(self):
+        tableDetail, connection = self.insert(getRows(3))
+
+        self.assertEqual(connection.statements[0], "SET IDENTITY_INSERT [dbo].[ClaimPayment] ON")
+        self.assertEqual(connection.statements[-1], "SET IDENTITY_INSERT [dbo].[ClaimPayment] OFF")
+
+    def testFailingRowsAreIsolated(self):
+        stubs.FakeConnection.failingValues = {5, 13}
+
+        with self.assertLogs('database.multiRowInsertControl', level='ERROR') as logs:
+            tableDetail, connection = self.insert(getRows(20))
+
+        self.assertEqual((tableDetail['SuccessfulInserts'], tableDetail['FailedInserts']), (18, 2))
+        self.assertEqual([row[0] for table, row in connection.committed], [index for index in range(1, 21) if index not in (5, 13)])
+        self.assertEqual(sum('ClaimPaymentId 5' in line for line in logs.output), 1)
+        self.assertEqual(sum('ClaimPaymentId 13' in line for line in logs.output), 1)
+
+    def testStatementsArePreparedOncePerBatchSize(self):
+        tableDetail, connection = self.insert(getRows(40))
+
+        # One cursor for IDENTITY_INSERT, and one for the 8 row statement.
+        self.assertEqual(connection.cursors, 2)
+
+    def testRowsWithoutTheKeyColumnCanFail(self):
+        stubs.FakeConnection.failingValues = {2}
+        rows = [{'ClaimId' : index, 'PayeeType' : 'Insured'} for index in range(1, 4)]
+
+        with self.assertLogs('database.multiRowInsertControl', level='ERROR'):
+            tableDetail, connection = self.insert(rows)
+
+        self.assertEqual(tableDetail['FailedInserts'], 1)
+
+
+
+
+
+class BatchRowsTests(unittest.TestCase):
+
+    def testBatchRowsAreWithinSqlServerLimits(self):
+        keys = tuple(f"Column{index}" for index in range(300))
+
+        self.assertEqual(multiRowInsertControl.getBatchRows(keys, stubs.getTestConfig(APP_UPDATE_TYPE_SINGLE_BATCH_ROWS=100)), 6)
+        self.assertEqual(multiRowInsertControl.getBatchRows(('A',), stubs.getTestConfig(APP_UPDATE_TYPE_SINGLE_BATCH_ROWS=5000)), 1000)
+        self.assertEqual(multiRowInsertControl.getBatchRows(('A', 'B'), stubs.getTestConfig(APP_UPDATE_TYPE_SINGLE_BATCH_ROWS=50)), 50)
+
+    def testInsertSql(self):
+        self.assertEqual(multiRowInsertControl.getInsertSql('ClaimPayment', ('A', 'B'), 2),
+                         "INSERT INTO [dbo].[ClaimPayment] ([A], [B]) VALUES (?, ?), (?, ?)")
+
+
+
+
+
+class InsertBisectingTests(unittest.TestCase):
+
+    def testFailingRowsAreReturnedWithTheirErrors(self):
+        connection = stubs.FakeConnection()
+        executed = list()
+
+        def execute(rows):
+            executed.append(len(rows))
+            if 3 in rows:
+                raise ValueError('bad row')
+            connection.pending.extend(rows)
+
+        failures = batchedInsertControl.insertBisecting(execute, connection, [1, 2, 3, 4])
+
+        self.assertEqual(failures, [(3, 'bad row')])
+        self.assertEqual(connection.committed, [1, 2, 4])
+        self.assertEqual(executed, [4, 2, 2, 1, 1])
@@ -0,0 +1,134 @@
+'''
+Purpose:
+
+    Tests of utilities/nativeFormat.py.
+
+'''
+
+## Standard Libraries
+from datetime import datetime
+import os
+import struct
+import tempfile
+import unittest
+
+## Local Libraries
+from utilities import nativeFormat
+
+
+
+
+
+def getNChar(text):
+    data = text.encode('utf-16-le')
+    return struct.pack('<H', len(data)) + data
+
+
+
+
+
+class NativeFileTests(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.filePathAndName = os.path.join(directory.name, 'ClaimHeader')
+
+    def readDataFile(self):
+        with open(self.filePathAndName + '.dat', 'rb') as f:
+            return f.read()
+
+    def testValuesAreEncodedByColumnType(self):
+        rows = [
+            {'ClaimId' : 7, 'IsCurrentVersion' : True, 'ClaimNo' : 'C1', 'Amount' : 1.5, 'Count' : None},
+            {'ClaimId' : 8, 'IsCurrentVersion' : None, 'ClaimNo' : None, 'Amount' : None, 'Count' : None},
+        ]
+
+        rowCount = nativeFormat.writeDictListToNativeFile(rows, 'ClaimHeader', self.filePathAndName)
+
+        self.assertEqual(rowCount, 2)
+        expected = (struct.pack('<Bi', 4, 7) + b'\x01\x01' + getNChar('C1') + struct.pack('<Bd', 8, 1.5) + b'\xff\xff'
+                  + struct.pack('<Bi', 4, 8) + b'\xff' + b'\xff\xff' + b'\xff' + b'\xff\xff')
+        self.assertEqual(self.readDataFile(), expected)
+
+    def testFormatFileListsEachColumn(self):
+        rows = [{'ClaimId' : 7, 'IsCurrentVersion' : False, 'ClaimNo' : 'C1'}]
+
+        nativeFormat.writeDictListToNativeFile(rows, 'ClaimHeader', self.filePathAndName)
+
+        with open(self.filePathAndName + '.fmt', newline='') as f:
+            lines = f.read().split('\r\n')
+        self.assertEqual(lines[0], nativeFormat.FORMAT_FILE_VERSION)
+        self.assertEqual(lines[1], '3')
+        self.assertEqual([line.split()[1] for line in lines[2:5]], ['SQLINT', 'SQLBIT', 'SQLNCHAR'])
+        self.assertEqual([line.split()[6] for line in lines[2:5]], ['ClaimId', 'IsCurrentVersion', 'ClaimNo'])
+
+    def testTranslateIsAppliedToEachRow(self):
+        rows = [{'ClaimId' : 7, 'ClaimNo' : 'c1'}, {'ClaimId' : 8, 'ClaimNo' : 'c2'}]
+
+        nativeFormat.writeDictListToNativeFile(rows, 'ClaimHeader', self.filePathAndName,
+                                               translate=lambda d: dict(d, ClaimNo=d['ClaimNo'].upper()))
+
+        self.assertEqual(self.readDataFile(), struct.pack('<Bi', 4, 7) + getNChar('C1') + struct.pack('<Bi', 4, 8) + getNChar('C2'))
+        self.assertEqual(rows[0]['ClaimNo'], 'c1')
+
+    def testLongTextIsTruncated(self):
+        rows = [{'ClaimId' : 7, 'ClaimNo' : 'x' * 5000}]
+
+        nativeFormat.writeDictListToNativeFile(rows, 'ClaimHeader', self.filePathAndName)
+
+        self.assertEqual(self.readDataFile(), struct.pack('<Bi', 4, 7) + getNChar('x' * 4000))
+
+    def testUnwritableFileReturnsNoRows(self):
+        rows = [{'ClaimId' : 7}]
+
+        rowCount = nativeFormat.writeDictListToNativeFile(rows, 'ClaimHeader', os.path.join(self.filePathAndName, 'missing', 'ClaimHeader'))
+
+        self.assertEqual(rowCount, 0)
+
+
+
+
+
+class ColumnTypeTests(unittest.TestCase):
+
+    def testDeclaredTypesTakePrecedence(self):
+        rows = [{'ClaimId' : 7, 'IsCurrentVersion' : 1}]
+
+        columnTypes = nativeFormat.getColumnTypes('ClaimHeader', rows, ('ClaimId', 'IsCurrentVersion'))
+
+        self.assertEqual(columnTypes, {'ClaimId' : 'int', 'IsCurrentVersion' : 'bit'})
+
+    def testUndeclaredTypesAreInferredFromTheFirstValue(self):
+        rows = [{'A' : None, 'B' : None, 'C' : None, 'D' : None}, {'A' : 1, 'B' : 1.0, 'C' : True, 'D' : None}]
+
+        columnTypes = nativeFormat.getColumnTypes('ClaimHeader', rows, ('A', 'B', 'C', 'D'))
+
+        self.assertEqual(columnTypes, {'A' : 'bigint', 'B' : 'float', 'C' : 'bit', 'D' : 'nvarchar'})
+
+
+
+
+
+class NCharTests(unittest.TestCase):
+
+    def testTooLongValueIsSignalled(self):
+        self.assertIsNone(nativeFormat.encodeNChar('x' * 4001))
+        self.assertEqual(nativeFormat.encodeNChar('x' * 4000), getNChar('x' * 4000))
+
+    def testTruncationDoesNotSplitASurrogatePair(self):
+        # 3999 BMP characters leave 2 bytes, too few for the 4 byte character that follows.
+        value = 'x' * 3999 + '\U0001F600' + 'y'
+
+        truncated = nativeFormat.truncateNChar(value)
+
+        self.assertEqual(truncated, getNChar('x' * 3999))
+
+    def testTruncationKeepsWholeSurrogatePairs(self):
+        value = 'x' * 3998 + '\U0001F600' + 'y'
+
+        self.assertEqual(nativeFormat.truncateNChar(value), getNChar('x' * 3998 + '\U0001F600'))
+
+    def testDatetimesAreFormattedForSqlServer(self):
+        self.assertEqual(nativeFormat.getNCharText(datetime(2026, 10, 19, 12, 30, 15, 123456)), '2026-10-19 12:30:15.123')
+        self.assertEqual(nativeFormat.getNCharText(12.5), '12.5')
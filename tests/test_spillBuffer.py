@@ -0,0 +1,146 @@
+'''
+Purpose:
+
+    Tests of utilities/spillBuffer.py.
+
+'''
+
+## Standard Libraries
+import os
+import sys
+import tempfile
+import unittest
+
+## Local Libraries
+from utilities import spillBuffer
+
+
+
+
+
+def getRow(index):
+    return {'ClaimMotorDetailId' : index, 'ClaimId' : index // 10, 'VehicleMake' : ''.join(['Toy', 'ota'])}
+
+
+
+
+
+class SpillTableListTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def getTableList(self, budgetBytes):
+        budget = spillBuffer.SpillBudget(budgetBytes, self.directory.name)
+        return budget, spillBuffer.SpillTableList('ClaimMotorDetail', budget)
+
+    def getSegmentFiles(self):
+        return os.listdir(self.directory.name)
+
+    def testRowsStayInMemoryWithinBudget(self):
+        budget, tableList = self.getTableList(10 ** 9)
+        for index in range(50):
+            tableList.append(getRow(index))
+
+        self.assertEqual(len(tableList), 50)
+        self.assertEqual(self.getSegmentFiles(), [])
+        self.assertEqual([row['ClaimMotorDetailId'] for row in tableList], list(range(50)))
+
+    def testRowsSpillOverBudgetAndStreamBackInOrder(self):
+        budget, tableList = self.getTableList(2000)
+        for index in range(2500):
+            tableList.append(getRow(index))
+
+        self.assertGreater(len(self.getSegmentFiles()), 0)
+        self.assertGreater(budget.spilledBytes, 0)
+        self.assertLessEqual(budget.usedBytes, 2000)
+        self.assertEqual(len(tableList), 2500)
+        self.assertEqual(tableList[0], getRow(0))
+        self.assertEqual(list(tableList), [getRow(index) for index in range(2500)])
+
+    def testOnlyTheFirstRowIsIndexable(self):
+        budget, tableList = self.getTableList(2000)
+        for index in range(100):
+            tableList.append(getRow(index))
+
+        with self.assertRaises(IndexError):
+            tableList[1]
+
+    def testRemoveRowsFromSpilledAndInMemoryRows(self):
+        budget, tableList = self.getTableList(2000)
+        for index in range(2500):
+            tableList.append(getRow(index))
+        removed = {0, 1, 999, 1000, len(tableList) - 1}
+
+        tableList.removeRows(removed)
+
+        expected = [getRow(index) for index in range(2500) if index not in removed]
+        self.assertEqual(len(tableList), len(expected))
+        self.assertEqual(list(tableList), expected)
+        self.assertEqual(tableList[0], expected[0])
+
+    def testClearRemovesSegmentFiles(self):
+        budget, tableList = self.getTableList(2000)
+        for index in range(2500):
+            tableList.append(getRow(index))
+
+        tableList.clear()
+
+        self.assertEqual(self.getSegmentFiles(), [])
+        self.assertEqual(len(tableList), 0)
+        self.assertEqual(budget.usedBytes, 0)
+
+    def testBudgetCloseRemovesEveryTablesSegmentFiles(self):
+        budget, tableList = self.getTableList(2000)
+        otherTableList = spillBuffer.SpillTableList('ClaimPayment', budget)
+        for index in range(2500):
+            tableList.append(getRow(index))
+            otherTableList.append({'ClaimPaymentId' : index, 'PayeeType' : 'Insured'})
+
+        budget.close()
+
+        self.assertEqual(self.getSegmentFiles(), [])
+
+    def testCategoricalValuesAreInternedAndNotCharged(self):
+        budget, tableList = self.getTableList(10 ** 9)
+        row = getRow(1)
+        tableList.append(row)
+
+        self.assertIs(row['VehicleMake'], sys.intern('Toyota'))
+
+        # The same row with a free text column instead is charged for the text.
+        budget, otherTableList = self.getTableList(10 ** 9)
+        otherTableList.append({'ClaimMotorDetailId' : 1, 'ClaimId' : 0, 'VehicleModel' : ''.join(['Toy', 'ota'])})
+        self.assertLess(tableList.inMemoryBytes, otherTableList.inMemoryBytes)
+
+    def testNonStringCategoricalValuesAreCharged(self):
+        budget, tableList = self.getTableList(10 ** 9)
+        tableList.append({'ClaimMotorDetailId' : 1, 'ClaimId' : 0, 'VehicleMake' : None})
+        budget, otherTableList = self.getTableList(10 ** 9)
+        otherTableList.append({'ClaimMotorDetailId' : 1, 'ClaimId' : 0, 'VehicleMake' : 12345})
+
+        self.assertLess(tableList.inMemoryBytes, otherTableList.inMemoryBytes)
+
+
+
+
+
+class NewTableDictListTests(unittest.TestCase):
+
+    def testCategoricalValuesAreInternedWhenNotSpilling(self):
+        tableList = spillBuffer.newTableDictList('ClaimMotorDetail')
+        row = getRow(1)
+        tableList.append(row)
+
+        self.assertIsInstance(tableList, list)
+        self.assertIs(row['VehicleMake'], sys.intern('Toyota'))
+        self.assertEqual(tableList, [row])
+
+    def testTablesWithoutCategoricalColumnsGetAPlainList(self):
+        self.assertIs(type(spillBuffer.newTableDictList('ClaimPayment')), list)
+
+    def testSpillingWhenGivenABudget(self):
+        with tempfile.TemporaryDirectory() as directory:
+            budget = spillBuffer.SpillBudget(10 ** 9, directory)
+            self.assertIsInstance(spillBuffer.newTableDictList('ClaimMotorDetail', budget), spillBuffer.SpillTableList)
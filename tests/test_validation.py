@@ -0,0 +1,171 @@
+'''
+Purpose:
+
+    Tests of control/validation.py.
+
+'''
+
+## Standard Libraries
+import os
+import tempfile
+import unittest
+
+## Local Libraries
+from control import validation
+from utilities import spillBuffer
+
+
+
+
+
+class ColumnValidatorTests(unittest.TestCase):
+
+    def testTypeIsCheckedExactly(self):
+        validate = validation.compileColumnValidator('ClaimId', {'Type' : 'int'})
+
+        self.assertIsNone(validate(1))
+        self.assertEqual(validate(True), "Not of type int")
+        self.assertEqual(validate('1'), "Not of type int")
+
+    def testNullable(self):
+        self.assertIsNone(validation.compileColumnValidator('A', {'Type' : 'int'})(None))
+        self.assertEqual(validation.compileColumnValidator('A', {'Type' : 'int', 'Nullable' : False})(None), "Null not allowed")
+
+    def testMinAndMaxRejectNonNumbers(self):
+        validate = validation.compileColumnValidator('Amount', {'Min' : 0, 'Max' : 10})
+
+        self.assertIsNone(validate(5))
+        self.assertIsNone(validate(2.5))
+        self.assertEqual(validate(-1), "Less than 0")
+        self.assertEqual(validate(11), "Greater than 10")
+        self.assertEqual(validate('5'), "Not a number")
+
+    def testMaxLengthAppliesToText(self):
+        validate = validation.compileColumnValidator('ClaimNo', {'MaxLength' : 3})
+
+        self.assertIsNone(validate('abc'))
+        self.assertEqual(validate('abcd'), "Longer than 3")
+        self.assertIsNone(validate(12345))
+
+    def testPatternRequiresText(self):
+        validate = validation.compileColumnValidator('ClaimNo', {'Pattern' : r'\S.*'})
+
+        self.assertIsNone(validate('C1'))
+        self.assertEqual(validate(' C1'), r"Doesn't match \S.*")
+        self.assertEqual(validate(1), r"Doesn't match \S.*")
+
+
+
+
+
+class ValidateTableDictListTests(unittest.TestCase):
+
+    def testErrorsAreReturnedInRowOrder(self):
+        rows = [
+            {'ClaimId' : 1, 'ClaimNo' : 'C1', 'IsCurrentVersion' : True, 'IsMultiRiskPolicy' : False},
+            {'ClaimId' : 0, 'ClaimNo' : 'C2', 'IsCurrentVersion' : True, 'IsMultiRiskPolicy' : False},
+            {'ClaimId' : 3, 'ClaimNo' : '', 'IsCurrentVersion' : 'Y', 'IsMultiRiskPolicy' : None},
+        ]
+
+        errors = validation.validateTableDictList('ClaimHeader', rows)
+
+        self.assertEqual([(rowIndex, column) for rowIndex, row, column, error in errors],
+                         [(1, 'ClaimId'), (2, 'ClaimNo'), (2, 'IsCurrentVersion')])
+
+    def testTableWithoutRules(self):
+        self.assertEqual(validation.validateTableDictList('NoSuchTable', [{'A' : None}]), [])
+
+
+
+
+
+class RejectInvalidRowsTests(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = directory.name + os.sep
+
+    def testInvalidRowsAreRemovedAndReported(self):
+        thisJob = dict()
+        rows = [{'ClaimId' : 1, 'ClaimNo' : 'C1'}, {'ClaimId' : 2, 'ClaimNo' : ''}, {'ClaimId' : 3, 'ClaimNo' : 'C3'}]
+        originalRows = rows
+
+        validation.rejectInvalidRows('ClaimHeader', rows, self.path, thisJob)
+
+        self.assertIs(rows, originalRows)
+        self.assertEqual([row['ClaimId'] for row in rows], [1, 3])
+        rejects = thisJob['ValidationRejects']['ClaimHeader']
+        self.assertEqual(len(rejects), 1)
+        self.assertEqual((rejects[0]['KeyValue'], rejects[0]['Column'], rejects[0]['Value']), (2, 'ClaimNo', "''"))
+        self.assertTrue(os.path.exists(f"{self.path}ClaimHeader.Rejects.csv"))
+        self.assertEqual([(tableDetail['ClaimTable'], tableDetail['RejectedRows']) for tableDetail in thisJob['TableDetails']],
+                         [('ClaimHeader', 1)])
+
+    def testChildRowsOfRejectedRowsAreRejected(self):
+        thisJob = dict()
+        rejectedKeys = dict()
+        headerRows = [{'ClaimId' : 1, 'ClaimNo' : 'C1'}, {'ClaimId' : 2, 'ClaimNo' : ''}]
+        paymentRows = [{'ClaimPaymentId' : 10, 'ClaimId' : 1}, {'ClaimPaymentId' : 11, 'ClaimId' : 2}]
+        detailRows = [{'ClaimPaymentDetailId' : 20, 'ClaimPaymentId' : 10}, {'ClaimPaymentDetailId' : 21, 'ClaimPaymentId' : 11}]
+
+        validation.rejectInvalidRows('ClaimHeader', headerRows, self.path, thisJob, rejectedKeys)
+        validation.rejectInvalidRows('ClaimPayment', paymentRows, self.path, thisJob, rejectedKeys)
+        validation.rejectInvalidRows('ClaimPaymentDetail', detailRows, self.path, thisJob, rejectedKeys)
+
+        self.assertEqual(paymentRows, [{'ClaimPaymentId' : 10, 'ClaimId' : 1}])
+        self.assertEqual(detailRows, [{'ClaimPaymentDetailId' : 20, 'ClaimPaymentId' : 10}])
+        self.assertEqual(rejectedKeys, {'ClaimHeader' : {2}, 'ClaimPayment' : {11}, 'ClaimPaymentDetail' : {21}})
+        self.assertEqual(thisJob['ValidationRejects']['ClaimPayment'][0]['Error'], "Parent ClaimHeader row rejected")
+
+    def testValidRowsAreLeftAlone(self):
+        thisJob = dict()
+        rows = [{'ClaimId' : 1, 'ClaimNo' : 'C1'}]
+
+        validation.rejectInvalidRows('ClaimHeader', rows, self.path, thisJob, dict())
+
+        self.assertEqual(len(rows), 1)
+        self.assertNotIn('ValidationRejects', thisJob)
+        self.assertNotIn('TableDetails', thisJob)
+
+    def testRowsAreRemovedFromASpillList(self):
+        thisJob = dict()
+        budget = spillBuffer.SpillBudget(2000, self.path)
+        rows = spillBuffer.SpillTableList('ClaimHeader', budget)
+        for claimId in range(1, 501):
+            rows.append({'ClaimId' : claimId, 'ClaimNo' : '' if claimId % 100 == 0 else f"C{claimId}"})
+        self.addCleanup(budget.close)
+
+        validation.rejectInvalidRows('ClaimHeader', rows, self.path, thisJob)
+
+        self.assertEqual(len(rows), 495)
+        self.assertNotIn(100, [row['ClaimId'] for row in rows])
+
+
+
+
+
+class RemoveRejectedClaimsTests(unittest.TestCase):
+
+    def testRejectedClaimsAreRemovedInPlace(self):
+        setToNotCurrentList = [1, 2, 3]
+        originalList = setToNotCurrentList
+
+        validation.removeRejectedClaims(setToNotCurrentList, {'ClaimHeader' : {2}, 'ClaimPayment' : {1}})
+
+        self.assertIs(setToNotCurrentList, originalList)
+        self.assertEqual(setToNotCurrentList, [1, 3])
+
+    def testEntriesMayBeDictionaries(self):
+        setToNotCurrentList = [{'ClaimId' : 1, 'ClaimNo' : 'C1'}, {'ClaimId' : 2, 'ClaimNo' : 'C2'}]
+
+        validation.removeRejectedClaims(setToNotCurrentList, {'ClaimHeader' : {1}})
+
+        self.assertEqual(setToNotCurrentList, [{'ClaimId' : 2, 'ClaimNo' : 'C2'}])
+
+    def testNothingRejected(self):
+        setToNotCurrentList = [1, 2]
+
+        validation.removeRejectedClaims(setToNotCurrentList, dict())
+
+        self.assertEqual(setToNotCurrentList, [1, 2])
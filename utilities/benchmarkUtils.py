@@ -0,0 +1,232 @@
+'''
+Purpose:
+
+    This module provides some simple benchmarks for the Claims Reporting application.
+    They are run from the project directory, e.g.
+
+        python -m utilities.benchmarkUtils startup
+
+    Benchmarks available:
+
+    1) startup           - Reports the import cost of each module loaded by each job/run type entry point.
+                           Uses the Python -X importtime option in a fresh interpreter, so results reflect a cold start.
+    2) json              - Compares the jsonUtils backend (orjson, when installed) with the json module, parsing a
+                           synthetic claims response.
+    3) intern            - Compares the memory held by ClaimMotorDetail rows parsed from JSON in a plain list, and
+                           in the table dictionary list of spillBuffer.newTableDictList, which interns the VehicleMake
+                           values. Measured with tracemalloc.
+
+Revision History:
+
+    19/10/2026   agent            Added intern benchmark.
+    19/10/2026   agent            Removed serialising from the json benchmark, as jsonUtils no longer serialises.
+    19/10/2026   agent            Added json benchmark.
+    19/10/2026   agent            Created.
+
+'''
+
+## Standard Libraries
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+
+
+## Entry points loaded by each job and run type.
+#  API/JSON runs load control.request and control.response only.
+#  API/INSERT runs additionally load the database modules on first use.
+STARTUP_ENTRY_POINTS = {
+    'app'                 : 'import app',
+    'API / JSON'          : 'import app; from control import request, response',
+    'API / INSERT'        : 'import app; from control import request, response; from database import selectControl, insertControl, updateControl, execute',
+    'CSV'                 : 'import app; from control import fileProcessing; from database import insertControl',
+}
+
+
+## Project root directory, i.e. the parent directory of this utilities package.
+PROJECT_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+
+
+
+def benchmarkStartup(topN=25):
+
+    for entryPoint, statement in STARTUP_ENTRY_POINTS.items():
+
+        print()
+        print(f"{'Startup entry point':30}: {entryPoint}")
+        print(f"{'Statement':30}: {statement}")
+
+        importTimes = getImportTimes(statement)
+
+        if importTimes is None:
+            continue
+
+        totalMicroseconds = sum(selfUs for selfUs, cumulativeUs, module in importTimes)
+        print(f"{'Total import time (ms)':30}: {totalMicroseconds / 1000:.1f}")
+        print(f"{'Modules imported':30}: {len(importTimes)}")
+        print()
+        print(f"{'Module':50}{'Self (ms)':>12}{'Cumulative (ms)':>18}")
+
+        # Report the most expensive modules by cumulative import time.
+        for selfUs, cumulativeUs, module in sorted(importTimes, key=lambda t: t[1], reverse=True)[:topN]:
+            print(f"{module:50}{selfUs / 1000:12.1f}{cumulativeUs / 1000:18.1f}")
+
+
+
+
+
+def getImportTimes(statement):
+
+    # Run the statement in a fresh interpreter with -X importtime.
+    # The import times are written to stderr in the format:
+    #   import time: self [us] | cumulative | imported package
+    #   import time:       123 |        456 |   module.name
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement],
+                               cwd=PROJECT_DIRECTORY, capture_output=True, text=True)
+
+    if completed.returncode != 0:
+        # The last line of stderr holds the exception, e.g. a module not available in this environment.
+        lastLine = completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else ''
+        print(f"{'Statement failed':30}: {lastLine}")
+        return None
+
+    importTimes = list()
+
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            # Skip the header line.
+            continue
+        importTimes.append((int(fields[0]), int(fields[1]), fields[2].strip()))
+
+    return importTimes
+
+
+
+
+
+def timeFunction(function, *args):
+
+    startTime = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - startTime
+
+
+
+
+
+def getSyntheticClaims(claimCount=20000):
+
+    # Claims resembling the API's claims, each with nested policy, loss and payment objects.
+    claims = list()
+
+    for i in range(claimCount):
+        claims.append({
+            'claim_number' : f"CL{i:08d}",
+            'status' : ('Open', 'Closed', 'Reopened')[i % 3],
+            'lodged_date' : None,
+            'last_updated' : None,
+            'is_current_version' : True,
+            'policy' : {'policy_number' : f"P{i:08d}", 'product_code' : 'MOTOR', 'is_multi_risk' : i % 2},
+            'loss' : {'cause' : 'Collision', 'description' : f"Loss {i}", 'location' : {'postcode' : '2000', 'state' : 'NSW'}},
+            'insureds' : [{'name' : f"Insured {i}", 'type' : 'Person', 'address' : {'postcode' : '2000', 'state' : 'NSW'}}],
+            'payments' : [{
+                'payment_number' : p + 1,
+                'payee' : {'name' : 'Repairer', 'type' : 'Supplier'},
+                'amount' : 100.0 * (p + 1),
+                'is_invoice' : True,
+                'details' : [{'payment_type' : 'Repair', 'amount' : 90.0, 'tax_amount' : 9.0, 'is_tax_free' : False}] * 2,
+            } for p in range(3)],
+        })
+
+    return claims
+
+
+
+
+
+def benchmarkJson(claimCount=50000):
+
+    from utilities import jsonUtils
+
+    # A response document as returned by the Claims API.
+    document = {'master_reports' : {'items' : getSyntheticClaims(claimCount)}}
+    content = json.dumps(document).encode('utf-8')
+
+    print()
+    print(f"{'Claims in response':30}: {claimCount}")
+    print(f"{'Response size (MB)':30}: {len(content) / 1048576:.1f}")
+    print(f"{'jsonUtils backend':30}: {jsonUtils.BACKEND}")
+    print()
+    print(f"{'Implementation':40}{'Seconds':>10}{'MB/second':>14}")
+
+    for name, function, argument in (('json.loads', json.loads, content),
+                                     ('jsonUtils.loads', jsonUtils.loads, content)):
+        seconds = timeFunction(function, argument)
+        print(f"{name:40}{seconds:10.3f}{len(content) / 1048576 / seconds:14,.1f}")
+
+
+
+
+
+def benchmarkIntern(rowCount=200000):
+
+    from utilities import spillBuffer
+
+    # ClaimMotorDetail rows as mapped from a response. Parsing gives each row its own VehicleMake string.
+    vehicleMakes = ('Toyota', 'Mazda', 'Hyundai', 'Ford', 'Mitsubishi', 'Volkswagen', 'Holden', 'Nissan')
+    content = json.dumps([{
+        'ClaimMotorDetailId' : i + 1,
+        'ClaimId' : i // 2 + 1,
+        'VehicleMake' : vehicleMakes[i % len(vehicleMakes)],
+        'VehicleModel' : f"Model {i % 500}",
+    } for i in range(rowCount)])
+
+    print()
+    print(f"{'ClaimMotorDetail rows':30}: {rowCount}")
+    print()
+    print(f"{'Table dictionary list':40}{'MB held':>10}{'Seconds':>10}")
+
+    for name, newTableList in (('list', list),
+                               ('spillBuffer.newTableDictList', lambda: spillBuffer.newTableDictList('ClaimMotorDetail'))):
+        # Time the appends, untraced, as tracemalloc slows allocation.
+        rows = json.loads(content)
+        tableList = newTableList()
+        seconds = timeFunction(lambda: [tableList.append(row) for row in rows])
+        del rows, tableList
+
+        # The memory held once the rows are parsed and appended, and the parsed list is released.
+        tracemalloc.start()
+        rows = json.loads(content)
+        tableList = newTableList()
+        for row in rows:
+            tableList.append(row)
+        del rows
+        heldBytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del tableList
+
+        print(f"{name:40}{heldBytes / 1048576:10.1f}{seconds:10.3f}")
+
+
+
+
+
+if __name__ == "__main__":
+
+    benchmark = sys.argv[1] if len(sys.argv) > 1 else 'startup'
+
+    if benchmark == 'startup':
+        benchmarkStartup()
+    elif benchmark == 'json':
+        benchmarkJson()
+    elif benchmark == 'intern':
+        benchmarkIntern()
+    else:
+        print(f"{'Unknown benchmark':30}: {benchmark}")
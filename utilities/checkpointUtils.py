@@ -0,0 +1,386 @@
+'''
+Purpose:
+
+    This module maintains a checkpoint journal so a failed job can be restarted without repeating work that is
+    already durable. See APP_CHECKPOINT_DIRECTORY.
+
+    The journal is a file of JSON lines, one event per line, appended and flushed as work completes:
+     - PageCompleted    - A page (item offset and page size) was fully processed.
+     - FileStaged       - A table's staging file was written. Includes a blake2b checksum of the file.
+     - PageStaged       - All of a page's staging files were written. Includes the page's item count and
+                          ClaimHeader set to not current list, so its loads and updates can be completed on restart.
+     - TableCommitted   - A table of a page was loaded without failed inserts.
+     - PageLoadStarted  - A page's loads started, in a run whose loads can't be resumed table by table. e.g. Chunked
+                          (APP_CHUNK_SIZE), or MANY, SINGLE and BATCHED updates.
+
+    On restart, with the same insurer, API and run parameters (which identify the journal):
+     - Completed pages are not fetched again.
+     - For BULK runs, a staged page is not fetched or mapped again. Its staged files are checked against their
+       checksums, and only its tables not yet committed are loaded. See isTableResumable.
+     - Otherwise, a page whose loads started but didn't complete may be partly loaded (e.g. some chunks, or some
+       tables, committed). Loading it again would insert its committed rows a second time, so it is refused, and
+       the job stops at that page. Its rows must be reconciled before the page is loaded again.
+       See getPartiallyLoadedPage.
+
+    The journal is removed when the job completes successfully.
+
+Revision History:
+
+    19/10/2026   agent            Refuse to resume a page partly loaded by a failed run. See PageLoadStarted.
+    19/10/2026   agent            Created.
+
+'''
+
+## Standard Libraries
+from hashlib import blake2b
+import json
+import logging
+import os
+import sys
+
+## Local Libraries
+import constant
+
+## Module logger
+logger = logging.getLogger(__name__)
+
+
+## File read size when calculating checksums.
+CHECKSUM_BUFFER_BYTES = 8388608
+
+
+
+
+
+def getJournalFilePathAndName(thisConfig):
+
+    # The journal is identified by the parameters that determine the claims retrieved and how they are loaded.
+    jobKey = '|'.join(str(thisConfig[key]) for key in ('INSURER', 'API_URL', 'API_PARAM_LASTUPDATED', 'APP_RUN_TYPE', 'APP_UPDATE_TYPE'))
+    jobHash = blake2b(jobKey.encode('utf-8'), digest_size=8).hexdigest()
+
+    return os.path.join(thisConfig['APP_CHECKPOINT_DIRECTORY'], f"checkpoint-{thisConfig['INSURER']}-{jobHash}.jsonl")
+
+
+
+
+
+def openJournal(thisConfig, thisJob):
+
+    # Load any journal left by a failed run of the same job into thisJob['Checkpoint'].
+    if thisConfig['APP_CHECKPOINT_DIRECTORY'] == '':
+        thisJob['Checkpoint'] = None
+        return
+
+    checkpoint = {
+        'File' : getJournalFilePathAndName(thisConfig),
+        'CompletedPages' : dict(),      # offset -> perPage
+        'StagedPages' : dict(),         # offset -> staged page details
+        'CommittedTables' : dict(),     # offset -> list of tables
+        'LoadStartedPages' : dict(),    # offset -> perPage
+    }
+    thisJob['Checkpoint'] = checkpoint
+
+    if not os.path.exists(checkpoint['File']):
+        os.makedirs(thisConfig['APP_CHECKPOINT_DIRECTORY'], exist_ok=True)
+        return
+
+    with open(checkpoint['File'], 'r') as journal:
+        for line in journal:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                # A partially written last line from the failed run.
+                continue
+            applyEvent(checkpoint, event)
+
+    logger.info(f"{'Resuming from checkpoint journal':30}: {checkpoint['File']}")
+    logger.info(f"{' ':30}: {len(checkpoint['CompletedPages'])} pages completed, {len(checkpoint['StagedPages'])} pages staged")
+    partiallyLoadedPages = [offset for offset in checkpoint['LoadStartedPages'] if offset not in checkpoint['CompletedPages']]
+    if len(partiallyLoadedPages) > 0:
+        logger.warning(f"{' ':30}: {len(partiallyLoadedPages)} pages partly loaded, at offsets {', '.join(partiallyLoadedPages)}")
+
+
+
+
+
+def applyEvent(checkpoint, event):
+
+    offset = str(event.get('Offset'))
+
+    if event['Event'] == 'PageCompleted':
+        checkpoint['CompletedPages'][offset] = event['PerPage']
+
+    elif event['Event'] == 'FileStaged':
+        stagedPage = checkpoint['StagedPages'].setdefault(offset, {'Files' : dict(), 'Complete' : False})
+        stagedPage['Files'].setdefault(event['Table'], {'FilePath' : event['FilePath'], 'Files' : list()})['Files'].append(
+            {'File' : event['File'], 'Checksum' : event['Checksum']})
+
+    elif event['Event'] == 'PageStaged':
+        stagedPage = checkpoint['StagedPages'].setdefault(offset, {'Files' : dict(), 'Complete' : False})
+        stagedPage['Complete'] = True
+        stagedPage['PerPage'] = event['PerPage']
+        stagedPage['ItemCount'] = event['ItemCount']
+        stagedPage['SetToNotCurrent'] = event['SetToNotCurrent']
+
+    elif event['Event'] == 'TableCommitted':
+        checkpoint['CommittedTables'].setdefault(offset, list()).append(event['Table'])
+
+    elif event['Event'] == 'PageLoadStarted':
+        checkpoint['LoadStartedPages'][offset] = event['PerPage']
+
+
+
+
+
+def recordEvent(thisJob, event):
+
+    checkpoint = thisJob.get('Checkpoint')
+    if checkpoint is None:
+        return
+
+    applyEvent(checkpoint, event)
+
+    try:
+        with open(checkpoint['File'], 'a') as journal:
+            journal.write(json.dumps(event, default=str) + '\n')
+            journal.flush()
+            os.fsync(journal.fileno())
+    except:
+        logger.warning(f"{'Unable to write checkpoint journal':30}: {checkpoint['File']}: {sys.exc_info()[1]}")
+
+
+
+
+
+def isTableResumable(thisConfig):
+
+    # Loads can only be resumed table by table where each table's staging file is the complete, durable
+    # input to its load. i.e. BULK, not chunked (files are overwritten per chunk) and not compressed.
+    return (thisConfig['APP_UPDATE_TYPE'].upper() == constant.BULK_UPDATE_TYPE
+        and thisConfig['APP_CHUNK_SIZE'] == 0
+        and thisConfig['SQL_BULKINSERT_COMPRESSION'].upper() == constant.NO_COMPRESSION)
+
+
+
+
+
+def getCompletedPage(thisJob, offset):
+
+    # Returns the page size of the completed page at the offset, or None.
+    checkpoint = thisJob.get('Checkpoint')
+    if checkpoint is None:
+        return None
+    return checkpoint['CompletedPages'].get(str(offset))
+
+
+
+
+
+def getStagedPage(thisJob, offset):
+
+    # Returns the details of the fully staged page at the offset, or None.
+    checkpoint = thisJob.get('Checkpoint')
+    if checkpoint is None:
+        return None
+    stagedPage = checkpoint['StagedPages'].get(str(offset))
+    if stagedPage is None or not stagedPage['Complete']:
+        return None
+    return stagedPage
+
+
+
+
+
+def getCommittedTables(thisJob, offset):
+
+    checkpoint = thisJob.get('Checkpoint')
+    if checkpoint is None:
+        return list()
+    return checkpoint['CommittedTables'].get(str(offset), list())
+
+
+
+
+
+def getPartiallyLoadedPage(thisConfig, thisJob, offset):
+
+    # Returns the page size of the page at the offset if a failed run of this job started loading it, and this run
+    # can't resume its loads table by table, or None.
+    checkpoint = thisJob.get('Checkpoint')
+    if checkpoint is None:
+        return None
+
+    offset = str(offset)
+    if offset in checkpoint['LoadStartedPages']:
+        return checkpoint['LoadStartedPages'][offset]
+
+    # A page staged for table level resume, with tables committed, by a run with different load options.
+    stagedPage = getStagedPage(thisJob, offset)
+    if stagedPage is not None and not isTableResumable(thisConfig) and len(getCommittedTables(thisJob, offset)) > 0:
+        return stagedPage['PerPage']
+
+    return None
+
+
+
+
+
+def getCheckpointedPage(thisConfig, thisJob, offset):
+
+    # Returns (perPage, stagedPage) for a page completed, partly loaded, or staged and table resumable, by a failed
+    # run of this job. stagedPage is None for a completed page, and {'PartiallyLoaded' : True} for a partly loaded
+    # page, which is refused (see response.resumeCheckpointedPage). Returns None for a page still to be fetched.
+    perPage = getCompletedPage(thisJob, offset)
+    if perPage is not None:
+        return perPage, None
+
+    perPage = getPartiallyLoadedPage(thisConfig, thisJob, offset)
+    if perPage is not None:
+        return perPage, {'PartiallyLoaded' : True}
+
+    stagedPage = getStagedPage(thisJob, offset)
+    if stagedPage is not None and isTableResumable(thisConfig):
+        return stagedPage['PerPage'], stagedPage
+
+    return None
+
+
+
+
+
+def getChecksum(filePathAndName):
+
+    digest = blake2b(digest_size=16)
+    with open(filePathAndName, 'rb') as f:
+        for block in iter(lambda: f.read(CHECKSUM_BUFFER_BYTES), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+
+
+
+def recordFileStaged(thisJob, table, filePath, filePathAndName):
+
+    if thisJob.get('Checkpoint') is None:
+        return
+
+    recordEvent(thisJob, {
+        'Event' : 'FileStaged',
+        'Offset' : thisJob['CheckpointOffset'],
+        'Table' : table,
+        'FilePath' : filePath,
+        'File' : filePathAndName,
+        'Checksum' : getChecksum(filePathAndName),
+    })
+
+
+
+
+
+def recordPageStaged(thisJob, itemCount, setToNotCurrentList):
+
+    recordEvent(thisJob, {
+        'Event' : 'PageStaged',
+        'Offset' : thisJob.get('CheckpointOffset'),
+        'PerPage' : thisJob.get('CheckpointPerPage'),
+        'ItemCount' : itemCount,
+        'SetToNotCurrent' : setToNotCurrentList,
+    })
+
+
+
+
+
+def recordTableCommitted(thisJob, table):
+
+    recordEvent(thisJob, {
+        'Event' : 'TableCommitted',
+        'Offset' : thisJob.get('CheckpointOffset'),
+        'Table' : table,
+    })
+
+
+
+
+
+def recordPageLoadStarted(thisConfig, thisJob):
+
+    # Record that the current page's loads are starting, when they can't be resumed table by table.
+    # Recorded once per page, before its first load (e.g. its first chunk's).
+    checkpoint = thisJob.get('Checkpoint')
+    if checkpoint is None or isTableResumable(thisConfig):
+        return
+
+    if str(thisJob['CheckpointOffset']) in checkpoint['LoadStartedPages']:
+        return
+
+    recordEvent(thisJob, {
+        'Event' : 'PageLoadStarted',
+        'Offset' : thisJob['CheckpointOffset'],
+        'PerPage' : thisJob['CheckpointPerPage'],
+    })
+
+
+
+
+
+def recordPageProcessed(thisConfig, thisJob):
+
+    # Record the current page (thisJob['CheckpointOffset']) as completed, unless it was staged for table level
+    # resume and some of its tables weren't committed. A rerun then loads just those tables.
+    # Returns False in that case, as later pages would overwrite the page's staged files.
+    checkpoint = thisJob.get('Checkpoint')
+    if checkpoint is None:
+        return True
+
+    offset = thisJob['CheckpointOffset']
+
+    stagedPage = checkpoint['StagedPages'].get(str(offset))
+    if stagedPage is not None and isTableResumable(thisConfig):
+        committedTables = getCommittedTables(thisJob, offset)
+        uncommittedTables = [table for table in stagedPage['Files'] if table not in committedTables]
+        if len(uncommittedTables) > 0:
+            logger.warning(f"{'Page tables not committed':30}: Offset {offset}: {', '.join(uncommittedTables)}")
+            return False
+
+    recordEvent(thisJob, {
+        'Event' : 'PageCompleted',
+        'Offset' : offset,
+        'PerPage' : thisJob['CheckpointPerPage'],
+    })
+
+    return True
+
+
+
+
+
+def verifyStagedFiles(stagedTable):
+
+    for stagedFile in stagedTable['Files']:
+        if not os.path.exists(stagedFile['File']) or getChecksum(stagedFile['File']) != stagedFile['Checksum']:
+            logger.error(f"{'Staged file missing or changed':30}: {stagedFile['File']}")
+            return False
+    return True
+
+
+
+
+
+def completeJournal(thisJob):
+
+    # Called at the end of the job. Once every page is completed, nothing remains to be resumed.
+    checkpoint = thisJob.get('Checkpoint')
+    if checkpoint is None:
+        return
+
+    # Keep the journal while pages remain to be fetched or loaded, so a rerun can resume them, or refuse them.
+    if (thisJob.get('FetchIncomplete')
+    or any(offset not in checkpoint['CompletedPages'] for offset in checkpoint['StagedPages'])
+    or any(offset not in checkpoint['CompletedPages'] for offset in checkpoint['LoadStartedPages'])):
+        logger.warning(f"{'Checkpoint journal kept':30}: {checkpoint['File']}")
+        return
+
+    if os.path.exists(checkpoint['File']):
+        os.remove(checkpoint['File'])
@@ -5,6 +5,7 @@ Purpose:
          
 Revision History:
 
+    19/10/2026   agent            Import pytz on first use. It is comparatively slow to import and not needed by JSON runs.
     04/08/2020   Mark Schaafsma   Created 
          
 '''
@@ -16,7 +17,7 @@ from datetime import datetime
 #from datetime import time
 
 # Third Party Libraries
-import pytz
+# pytz is imported within the functions that use it to keep application startup cheap.
 
 # Local Source
 import constant
@@ -67,6 +68,7 @@ def utcToLocal(utc_dt_iso, returnType=None):
 #     Australia/West
 #     Australia/Yancowinna
 
+    import pytz
     local_dt= utc_dt.astimezone(pytz.timezone("Australia/Sydney"))
 
 #     print(f"{'UTC time received from API:':35}{utc_dt_iso}")    
@@ -104,6 +106,7 @@ def utcToLocal(utc_dt_iso, returnType=None):
 
 
 def naiveToAware(dt_naive):
+    import pytz
     tz = pytz.timezone("Australia/Sydney") 
     dt_aware = tz.localize(dt_naive)
     return str(dt_aware)
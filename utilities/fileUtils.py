@@ -10,6 +10,7 @@ from datetime import datetime
 # JSON serialization for writing to file. Not for handling the JSON response. Rather, the 'requests' module handles responses to create JSON.
 import json
 import logging
+import os
 import sys
 
 ## Local Source
@@ -21,9 +22,12 @@ logger = logging.getLogger(__name__)
 
 
 
-def writeDictListToCsvFile(dictList, fileName, filePathAndName):
+def writeDictListToCsvFile(dictList, fileName, filePathAndName, keys=None):
     '''
     Converts list of dictionary values to CSV
+
+    dictList may be any iterable of dictionaries (e.g. a generator streaming rows back from disk)
+    provided keys is supplied.
     '''
 
     try:
@@ -39,7 +43,8 @@ def writeDictListToCsvFile(dictList, fileName, filePathAndName):
         # The following creates the fieldnames required by dictWriter.
         # This option creates it in the same as order as it was created by this application, which is preferred.
         # Assertion: We only get here if we have at least one item in the dictionary so we rely on distList[0] having data
-        keys = tuple(dictList[0])
+        if keys is None:
+            keys = tuple(dictList[0])
         #print("Enumerate Keys")
         #for k in keys:
         #    print(k)
@@ -140,10 +145,11 @@ def writeJsonDictToJsonFile(jsonDict):
         
 
 
-def getPathDetails(thisConfig):
+def getPathDetails(thisConfig, configKey='SQL_BULKINSERT_INPUT_FILEPATH'):
     
     # Get the path from config 
-    path = thisConfig['SQL_BULKINSERT_INPUT_FILEPATH']
+    # By default the Bulk Insert path. Alternatively the local staging path, SQL_BULKINSERT_LOCAL_FILEPATH.
+    path = thisConfig[configKey]
 
     # Determine if it is a standard windows file path or a UNC file path
     # i.e. A windows standard path contains black slashes and starts with a driver letter.
@@ -159,6 +165,14 @@ def getPathDetails(thisConfig):
         if path[-1] != "\\":
             path = path + "\\"
 
+    # When several insurers are processed concurrently, each insurer stages its files in its own sub-directory.
+    if thisConfig['APP_MULTI_INSURER']:
+        if path[0] == '/' and path [1] == '/':
+            path = path + thisConfig['INSURER'] + '//'
+        else:
+            path = path + thisConfig['INSURER'] + "\\"
+        os.makedirs(path, exist_ok=True)
+
         
     return path    
 
@@ -0,0 +1,79 @@
+'''
+Purpose:
+
+    This module provides JSON parsing through the fastest backend installed:
+     - orjson       - When installed. Parses faster than the json module.
+     - json         - The standard library module, otherwise.
+
+    Documents orjson rejects fall back to the json module. e.g. Text with invalid UTF-8, or in UTF-16.
+    Note orjson parses integers wider than 64 bits as floats, which doesn't arise in the claims data.
+    See utilities/benchmarkUtils.py ("json") for a benchmark.
+
+    Responses are decoded as response.json() decodes them: with the charset the response declares, if any.
+
+    Serialisation (e.g. the kept response, see fileUtils) stays with the json module. orjson's output differs
+    (two space indent, no escaping of non-ASCII characters, its own datetime format), so files would differ by
+    backend.
+
+Revision History:
+
+    19/10/2026   agent            Decode responses with their declared charset. Removed dumps.
+    19/10/2026   agent            Created.
+
+'''
+
+## Standard Libraries
+import codecs
+import importlib.util
+import json
+import logging
+
+## Module logger
+logger = logging.getLogger(__name__)
+
+
+## Backend names.
+ORJSON_BACKEND = 'orjson'
+STDLIB_BACKEND = 'json'
+
+## orjson is optional. find_spec checks the package is available without the cost of importing it.
+BACKEND = ORJSON_BACKEND if importlib.util.find_spec('orjson') is not None else STDLIB_BACKEND
+
+
+
+
+
+def loads(data):
+
+    # data may be bytes (e.g. a response's content) or str.
+    if BACKEND == ORJSON_BACKEND:
+        import orjson
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # e.g. Invalid UTF-8, which the json module parses from str. A malformed document raises again below.
+            pass
+
+    return json.loads(data)
+
+
+
+
+
+def getUtf8Content(claimsResponse):
+
+    # The response's content as UTF-8, re-encoded from the charset the response declares (requests sets
+    # encoding from the Content-Type header). Content without a declared charset is returned as is.
+    encoding = claimsResponse.encoding
+    if encoding is None or codecs.lookup(encoding).name == 'utf-8':
+        return claimsResponse.content
+    return claimsResponse.content.decode(encoding).encode('utf-8')
+
+
+
+
+
+def parseResponse(claimsResponse):
+
+    # Equivalent to claimsResponse.json(), parsing the content with the backend.
+    return loads(getUtf8Content(claimsResponse))
@@ -0,0 +1,272 @@
+'''
+Purpose:
+
+    This module writes table dictionary lists to SQL Server native (bcp) format data files, along with the
+    matching non-XML format files, for loading by the T-SQL Bulk Insert. See SQL_BULKINSERT_FILE_FORMAT.
+
+    Compared to the pipe delimited latin-1 "csv" files:
+     - Integer, float and bit values are written as little-endian binary. No string formatting or re-parsing.
+     - Character values are written as UTF-16LE (SQLNCHAR), so unicode data no longer needs to be escaped to latin-1.
+     - Date, time and decimal values are written as SQLNCHAR text, and converted by SQL Server.
+
+    Every field is written with a length prefix, and no terminators:
+     - bit, int, bigint, float   - 1 byte prefix holding the data length, or 0xFF for NULL.
+     - nvarchar                  - 2 byte prefix holding the data length in bytes, or 0xFFFF for NULL.
+
+    Column types are taken from tableSchema.COLUMN_TYPES where declared, else inferred from the Python values.
+
+Revision History:
+
+    19/10/2026   agent            Truncate long character values on their encoded bytes. Added translate.
+    19/10/2026   agent            Created.
+
+'''
+
+## Standard Libraries
+from datetime import date, datetime, time
+import logging
+import struct
+import sys
+
+## Local Source
+from models import tableSchema
+
+## Module logger
+logger = logging.getLogger(__name__)
+
+
+## Format file version. 14.0 is SQL Server 2017, but is accepted by later versions too.
+FORMAT_FILE_VERSION = '14.0'
+
+## Maximum SQLNCHAR field length in bytes. i.e. nvarchar(4000).
+NCHAR_MAX_BYTES = 8000
+
+## Bytes buffered before being written to the data file.
+WRITE_BUFFER_BYTES = 1048576
+
+## Host file data type, prefix length and host file data length for each column type.
+FORMAT_FILE_TYPES = {
+    'bit'      : ('SQLBIT',    1, 1),
+    'int'      : ('SQLINT',    1, 4),
+    'bigint'   : ('SQLBIGINT', 1, 8),
+    'float'    : ('SQLFLT8',   1, 8),
+    'nvarchar' : ('SQLNCHAR',  2, NCHAR_MAX_BYTES),
+}
+
+NULL_PREFIX_1 = b'\xff'
+NULL_PREFIX_2 = b'\xff\xff'
+BIT_TRUE = b'\x01\x01'
+BIT_FALSE = b'\x01\x00'
+
+INT_STRUCT = struct.Struct('<Bi')
+BIGINT_STRUCT = struct.Struct('<Bq')
+FLOAT_STRUCT = struct.Struct('<Bd')
+NCHAR_PREFIX_STRUCT = struct.Struct('<H')
+
+
+
+
+
+def writeDictListToNativeFile(dictList, fileName, filePathAndName, keys=None, translate=None):
+    '''
+    Writes a list of dictionaries to a native format data file (.dat) and its format file (.fmt).
+    translate, when given, is applied to each dictionary as it is written.
+    '''
+
+    try:
+
+        # As for the "csv" files, the column order is the order the application created the dictionary keys.
+        if keys is None:
+            keys = tuple(dictList[0])
+
+        columnTypes = getColumnTypes(fileName, dictList, keys)
+
+        dataFilePathAndName = filePathAndName + ".dat"
+        formatFilePathAndName = filePathAndName + ".fmt"
+
+        writeFormatFile(keys, columnTypes, formatFilePathAndName)
+
+        encoders = [getEncoder(columnTypes[key]) for key in keys]
+        keyEncoders = list(zip(keys, encoders))
+
+        rowCount = 0
+        truncatedCount = 0
+        buffer = bytearray()
+
+        with open(dataFilePathAndName, 'wb') as outputFile:
+            for d in dictList:
+                if translate is not None:
+                    d = translate(d)
+                for key, encoder in keyEncoders:
+                    encoded = encoder(d[key])
+                    if encoded is None:
+                        # Character value too long for the field. Truncate to the maximum field length.
+                        encoded = truncateNChar(d[key])
+                        truncatedCount += 1
+                    buffer += encoded
+                rowCount += 1
+                if len(buffer) >= WRITE_BUFFER_BYTES:
+                    outputFile.write(buffer)
+                    buffer = bytearray()
+            outputFile.write(buffer)
+
+        if truncatedCount > 0:
+            logger.warning(f"{fileName:25} {'character values truncated: ':33}{truncatedCount}")
+
+        logger.info(f"{fileName:25} {'dictionary values saved to: ':33}{dataFilePathAndName}")
+
+        return rowCount
+
+    except:
+        message = "ERROR writing " + fileName + " dictionary values to"
+        logger.error(f"{message:55}: {filePathAndName}")
+        logger.error(f"{' ':55}: {sys.exc_info()[0]}")
+        logger.error(f"{' ':55}: {sys.exc_info()[1]}")
+
+        return 0
+
+
+
+
+
+def getColumnTypes(table, dictList, keys):
+
+    # Start with the declared column types, then infer the remainder from the first non None value of each column.
+    columnTypes = dict()
+    declaredTypes = tableSchema.COLUMN_TYPES.get(table, dict())
+
+    undeclaredKeys = list()
+    for key in keys:
+        if key in declaredTypes:
+            columnTypes[key] = declaredTypes[key]
+        else:
+            undeclaredKeys.append(key)
+
+    for d in dictList:
+        if len(undeclaredKeys) == 0:
+            break
+        for key in list(undeclaredKeys):
+            if d[key] is not None:
+                columnTypes[key] = inferColumnType(d[key])
+                undeclaredKeys.remove(key)
+
+    # Columns that are None in every row are staged as NULL character values.
+    for key in undeclaredKeys:
+        columnTypes[key] = 'nvarchar'
+
+    return columnTypes
+
+
+
+
+
+def inferColumnType(value):
+
+    # Note: bool is a subclass of int, so check it first.
+    if isinstance(value, bool):
+        return 'bit'
+    if isinstance(value, int):
+        return 'bigint'
+    if isinstance(value, float):
+        return 'float'
+    return 'nvarchar'
+
+
+
+
+
+def writeFormatFile(keys, columnTypes, formatFilePathAndName):
+
+    # Non-XML format file. One line per field:
+    #   Host field order, Host file data type, Prefix length, Host file data length, Terminator,
+    #   Server column order, Server column name, Column collation
+    lines = [FORMAT_FILE_VERSION, str(len(keys))]
+
+    for order, key in enumerate(keys, start=1):
+        dataType, prefixLength, dataLength = FORMAT_FILE_TYPES[columnTypes[key]]
+        lines.append(f'{order:<8}{dataType:<14}{prefixLength:<8}{dataLength:<8}{chr(34) * 2:<6}{order:<6}{key:<40}""')
+
+    with open(formatFilePathAndName, 'w', newline='\r\n') as formatFile:
+        formatFile.write('\n'.join(lines) + '\n')
+
+
+
+
+
+def getEncoder(columnType):
+
+    if columnType == 'bit':
+        return encodeBit
+    if columnType == 'int':
+        return encodeInt
+    if columnType == 'bigint':
+        return encodeBigInt
+    if columnType == 'float':
+        return encodeFloat
+    return encodeNChar
+
+
+
+
+
+def encodeBit(value):
+    if value is None:
+        return NULL_PREFIX_1
+    return BIT_TRUE if value else BIT_FALSE
+
+
+def encodeInt(value):
+    if value is None:
+        return NULL_PREFIX_1
+    return INT_STRUCT.pack(4, value)
+
+
+def encodeBigInt(value):
+    if value is None:
+        return NULL_PREFIX_1
+    return BIGINT_STRUCT.pack(8, value)
+
+
+def encodeFloat(value):
+    if value is None:
+        return NULL_PREFIX_1
+    return FLOAT_STRUCT.pack(8, value)
+
+
+def encodeNChar(value):
+
+    if value is None:
+        return NULL_PREFIX_2
+
+    data = getNCharText(value).encode('utf-16-le')
+
+    # Returning None signals the value is too long for the field.
+    if len(data) > NCHAR_MAX_BYTES:
+        return None
+
+    return NCHAR_PREFIX_STRUCT.pack(len(data)) + data
+
+
+def truncateNChar(value):
+
+    # Truncate the encoded value, not the text, as characters outside the BMP take 4 bytes in UTF-16.
+    data = getNCharText(value).encode('utf-16-le')[:NCHAR_MAX_BYTES]
+
+    # Don't leave the high half of a surrogate pair. The high byte of each code unit is its second byte.
+    if len(data) >= 2 and 0xD8 <= data[-1] <= 0xDB:
+        data = data[:-2]
+
+    return NCHAR_PREFIX_STRUCT.pack(len(data)) + data
+
+
+def getNCharText(value):
+
+    # Format dates and times in a form SQL Server converts to datetime, datetime2, date or time columns.
+    # The datetime type only supports 3 fractional second digits.
+    if isinstance(value, datetime):
+        return value.isoformat(sep=' ', timespec='milliseconds')
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    if not isinstance(value, str):
+        return str(value)
+    return value
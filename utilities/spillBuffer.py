@@ -0,0 +1,336 @@
+'''
+Purpose:
+
+    This module provides a table dictionary list that spills rows to local temporary segment files
+    once a memory budget, shared by all the table dictionary lists of a job, has been exceeded.
+
+    Rows are spilled as pickled tuples of the row values (the keys are held once per table), in batches,
+    so they can be streamed back in order when the table is written to file or loaded. Pickle writes a string
+    shared by several rows of a batch once, so interned categorical values are also compact on disk.
+
+    The string values of a table's categorical columns (see tableSchema.CATEGORICAL_COLUMNS) are interned as rows
+    are appended, so every row holding a value shares one string object, and the value isn't charged to each row.
+    When rows aren't spilled (APP_BUFFER_MEMORY_BUDGET_MB is 0), an InternedTableList, a plain list that interns
+    the same values on append, holds the table's rows. See newTableDictList.
+    See utilities/benchmarkUtils.py ("intern") for a measurement.
+
+    A SpillTableList supports the list operations used by the response processing:
+     - append(row)
+     - len(tableList)
+     - iteration (in append order, spilled rows first)
+     - tableList[0] (the first row is always held in memory)
+     - clear()
+     - removeRows(rowIndexes) (e.g. rows rejected by validation)
+
+Revision History:
+
+    19/10/2026   agent            Intern categorical values when rows aren't spilled too. Added InternedTableList.
+    19/10/2026   agent            Remove segment files when spilling fails, and when processing ends (close).
+    19/10/2026   agent            Intern the values of categorical columns, and don't charge them to each row.
+    19/10/2026   agent            Added removeRows.
+    19/10/2026   agent            Created.
+
+'''
+
+## Standard Libraries
+import logging
+import os
+import pickle
+import sys
+import tempfile
+
+## Local Libraries
+from models import tableSchema
+
+## Module logger
+logger = logging.getLogger(__name__)
+
+
+## Number of rows pickled per batch within a segment file.
+SPILL_BATCH_ROWS = 1000
+
+## Number of rows sampled to estimate the in-memory size of a table's rows.
+SIZE_SAMPLE_ROWS = 100
+
+
+
+
+
+class SpillBudget:
+
+    def __init__(self, budgetBytes, directory=''):
+
+        self.budgetBytes = budgetBytes
+        self.directory = directory if directory != '' else None
+        self.usedBytes = 0
+        self.spilledBytes = 0
+        self.tableLists = list()
+
+
+    def register(self, tableList):
+        self.tableLists.append(tableList)
+
+
+    def charge(self, nbytes):
+
+        self.usedBytes += nbytes
+
+        # When over budget, spill the table list holding the most memory.
+        # This is typically a large child table, e.g. ClaimPaymentDetail or ClaimReserveMovement.
+        if self.usedBytes > self.budgetBytes:
+            largest = max(self.tableLists, key=lambda tableList: tableList.inMemoryBytes)
+            largest.spill()
+
+
+    def release(self, nbytes):
+        self.usedBytes -= nbytes
+
+
+    def close(self):
+
+        # Remove the segment files of all the table lists, e.g. when processing ends, successfully or not.
+        for tableList in self.tableLists:
+            tableList.clear()
+
+
+
+
+
+class InternedTableList(list):
+
+    # A table dictionary list held in memory, interning the string values of the table's categorical columns as
+    # rows are appended.
+    def __init__(self, table):
+
+        super().__init__()
+        self.categoricalColumns = tableSchema.CATEGORICAL_COLUMNS.get(table, frozenset())
+
+
+    def append(self, row):
+
+        internCategoricalValues(row, self.categoricalColumns)
+        super().append(row)
+
+
+
+
+
+class SpillTableList:
+
+    def __init__(self, table, budget):
+
+        self.table = table
+        self.budget = budget
+        self.categoricalColumns = tableSchema.CATEGORICAL_COLUMNS.get(table, frozenset())
+        self.keys = None
+        self.firstRow = None
+        self.rows = list()
+        self.inMemoryBytes = 0
+        self.segmentFiles = list()
+        self.segmentRowCounts = list()
+        self.spilledRowCount = 0
+        self.rowSizeSampleBytes = 0
+        self.rowSizeSampleCount = 0
+
+        budget.register(self)
+
+
+    def append(self, row):
+
+        if self.firstRow is None:
+            self.firstRow = row
+            self.keys = tuple(row)
+
+        internCategoricalValues(row, self.categoricalColumns)
+
+        self.rows.append(row)
+
+        rowBytes = self.estimateRowBytes(row)
+        self.inMemoryBytes += rowBytes
+        self.budget.charge(rowBytes)
+
+
+    def estimateRowBytes(self, row):
+
+        # Measure the first rows of the table, then use their average size.
+        # The string values of categorical columns were interned by append, so aren't charged to each row.
+        if self.rowSizeSampleCount < SIZE_SAMPLE_ROWS:
+            rowBytes = sys.getsizeof(row) + sum(sys.getsizeof(value) for key, value in row.items()
+                                                if key not in self.categoricalColumns or type(value) is not str)
+            self.rowSizeSampleBytes += rowBytes
+            self.rowSizeSampleCount += 1
+            return rowBytes
+
+        return self.rowSizeSampleBytes // self.rowSizeSampleCount
+
+
+    def spill(self):
+
+        if len(self.rows) == 0:
+            return
+
+        # Write the in-memory rows to a new segment file as batches of value tuples.
+        # A segment file that can't be written in full is removed.
+        segmentFile = tempfile.NamedTemporaryFile(mode='wb', prefix=f"{self.table}-", suffix='.seg', dir=self.budget.directory, delete=False)
+        try:
+            with segmentFile:
+                for start in range(0, len(self.rows), SPILL_BATCH_ROWS):
+                    batch = [tuple(row.values()) for row in self.rows[start:start + SPILL_BATCH_ROWS]]
+                    pickle.dump(batch, segmentFile, protocol=pickle.HIGHEST_PROTOCOL)
+        except:
+            removeSegmentFile(segmentFile.name)
+            raise
+
+        self.segmentFiles.append(segmentFile.name)
+        self.segmentRowCounts.append(len(self.rows))
+        self.spilledRowCount += len(self.rows)
+
+        logger.debug(f"{self.table:25} {'rows spilled to segment file: ':33}{segmentFile.name} ({len(self.rows)} rows)")
+
+        self.budget.release(self.inMemoryBytes)
+        self.budget.spilledBytes += self.inMemoryBytes
+        self.rows = list()
+        self.inMemoryBytes = 0
+
+
+    def __len__(self):
+        return self.spilledRowCount + len(self.rows)
+
+
+    def __getitem__(self, index):
+
+        # Only the first row is guaranteed to be in memory. It is used to determine the table and column names.
+        if index == 0 and self.firstRow is not None:
+            return self.firstRow
+
+        raise IndexError(f"SpillTableList only supports access to the first row: index {index}")
+
+
+    def __iter__(self):
+
+        # Stream back spilled rows, in the order they were appended, followed by the in-memory rows.
+        for segmentFileName in self.segmentFiles:
+            with open(segmentFileName, 'rb') as segmentFile:
+                while True:
+                    try:
+                        batch = pickle.load(segmentFile)
+                    except EOFError:
+                        break
+                    for values in batch:
+                        yield dict(zip(self.keys, values))
+
+        yield from self.rows
+
+
+    def removeRows(self, rowIndexes):
+
+        # Remove the rows at the given positions (in iteration order). Segment files holding any of the rows are
+        # rewritten, a batch at a time, so the spilled rows are never all read into memory.
+        rowIndex = 0
+        segmentFiles = list()
+        spilledRowCount = 0
+
+        segmentRowCounts = list()
+
+        for segmentFileName, segmentRowCount in zip(self.segmentFiles, self.segmentRowCounts):
+
+            if not any(rowIndex <= i < rowIndex + segmentRowCount for i in rowIndexes):
+                segmentFiles.append(segmentFileName)
+                segmentRowCounts.append(segmentRowCount)
+                spilledRowCount += segmentRowCount
+                rowIndex += segmentRowCount
+                continue
+
+            keptRowCount = 0
+
+            # The original segment file is kept until its replacement has been written in full.
+            newSegmentFile = tempfile.NamedTemporaryFile(mode='wb', prefix=f"{self.table}-", suffix='.seg', dir=self.budget.directory, delete=False)
+            try:
+                with open(segmentFileName, 'rb') as segmentFile, newSegmentFile:
+                    while True:
+                        try:
+                            batch = pickle.load(segmentFile)
+                        except EOFError:
+                            break
+                        keptBatch = [values for i, values in enumerate(batch, start=rowIndex) if i not in rowIndexes]
+                        rowIndex += len(batch)
+                        if len(keptBatch) > 0:
+                            pickle.dump(keptBatch, newSegmentFile, protocol=pickle.HIGHEST_PROTOCOL)
+                            keptRowCount += len(keptBatch)
+            except:
+                removeSegmentFile(newSegmentFile.name)
+                raise
+
+            os.remove(segmentFileName)
+            segmentFiles.append(newSegmentFile.name)
+            segmentRowCounts.append(keptRowCount)
+            spilledRowCount += keptRowCount
+
+        keptRows = [row for i, row in enumerate(self.rows, start=rowIndex) if i not in rowIndexes]
+        if len(self.rows) > 0:
+            releasedBytes = self.inMemoryBytes * (len(self.rows) - len(keptRows)) // len(self.rows)
+            self.budget.release(releasedBytes)
+            self.inMemoryBytes -= releasedBytes
+
+        self.rows = keptRows
+        self.segmentFiles = segmentFiles
+        self.segmentRowCounts = segmentRowCounts
+        self.spilledRowCount = spilledRowCount
+
+        # The first row may have been removed.
+        if 0 in rowIndexes:
+            self.firstRow = next(iter(self), None)
+
+
+    def clear(self):
+
+        for segmentFileName in self.segmentFiles:
+            removeSegmentFile(segmentFileName)
+
+        self.budget.release(self.inMemoryBytes)
+        self.firstRow = None
+        self.keys = None
+        self.rows = list()
+        self.inMemoryBytes = 0
+        self.segmentFiles = list()
+        self.segmentRowCounts = list()
+        self.spilledRowCount = 0
+
+
+
+
+
+def newTableDictList(table, spillBudget=None):
+
+    # A table dictionary list for the table. Rows spill to segment files when a spill budget is given.
+    # A plain list is enough for a table without categorical columns.
+    if spillBudget is not None:
+        return SpillTableList(table, spillBudget)
+
+    if table in tableSchema.CATEGORICAL_COLUMNS:
+        return InternedTableList(table)
+
+    return list()
+
+
+
+
+
+def internCategoricalValues(row, categoricalColumns):
+
+    # Replace the row's categorical string values, in place, with the interned string of equal value.
+    for key in categoricalColumns:
+        value = row.get(key)
+        if type(value) is str:
+            row[key] = sys.intern(value)
+
+
+
+
+
+def removeSegmentFile(segmentFileName):
+
+    try:
+        os.remove(segmentFileName)
+    except OSError:
+        logger.warning(f"{'Unable to remove segment file':30}: {segmentFileName}")
@@ -0,0 +1,153 @@
+'''
+Purpose:
+
+    This module handles compressed transfer of staging (csv/dat/fmt) files to the Bulk Insert share.
+    See SQL_BULKINSERT_COMPRESSION.
+
+    When compression is in use:
+     1) The application writes staging files to SQL_BULKINSERT_LOCAL_FILEPATH, on the application host.
+     2) Each file is gzip compressed locally, then copied to SQL_BULKINSERT_INPUT_FILEPATH in one sequential transfer.
+        The transfer is measured and recorded per table in thisJob['StagingTransfers'].
+     3) On the SQL Server host, an expander decompresses each file next to the server, so the uncompressed data
+        never crosses the network. Run it against the share's local directory, e.g.
+
+            python -m utilities.stagingTransfer C:\\ClaimsReporting\\uat\\csvfiles
+
+        With --watch, the expander keeps expanding files as they arrive, for the duration of a job.
+        The expander writes to a temporary file, renames it into place, then removes the .gz file.
+     4) Before each Bulk Insert, the application waits for the table's .gz files to be removed by the expander.
+
+Revision History:
+
+    19/10/2026   agent            transferCompressedFile returns whether the file was transferred.
+    19/10/2026   agent            Created.
+
+'''
+
+## Standard Libraries
+import glob
+import gzip
+import logging
+import os
+import shutil
+import sys
+import time
+
+## Module logger
+logger = logging.getLogger(__name__)
+
+
+## Copy buffer size. Large buffers keep the share transfer sequential.
+COPY_BUFFER_BYTES = 8388608
+
+## Seconds between checks for expanded files.
+POLL_SECONDS = 1
+
+
+
+
+
+def transferCompressedFile(localFilePathAndName, sharePath, table, thisJob):
+
+    # Returns False if the file couldn't be transferred.
+    try:
+        fileName = os.path.basename(localFilePathAndName)
+        compressedFilePathAndName = f"{localFilePathAndName}.gz"
+        shareFilePathAndName = f"{sharePath}{fileName}.gz"
+
+        # Compress locally.
+        startTime = time.perf_counter()
+        with open(localFilePathAndName, 'rb') as inputFile, gzip.open(compressedFilePathAndName, 'wb', compresslevel=6) as outputFile:
+            shutil.copyfileobj(inputFile, outputFile, COPY_BUFFER_BYTES)
+        compressSeconds = time.perf_counter() - startTime
+
+        # Transfer the compressed file to the share.
+        # Transfer under a temporary name and then rename, so the expander never sees a partial file.
+        startTime = time.perf_counter()
+        with open(compressedFilePathAndName, 'rb') as inputFile, open(f"{shareFilePathAndName}.partial", 'wb') as outputFile:
+            shutil.copyfileobj(inputFile, outputFile, COPY_BUFFER_BYTES)
+        os.replace(f"{shareFilePathAndName}.partial", shareFilePathAndName)
+        transferSeconds = time.perf_counter() - startTime
+
+        uncompressedBytes = os.path.getsize(localFilePathAndName)
+        compressedBytes = os.path.getsize(compressedFilePathAndName)
+        os.remove(compressedFilePathAndName)
+
+        transferDetail = {
+            'ClaimTable' : table,
+            'FileName' : fileName,
+            'UncompressedBytes' : uncompressedBytes,
+            'CompressedBytes' : compressedBytes,
+            'CompressSeconds' : compressSeconds,
+            'TransferSeconds' : transferSeconds,
+        }
+        thisJob.setdefault('StagingTransfers', list()).append(transferDetail)
+
+        ratio = uncompressedBytes / compressedBytes if compressedBytes > 0 else 0
+        rate = compressedBytes / transferSeconds / 1048576 if transferSeconds > 0 else 0
+        logger.info(f"{fileName:25} {'compressed file transferred: ':33}{compressedBytes / 1048576:.1f} MB (ratio {ratio:.1f}:1) in {transferSeconds:.1f}s ({rate:.1f} MB/s)")
+
+        return True
+
+    except:
+        message = "ERROR transferring " + localFilePathAndName + " to"
+        logger.error(f"{message:55}: {sharePath}")
+        logger.error(f"{' ':55}: {sys.exc_info()[0]}")
+        logger.error(f"{' ':55}: {sys.exc_info()[1]}")
+
+        return False
+
+
+
+
+
+def waitForExpandedFiles(filepath, timeoutSeconds):
+
+    # "filepath" is supplied without the filename suffix. Wait until no compressed files for it remain.
+    deadline = time.monotonic() + timeoutSeconds
+
+    while len(glob.glob(f"{glob.escape(filepath)}.*.gz")) > 0:
+        if time.monotonic() > deadline:
+            logger.error(f"{'Staging files not expanded in time':30}: {filepath}")
+            return False
+        time.sleep(POLL_SECONDS)
+
+    return True
+
+
+
+
+
+def expandStagingFiles(directory):
+
+    # Decompress each .gz file in the directory next to the server.
+    for compressedFilePathAndName in sorted(glob.glob(os.path.join(glob.escape(directory), '*.gz'))):
+
+        filePathAndName = compressedFilePathAndName[:-len('.gz')]
+        temporaryFilePathAndName = f"{filePathAndName}.partial"
+
+        with gzip.open(compressedFilePathAndName, 'rb') as inputFile, open(temporaryFilePathAndName, 'wb') as outputFile:
+            shutil.copyfileobj(inputFile, outputFile, COPY_BUFFER_BYTES)
+
+        os.replace(temporaryFilePathAndName, filePathAndName)
+        os.remove(compressedFilePathAndName)
+
+        print(f"{'Expanded':30}: {filePathAndName}")
+
+
+
+
+
+if __name__ == "__main__":
+
+    if len(sys.argv) < 2:
+        print(f"{'Usage':30}: python -m utilities.stagingTransfer <directory> [--watch]")
+        sys.exit(1)
+
+    # With --watch, keep expanding files as they arrive, for the duration of a job.
+    if '--watch' in sys.argv[2:]:
+        while True:
+            expandStagingFiles(sys.argv[1])
+            time.sleep(POLL_SECONDS)
+    else:
+        expandStagingFiles(sys.argv[1])
@@ -0,0 +1,106 @@
+'''
+Purpose:
+
+    This module provides a small local cache of HTTP validators (ETag and Last-Modified) for Claims API requests,
+    so that a repeated request can be made conditional and an unchanged response costs a 304 Not Modified.
+    See API_VALIDATOR_CACHE_FILE.
+
+    The cache is a JSON file mapping a request key (insurer, URL and query parameters) to its validators.
+    Validators are only stored once a response has been processed successfully.
+
+Revision History:
+
+    19/10/2026   agent            Created.
+
+'''
+
+## Standard Libraries
+import json
+import logging
+import os
+import sys
+import threading
+
+## Module logger
+logger = logging.getLogger(__name__)
+
+
+## Serialise access to the cache file when several insurers are processed concurrently.
+cacheLock = threading.Lock()
+
+
+
+
+
+def getRequestKey(thisConfig, url, params):
+
+    paramString = '&'.join(f"{key}={params[key]}" for key in sorted(params))
+    return f"{thisConfig['INSURER']}|{url}?{paramString}"
+
+
+
+
+
+def readCache(cacheFile):
+
+    if not os.path.exists(cacheFile):
+        return dict()
+
+    try:
+        with open(cacheFile, 'r') as f:
+            return json.load(f)
+    except:
+        logger.warning(f"{'Unable to read validator cache':30}: {cacheFile}: {sys.exc_info()[1]}")
+        return dict()
+
+
+
+
+
+def getConditionalHeaders(thisConfig, url, params):
+
+    # Returns the If-None-Match / If-Modified-Since headers for the request, if validators are cached.
+    conditionalHeaders = dict()
+
+    if thisConfig['API_VALIDATOR_CACHE_FILE'] == '':
+        return conditionalHeaders
+
+    with cacheLock:
+        validators = readCache(thisConfig['API_VALIDATOR_CACHE_FILE']).get(getRequestKey(thisConfig, url, params), dict())
+
+    if 'ETag' in validators:
+        conditionalHeaders['If-None-Match'] = validators['ETag']
+    if 'Last-Modified' in validators:
+        conditionalHeaders['If-Modified-Since'] = validators['Last-Modified']
+
+    return conditionalHeaders
+
+
+
+
+
+def storeValidators(thisConfig, url, params, responseHeaders):
+
+    if thisConfig['API_VALIDATOR_CACHE_FILE'] == '':
+        return
+
+    validators = dict()
+    if 'ETag' in responseHeaders:
+        validators['ETag'] = responseHeaders['ETag']
+    if 'Last-Modified' in responseHeaders:
+        validators['Last-Modified'] = responseHeaders['Last-Modified']
+
+    if len(validators) == 0:
+        return
+
+    try:
+        with cacheLock:
+            cache = readCache(thisConfig['API_VALIDATOR_CACHE_FILE'])
+            cache[getRequestKey(thisConfig, url, params)] = validators
+            # Write to a temporary file then rename, so an interrupted write doesn't corrupt the cache.
+            temporaryFile = f"{thisConfig['API_VALIDATOR_CACHE_FILE']}.partial"
+            with open(temporaryFile, 'w') as f:
+                json.dump(cache, f, indent=4)
+            os.replace(temporaryFile, thisConfig['API_VALIDATOR_CACHE_FILE'])
+    except:
+        logger.warning(f"{'Unable to write validator cache':30}: {thisConfig['API_VALIDATOR_CACHE_FILE']}: {sys.exc_info()[1]}")